@@ -33,11 +33,10 @@ def create_app():
     
     @app.route('/api/properties')
     def get_properties():
-        import psycopg2
-        from config.db import DB_PARAMS
+        from config.pool import get_connection
         
         try:
-            conn = psycopg2.connect(**DB_PARAMS)
+            conn = get_connection()
             cursor = conn.cursor()
             
             # Execute query to fetch all properties
@@ -0,0 +1,127 @@
+"""
+Amenity classifier benchmark
+
+Compares the old if/elif standardisation chain from extract_property_details
+(a re.search or substring test per rule per line) with the compiled rules
+table in scraping/amenities.py, and checks both give the same amenity map.
+
+Usage:
+    python benchmarks/amenity_benchmark.py [batches]
+"""
+
+import os
+import re
+import sys
+import time
+
+try:
+    from scraping.amenities import classify_amenities
+except ImportError:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+    from src.scraping.amenities import classify_amenities
+
+# Raw lines as they come off Property Details sections
+SAMPLE_LINES = [
+    "Two Large Bedrooms", "One Bathroom", "Big Eat-In Kitchen", "Living Room",
+    "Fully Furnished", "Laundry Available", "Front and Back Porch", "1 Block to Bus Stop",
+    "Pet Friendly", "Kitchen with dining area", "Off-street parking", "Washer and dryer in basement",
+    "Enclosed yard", "Bonus room upstairs", "Dining room", "Storage in basement",
+    "Heat and hot water included", "Three bedrooms", "Two bathrooms", "Pets allowed",
+]
+
+# Lines where a lower priority rule matches earlier in the line than the one
+# the chain picks; each is also checked on its own
+EDGE_LINES = [
+    "Eat-in kitchen with dining area", "Large eat in kitchen with dining room",
+    "Dryer in bedroom, washer in basement", "Porch off the living room", "Laundry next to the bathroom",
+]
+
+
+def legacy_classify(raw_amenities):
+    """The if/elif chain previously inlined in extract_property_details."""
+    amenity_map = {}
+    for raw_amenity in raw_amenities:
+        clean_text = raw_amenity.strip()
+        if not clean_text:
+            continue
+        lower_text = clean_text.lower()
+        if re.search(r'(one|1)\s+bedroom', lower_text, re.I) or "one bedroom" in lower_text:
+            amenity_map["bedrooms"] = "One Bedroom"
+        elif re.search(r'(two|2)\s+large?\s+bedroom', lower_text, re.I):
+            amenity_map["bedrooms"] = "Two Large Bedrooms"
+        elif re.search(r'(two|2)\s+bedroom', lower_text, re.I) or "two bedrooms" in lower_text:
+            amenity_map["bedrooms"] = "Two Bedrooms"
+        elif re.search(r'(three|3)\s+bedroom', lower_text, re.I) or "three bedrooms" in lower_text:
+            amenity_map["bedrooms"] = "Three Bedrooms"
+        elif re.search(r'(four|4)\s+bedroom', lower_text, re.I) or "four bedrooms" in lower_text:
+            amenity_map["bedrooms"] = "Four Bedrooms"
+        elif "bedroom" in lower_text and not any(x in amenity_map for x in ["bedrooms"]):
+            amenity_map["bedrooms"] = clean_text
+        elif re.search(r'(one|1)\s+bathroom', lower_text, re.I) or "one bathroom" in lower_text:
+            amenity_map["bathroom"] = "One Bathroom"
+        elif re.search(r'(two|2)\s+bathroom', lower_text, re.I) or "two bathrooms" in lower_text:
+            amenity_map["bathroom"] = "Two Bathrooms"
+        elif "bathroom" in lower_text and not "bathroom" in amenity_map:
+            amenity_map["bathroom"] = clean_text
+        elif re.search(r'kitchen\s+with\s+dining', lower_text, re.I) or "kitchen with dining" in lower_text:
+            amenity_map["kitchen"] = "Kitchen with Dining Area"
+        elif "eat-in kitchen" in lower_text or "eat in kitchen" in lower_text:
+            amenity_map["kitchen"] = "Big Eat-In Kitchen"
+        elif "kitchen" in lower_text and not "kitchen" in amenity_map:
+            amenity_map["kitchen"] = "Kitchen"
+        elif "living room" in lower_text:
+            amenity_map["living"] = "Living Room"
+        elif "dining area" in lower_text and not "kitchen" in amenity_map:
+            amenity_map["dining"] = "Dining Area"
+        elif "dining room" in lower_text:
+            amenity_map["dining"] = "Dining Room"
+        elif "bonus room" in lower_text:
+            amenity_map["bonus"] = "Bonus Room"
+        elif "enclosed yard" in lower_text:
+            amenity_map["yard"] = "Enclosed Yard"
+        elif "furnished" in lower_text:
+            amenity_map["furnished"] = "Furnished"
+        elif "pet friendly" in lower_text or "pets allowed" in lower_text:
+            amenity_map["pets"] = "Pet Friendly"
+        elif re.search(r'(\d+)\s+block\s+to\s+bus', lower_text, re.I) or "block to bus stop" in lower_text:
+            amenity_map["bus"] = "1 Block to Bus Stop"
+        elif "washer" in lower_text and "dryer" in lower_text:
+            amenity_map["laundry"] = "Washer & Dryer"
+        elif "laundry" in lower_text:
+            amenity_map["laundry"] = "Laundry Available"
+        elif "front porch" in lower_text:
+            amenity_map["porch"] = "Front Porch"
+        elif "porch" in lower_text:
+            amenity_map["porch"] = clean_text
+    return amenity_map
+
+
+def timed(classify, batches):
+    started = time.perf_counter()
+    for batch in batches:
+        classify(batch)
+    return (time.perf_counter() - started) * 1000
+
+
+def main(count):
+    # Pages carry 5-20 amenity lines; rotate the sample so batches differ
+    batches = [
+        SAMPLE_LINES[i % len(SAMPLE_LINES):] + SAMPLE_LINES[:i % 15]
+        for i in range(count)
+    ]
+
+    checked = batches[:len(SAMPLE_LINES)] + [EDGE_LINES] + [[line] for line in EDGE_LINES]
+    mismatches = [batch for batch in checked if legacy_classify(batch) != classify_amenities(batch)]
+    if mismatches:
+        print(f"{len(mismatches)} batch(es) classified differently, first: {mismatches[0]}")
+
+    lines = sum(len(batch) for batch in batches)
+    before = timed(legacy_classify, batches)
+    after = timed(classify_amenities, batches)
+    print(f"{count} batches, {lines} lines")
+    print(f"if/elif chain:   {before:8.1f} ms ({before * 1000 / lines:.2f} us/line)")
+    print(f"compiled table:  {after:8.1f} ms ({after * 1000 / lines:.2f} us/line)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
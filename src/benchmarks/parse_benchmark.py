@@ -0,0 +1,115 @@
+"""
+Listing parser benchmark
+
+Compares the old BeautifulSoup extraction (a text-node scan per field plus a
+get_text() of every div/section) with the single-pass lxml parser, reporting
+per-page parse time and peak memory for each.
+
+Usage:
+    python benchmarks/parse_benchmark.py                 # synthetic Wix-like pages
+    python benchmarks/parse_benchmark.py page1.html ...  # saved listing pages
+"""
+
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+try:
+    from scraping.listing_parser import (
+        parse_document, find_amenities, find_availability, find_bedrooms, find_description, find_price, find_images
+    )
+except ImportError:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+    from src.scraping.listing_parser import (
+        parse_document, find_amenities, find_availability, find_bedrooms, find_description, find_price, find_images
+    )
+
+BASE_URL = "https://www.binghamtonwest.com"
+REPEAT = 5
+
+
+def legacy_extract(html):
+    """The extraction previously done in extract_property_details."""
+    soup = BeautifulSoup(html, 'html.parser')
+    raw_amenities = []
+    for section in soup.find_all(['div', 'section']):
+        section_text = section.get_text().strip().lower()
+        if 'property' in section_text and ('detail' in section_text or 'feature' in section_text):
+            for elem in section.find_all(['li', 'p']):
+                text = elem.get_text().strip()
+                if text and len(text) > 3:
+                    raw_amenities.append(text)
+    for elem in soup.find_all(['span', 'p', 'div', 'li'], string=re.compile(r'[✓✔]')):
+        raw_amenities.append(re.sub(r'^[✓✔]\s*', '', elem.get_text().strip()))
+    for p in soup.find_all(['p', 'div', 'span']):
+        text = p.get_text().strip()
+        if re.search(r'\bliving\s+room\b', text.lower()):
+            raw_amenities.append('Living Room')
+
+    text_nodes = soup.find_all(string=True)
+    price = next((m.group() for m in (re.search(r'\$\s*[\d,]+', t) for t in text_nodes) if m), None)
+    availability = next((m.group() for m in (re.search(r'available (?:until|from) [a-zA-Z]+ \d{4}', t, re.I)
+                                              for t in text_nodes) if m), None)
+    bedrooms = next((m.group(1) for m in (re.search(r'(\d+)[\s-]bedroom', t, re.I) for t in text_nodes) if m), None)
+    images = [img.get('src') for img in soup.find_all('img')]
+    return price, availability, bedrooms, raw_amenities, images
+
+
+def single_pass_extract(html):
+    page = parse_document(html)
+    return (find_price(page), find_availability(page), find_bedrooms(page),
+            find_amenities(page), find_description(page), find_images(page, BASE_URL))
+
+
+def synthetic_page(depth=12, sections=40):
+    """A page shaped like the Wix output: deeply nested wrapper divs around small blocks."""
+    parts = ['<html><head><script>var wix = {"a": 1};</script><style>p{}</style></head><body>']
+    for i in range(sections):
+        parts.append('<div class="wrapper"><div>' * depth)
+        parts.append(f'<p><span>Section {i} text about the neighbourhood and the street.</span></p>')
+        parts.append(f'<img src="/media/photo-{i}.jpg" width="300" height="200">')
+        parts.append('</div></div>' * depth)
+    parts.append('<div style="background-color:rgba(0, 138, 69, 1)"><div><h2>Property Details</h2>'
+                 '<p>Two Bedrooms<br>Big Eat-In Kitchen<br>Living Room<br>Laundry Available<br>'
+                 '1 Block to Bus Stop</p></div></div>')
+    parts.append('<p><span>$1,250/mo</span></p><p>Available from August 2025</p>')
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+def measure(extract, html):
+    """Return (milliseconds per page, peak KB) for one extractor."""
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        extract(html)
+    per_page = (time.perf_counter() - started) / REPEAT * 1000
+
+    tracemalloc.start()
+    extract(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return per_page, peak / 1024
+
+
+def main(paths):
+    pages = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            pages.append((os.path.basename(path), f.read()))
+    if not pages:
+        pages = [('synthetic (depth 12)', synthetic_page()), ('synthetic (depth 24)', synthetic_page(depth=24))]
+
+    print(f"{'page':<28}{'KB':>8}{'before ms':>12}{'after ms':>11}{'before peak KB':>17}{'after peak KB':>16}")
+    for name, html in pages:
+        before_ms, before_kb = measure(legacy_extract, html)
+        after_ms, after_kb = measure(single_pass_extract, html)
+        print(f"{name[:27]:<28}{len(html) / 1024:>8.0f}{before_ms:>12.1f}{after_ms:>11.1f}"
+              f"{before_kb:>17.0f}{after_kb:>16.0f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,99 @@
+"""
+Listing save benchmark
+
+Compares the per-row write path (one INSERT ... ON CONFLICT and one commit
+per listing) with the bulk path in save_to_database (COPY into a staging
+table and one set-based merge) on synthetic listings. Each size is written
+three times: inserts, updates of every row, and a re-save of identical
+rows, which the row hash turns into no writes at all.
+
+Runs against the configured database, inside a scratch schema that is
+dropped afterwards, so the real properties table is never touched.
+
+Usage:
+    python benchmarks/save_benchmark.py [size ...]    # default: 10000 100000
+"""
+
+import os
+import sys
+import time
+
+import psycopg2
+
+SCHEMA = 'save_benchmark'
+
+# Every connection opened below (including those made inside config.db)
+# resolves unqualified table names to the scratch schema
+os.environ['PGOPTIONS'] = f'-c search_path={SCHEMA}'
+
+try:
+    from config.configuration import DB_PARAMS
+    from config.db import create_properties_table, save_listings_row_by_row, save_to_database
+except ImportError:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+    from src.config.configuration import DB_PARAMS
+    from src.config.db import create_properties_table, save_listings_row_by_row, save_to_database
+
+# Batch size the scraper's pipeline writes with
+BATCH_SIZE = 1000
+
+
+def synthetic_listings(count, price_offset=0):
+    listings = []
+    for i in range(count):
+        title = f"{i} Synthetic St Apt {i % 4 + 1}"
+        listings.append({
+            "title": title,
+            "price": f"${900 + (i + price_offset) % 700:,}",
+            "location": title,
+            "url": f"https://www.binghamtonwest.com/{i}-synthetic-st-apt-{i % 4 + 1}",
+            "bedrooms": i % 6 + 1,
+            "image_url": f"https://static.wixstatic.com/media/{i:08x}.jpg",
+            "amenities": ["Two Bedrooms", "One Bathroom", "Kitchen", "Living Room", "Pet Friendly"],
+            "description": f"A synthetic listing number {i}.\nTab\tand \\backslash included.",
+            "availability": "Available August 2026",
+            "bathrooms": i % 2 + 1,
+            "photos": [f"https://static.wixstatic.com/media/{i:08x}-{n}.jpg" for n in range(5)],
+        })
+    # A few invalid rows, which the bulk path sends to property_rejects
+    listings.append({"title": "", "url": "https://www.binghamtonwest.com/no-title"})
+    listings.append({"title": "Bad count", "url": "https://www.binghamtonwest.com/bad-count", "bedrooms": "two"})
+    return listings
+
+
+def reset_schema(cur):
+    cur.execute(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE')
+    cur.execute(f'CREATE SCHEMA {SCHEMA}')
+
+
+def timed(save, listings, batch_size):
+    started = time.perf_counter()
+    for start in range(0, len(listings), batch_size):
+        save(listings[start:start + batch_size])
+    return time.perf_counter() - started
+
+
+def main(sizes):
+    admin = psycopg2.connect(**DB_PARAMS)
+    admin.autocommit = True
+    cur = admin.cursor()
+    try:
+        for size in sizes:
+            for name, save in (("per-row", save_listings_row_by_row), ("COPY + merge", save_to_database)):
+                reset_schema(cur)
+                create_properties_table()
+                inserted = timed(save, synthetic_listings(size), BATCH_SIZE)
+                updated = timed(save, synthetic_listings(size, price_offset=1), BATCH_SIZE)
+                unchanged = timed(save, synthetic_listings(size, price_offset=1), BATCH_SIZE)
+                cur.execute(f'SELECT count(*) FROM {SCHEMA}.properties')
+                rows = cur.fetchone()[0]
+                print(f"{size:>7} listings  {name:<13} insert {inserted:8.2f}s ({size / inserted:9.0f}/s)  "
+                      f"update {updated:8.2f}s ({size / updated:9.0f}/s)  "
+                      f"unchanged {unchanged:8.2f}s ({size / unchanged:9.0f}/s)  rows {rows}")
+    finally:
+        cur.execute(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE')
+        admin.close()
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000])
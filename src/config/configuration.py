@@ -1,15 +1,172 @@
 # configuration.py
 
+import os
+
+# Connection settings shared by the scraper, the web server and the setup scripts
 DB_PARAMS = {
-    'host': 'database',  # Using container name in Docker network
-    'database': 'test_db',
-    'user': 'postgres',
-    'password': 'team13'
+    'host': os.environ.get('POSTGRES_HOST', 'database'),  # Using container name in Docker network
+    'port': int(os.environ.get('POSTGRES_PORT', 5432)),
+    'database': os.environ.get('POSTGRES_DB', 'test_db'),
+    'user': os.environ.get('POSTGRES_USER', 'postgres'),
+    'password': os.environ.get('POSTGRES_PASSWORD', 'team13')
 }
 
+# Connection pool (config/pool.py): connections kept open and the most open
+# at once per process, how long a caller waits for a free one, the age at
+# which a connection is replaced, and the idle time after which it is
+# checked with a SELECT 1 before reuse (seconds)
+DB_POOL_MIN = int(os.environ.get('DB_POOL_MIN', 1))
+DB_POOL_MAX = int(os.environ.get('DB_POOL_MAX', 10))
+DB_POOL_TIMEOUT_SECONDS = float(os.environ.get('DB_POOL_TIMEOUT_SECONDS', 10))
+DB_POOL_MAX_LIFETIME_SECONDS = float(os.environ.get('DB_POOL_MAX_LIFETIME_SECONDS', 1800))
+DB_POOL_HEALTH_CHECK_SECONDS = float(os.environ.get('DB_POOL_HEALTH_CHECK_SECONDS', 30))
+
 BASE_URL = 'https://www.binghamtonwest.com'
 TARGET_URL = f'{BASE_URL}/school/binghamton-university'
 
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 }
+
+# Scraper browser pool
+CHROME_BINARY = os.environ.get('CHROME_BINARY', '/usr/bin/google-chrome')
+CHROMEDRIVER_PATH = os.environ.get('CHROMEDRIVER_PATH', '/usr/local/bin/chromedriver')
+SCRAPER_POOL_SIZE = int(os.environ.get('SCRAPER_POOL_SIZE', 4))
+DRIVER_MAX_PAGES = int(os.environ.get('DRIVER_MAX_PAGES', 25))
+DRIVER_MAX_RSS_MB = int(os.environ.get('DRIVER_MAX_RSS_MB', 600))
+
+# HTTP-first fetching
+HTTP_POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE', 8))
+HTTP_TIMEOUT = float(os.environ.get('HTTP_TIMEOUT', 10))
+FETCH_PATH_REPROBE_DAYS = int(os.environ.get('FETCH_PATH_REPROBE_DAYS', 7))
+
+# Per-host politeness: request rate and burst (token bucket), the range the
+# adaptive concurrency limit moves in, and the latency (seconds) above which
+# it backs off
+THROTTLE_RATE = float(os.environ.get('THROTTLE_RATE', 5))
+THROTTLE_BURST = int(os.environ.get('THROTTLE_BURST', 10))
+THROTTLE_MIN_CONCURRENCY = int(os.environ.get('THROTTLE_MIN_CONCURRENCY', 1))
+THROTTLE_MAX_CONCURRENCY = int(os.environ.get('THROTTLE_MAX_CONCURRENCY', 16))
+THROTTLE_TARGET_LATENCY = float(os.environ.get('THROTTLE_TARGET_LATENCY', 2))
+# Retries of 429 / 5xx / timeouts, with jittered exponential backoff (seconds)
+THROTTLE_RETRIES = int(os.environ.get('THROTTLE_RETRIES', 3))
+THROTTLE_BACKOFF_BASE = float(os.environ.get('THROTTLE_BACKOFF_BASE', 0.5))
+THROTTLE_BACKOFF_CAP = float(os.environ.get('THROTTLE_BACKOFF_CAP', 30))
+# Consecutive failures that open a host's circuit, and how long it stays open
+BREAKER_FAILURES = int(os.environ.get('BREAKER_FAILURES', 5))
+BREAKER_COOLDOWN_SECONDS = float(os.environ.get('BREAKER_COOLDOWN_SECONDS', 30))
+
+# Page readiness (seconds unless noted)
+READY_MIN_TIMEOUT = float(os.environ.get('READY_MIN_TIMEOUT', 2))
+READY_MAX_TIMEOUT = float(os.environ.get('READY_MAX_TIMEOUT', 15))
+READY_DEFAULT_TIMEOUT = float(os.environ.get('READY_DEFAULT_TIMEOUT', 10))
+NETWORK_IDLE_MS = int(os.environ.get('NETWORK_IDLE_MS', 500))
+# The old per-page sleep, kept as the baseline for the timing report
+FIXED_SLEEP_SECONDS = 3
+
+# Browser resource policy: 'block' drops the resources below, 'audit' loads
+# everything but measures what blocking would save, 'off' disables both
+RESOURCE_POLICY_MODE = os.environ.get('RESOURCE_POLICY_MODE', 'block')
+RESOURCE_BLOCK_TYPES = [t for t in os.environ.get('RESOURCE_BLOCK_TYPES', 'image,font,stylesheet,media').split(',') if t]
+RESOURCE_BLOCK_DOMAINS = [d for d in os.environ.get(
+    'RESOURCE_BLOCK_DOMAINS',
+    'google-analytics.com,googletagmanager.com,doubleclick.net,connect.facebook.net,frog.wix.com,static.hotjar.com'
+).split(',') if d]
+RESOURCE_PROFILE_PATH = os.environ.get(
+    'RESOURCE_PROFILE_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'resource_profile.json')
+)
+
+# Listing extraction: 'prefer' reads Wix data payloads first and falls back
+# to the DOM parser, 'off' always parses the DOM
+WIX_DATA_MODE = os.environ.get('WIX_DATA_MODE', 'prefer')
+
+# Listing detail cache (seconds): entries younger than the TTL are served as
+# is, older ones are served while a background refresh runs, and entries
+# past TTL + max stale are fetched again before answering
+DETAIL_CACHE_TTL = int(os.environ.get('DETAIL_CACHE_TTL', 6 * 3600))
+DETAIL_CACHE_MAX_STALE = int(os.environ.get('DETAIL_CACHE_MAX_STALE', 7 * 24 * 3600))
+DETAIL_CACHE_MAX_ENTRIES = int(os.environ.get('DETAIL_CACHE_MAX_ENTRIES', 256))
+
+# Unchanged property rows are only rewritten to refresh last_seen_at (and the
+# details freshness stamp) once they are this old; half the detail cache TTL
+# keeps stored details from ever looking stale while the scraper confirms them
+LAST_SEEN_REFRESH_SECONDS = int(os.environ.get('LAST_SEEN_REFRESH_SECONDS', DETAIL_CACHE_TTL // 2))
+
+# Full refresh (scraper.py --full-refresh): listings load into a shadow table
+# that replaces properties only if it holds at least this share of the live
+# rows; the swap waits at most the lock timeout per attempt
+FULL_REFRESH_MIN_RATIO = float(os.environ.get('FULL_REFRESH_MIN_RATIO', 0.5))
+FULL_REFRESH_LOCK_TIMEOUT_MS = int(os.environ.get('FULL_REFRESH_LOCK_TIMEOUT_MS', 2000))
+FULL_REFRESH_SWAP_ATTEMPTS = int(os.environ.get('FULL_REFRESH_SWAP_ATTEMPTS', 5))
+
+# Distributed workers (scraper.py --enqueue / --worker): URLs claimed per
+# batch, lease length (renewed by heartbeats), retry limit and base backoff
+SCRAPE_JOB_BATCH_SIZE = int(os.environ.get('SCRAPE_JOB_BATCH_SIZE', 20))
+SCRAPE_JOB_LEASE_SECONDS = int(os.environ.get('SCRAPE_JOB_LEASE_SECONDS', 300))
+SCRAPE_JOB_MAX_ATTEMPTS = int(os.environ.get('SCRAPE_JOB_MAX_ATTEMPTS', 4))
+SCRAPE_JOB_BACKOFF_SECONDS = float(os.environ.get('SCRAPE_JOB_BACKOFF_SECONDS', 30))
+SCRAPE_JOB_POLL_SECONDS = float(os.environ.get('SCRAPE_JOB_POLL_SECONDS', 5))
+
+# Listing discovery
+SITEMAP_URL = os.environ.get('SITEMAP_URL', f'{BASE_URL}/sitemap.xml')
+DISCOVERY_MAX_SITEMAPS = int(os.environ.get('DISCOVERY_MAX_SITEMAPS', 10))
+
+# 'incremental' revalidates known listings with conditional requests and skips
+# pages whose content hash is unchanged; 'full' re-downloads and re-parses all
+SCRAPE_MODE = os.environ.get('SCRAPE_MODE', 'incremental')
+# Listings only the browser can render have no HTTP validators, so revalidating
+# one costs a full Chrome render; unless discovery reports them new or changed
+# they are rechecked at most this often
+BROWSER_REVALIDATE_HOURS = float(os.environ.get('BROWSER_REVALIDATE_HOURS', 24))
+
+# Raw page archive: every fetched listing page is kept, gzip-compressed and
+# deduplicated by content, so extraction can be replayed offline
+ARCHIVE_MODE = os.environ.get('ARCHIVE_MODE', 'on')
+ARCHIVE_DIR = os.environ.get(
+    'ARCHIVE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'archive')
+)
+ARCHIVE_SEGMENT_MB = float(os.environ.get('ARCHIVE_SEGMENT_MB', 64))
+
+# Fetch/parse/save pipeline: parser processes (0 = one per CPU), pages
+# buffered between stages, and listings written per database batch
+PIPELINE_PARSE_WORKERS = int(os.environ.get('PIPELINE_PARSE_WORKERS', 0))
+PIPELINE_QUEUE_SIZE = int(os.environ.get('PIPELINE_QUEUE_SIZE', 16))
+PIPELINE_BATCH_SIZE = int(os.environ.get('PIPELINE_BATCH_SIZE', 25))
+PIPELINE_FLUSH_SECONDS = float(os.environ.get('PIPELINE_FLUSH_SECONDS', 5))
+
+# Scrape run ledger: per-URL progress is checkpointed at least this often
+# (seconds) or every this many URLs, so --resume can continue a crashed run
+SCRAPE_RUN_CHECKPOINT_SECONDS = float(os.environ.get('SCRAPE_RUN_CHECKPOINT_SECONDS', 2))
+SCRAPE_RUN_CHECKPOINT_SIZE = int(os.environ.get('SCRAPE_RUN_CHECKPOINT_SIZE', 50))
+
+# Per-run performance report, also written here in Prometheus text format
+# (for a node_exporter textfile collector); cProfile output of --profile runs
+METRICS_FILE = os.environ.get(
+    'METRICS_FILE',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'metrics', 'scraper.prom')
+)
+PROFILE_DIR = os.environ.get(
+    'PROFILE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'profiles')
+)
+
+# Offline geocoder: street gazetteer listings are placed with (no network
+# calls), and the campus point distance_miles is measured from
+GAZETTEER_PATH = os.environ.get(
+    'GAZETTEER_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'geo', 'binghamton_streets.csv')
+)
+CAMPUS_LAT = float(os.environ.get('CAMPUS_LAT', 42.0896))
+CAMPUS_LNG = float(os.environ.get('CAMPUS_LNG', -75.9672))
+
+# Walking times from campus: street network (GeoJSON LineStrings, with
+# campus_entrance points) routed once per process, walking speed, and how
+# far a listing may be from the nearest street to get a time at all
+WALK_GRAPH_PATH = os.environ.get(
+    'WALK_GRAPH_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'geo', 'binghamton_walk.geojson')
+)
+WALK_SPEED_KMH = float(os.environ.get('WALK_SPEED_KMH', 4.8))
+WALK_MAX_SNAP_METERS = float(os.environ.get('WALK_MAX_SNAP_METERS', 400))
@@ -2,15 +2,81 @@
 # Database Configuration
 # This file will:
 # - Set up database connection
-# - Configure connection pool
+# - Configure connection pool (connections come from config/pool.py)
 # - Handle database errors
 """ 
 
+import io
+import re
+import json
+import math
+import time
+import hashlib
 import psycopg2
-from .configuration import DB_PARAMS
+from psycopg2.extras import execute_values
+from contextlib import contextmanager
+from .pool import get_connection
+try:
+    from scraping.normalize import normalize_listing
+except ImportError:
+    from src.scraping.normalize import normalize_listing
+from .configuration import (
+    DB_PARAMS, LAST_SEEN_REFRESH_SECONDS, FULL_REFRESH_MIN_RATIO, FULL_REFRESH_LOCK_TIMEOUT_MS,
+    FULL_REFRESH_SWAP_ATTEMPTS, SCRAPE_JOB_LEASE_SECONDS, SCRAPE_JOB_MAX_ATTEMPTS, SCRAPE_JOB_BACKOFF_SECONDS
+)
+
+# Columns of properties written by save_to_database, in COPY order. Missing
+# bedrooms, the price_* columns, the coordinates and walk_minutes are filled by
+# scraping/normalize.py when a listing is saved
+LISTING_COLUMNS = [
+    'title', 'price', 'location', 'url', 'bedrooms', 'image_url', 'map_image_url',
+    'amenities', 'description', 'availability', 'bathrooms', 'photos',
+    'price_cents', 'price_period', 'price_per_bedroom', 'price_monthly_cents', 'latitude', 'longitude',
+    'distance_miles', 'walk_minutes'
+]
+INTEGER_COLUMNS = {'bedrooms', 'bathrooms', 'price_cents', 'price_per_bedroom', 'price_monthly_cents'}
+FLOAT_COLUMNS = {'latitude', 'longitude', 'distance_miles', 'walk_minutes'}
+ARRAY_COLUMNS = {'amenities', 'photos'}
+
+# Shared by both save paths. A row whose content hash is unchanged is left
+# alone (no new tuple, nothing for autovacuum), except that last_seen_at and
+# details_scraped_at are refreshed once it is LAST_SEEN_REFRESH_SECONDS old.
+# RETURNING only reports rows actually written; updated_at equals the
+# transaction time exactly when the row was inserted or its content changed.
+UPSERT_CONFLICT_SQL = '''
+ON CONFLICT (url) DO UPDATE
+SET title = EXCLUDED.title,
+    price = EXCLUDED.price,
+    location = EXCLUDED.location,
+    bedrooms = EXCLUDED.bedrooms,
+    image_url = EXCLUDED.image_url,
+    map_image_url = EXCLUDED.map_image_url,
+    amenities = COALESCE(EXCLUDED.amenities, properties.amenities),
+    description = COALESCE(EXCLUDED.description, properties.description),
+    availability = COALESCE(EXCLUDED.availability, properties.availability),
+    bathrooms = COALESCE(EXCLUDED.bathrooms, properties.bathrooms),
+    photos = COALESCE(EXCLUDED.photos, properties.photos),
+    price_cents = EXCLUDED.price_cents,
+    price_period = EXCLUDED.price_period,
+    price_per_bedroom = EXCLUDED.price_per_bedroom,
+    price_monthly_cents = EXCLUDED.price_monthly_cents,
+    latitude = EXCLUDED.latitude,
+    longitude = EXCLUDED.longitude,
+    distance_miles = EXCLUDED.distance_miles,
+    walk_minutes = EXCLUDED.walk_minutes,
+    details_scraped_at = COALESCE(EXCLUDED.details_scraped_at, properties.details_scraped_at),
+    row_hash = EXCLUDED.row_hash,
+    updated_at = CASE WHEN properties.row_hash IS DISTINCT FROM EXCLUDED.row_hash
+                      THEN CURRENT_TIMESTAMP ELSE properties.updated_at END,
+    last_seen_at = CURRENT_TIMESTAMP
+WHERE properties.row_hash IS DISTINCT FROM EXCLUDED.row_hash
+   OR properties.last_seen_at IS NULL
+   OR properties.last_seen_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+RETURNING url, xmax = 0 AS inserted, updated_at = CURRENT_TIMESTAMP AS changed
+'''
 
 def create_properties_table():
-    conn = psycopg2.connect(**DB_PARAMS)
+    conn = get_connection()
     cur = conn.cursor()
     cur.execute('''
     CREATE TABLE IF NOT EXISTS properties (
@@ -25,15 +91,858 @@ def create_properties_table():
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )
     ''')
+    # Listing details stored at scrape time so the property page never scrapes live
+    cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS amenities TEXT[]')
+    cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS description TEXT')
+    cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS availability TEXT')
+    cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS bathrooms INTEGER')
+    cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS photos TEXT[]')
+    cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS details_scraped_at TIMESTAMP')
+    # Content hash gating the upsert, and when a row last changed / was last seen by the scraper
+    cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS row_hash TEXT')
+    cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP')
+    cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS last_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP')
+    # Numeric price filled at ingest (backfill_normalized_columns for older rows), so
+    # the listings API filters and sorts on indexes instead of parsing text
+    cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS price_cents INTEGER')
+    cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS price_period TEXT')
+    cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS price_per_bedroom INTEGER')
+    # The filters and sorts compare the monthly equivalent, so a weekly price is not the cheapest
+    cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS price_monthly_cents INTEGER')
+    cur.execute('DROP INDEX IF EXISTS properties_price_cents_idx')
+    cur.execute('DROP INDEX IF EXISTS properties_bedrooms_price_cents_idx')
+    cur.execute('CREATE INDEX IF NOT EXISTS properties_price_monthly_cents_idx ON properties (price_monthly_cents, id)')
+    cur.execute('CREATE INDEX IF NOT EXISTS properties_bedrooms_price_monthly_cents_idx '
+                'ON properties (bedrooms, price_monthly_cents)')
+    # Geocoded at ingest from the bundled gazetteer; distance to campus backs the
+    # distance filter and the closest-first sort
+    cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION')
+    cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION')
+    cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS distance_miles REAL')
+    cur.execute('CREATE INDEX IF NOT EXISTS properties_distance_miles_idx ON properties (distance_miles, id)')
+    # Walking time from campus over the street graph, precomputed at ingest
+    cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS walk_minutes REAL')
+    cur.execute('CREATE INDEX IF NOT EXISTS properties_walk_minutes_idx ON properties (walk_minutes, id)')
+    # Leave room on each page so the remaining updates can be HOT (no index churn)
+    cur.execute('ALTER TABLE properties SET (fillfactor = 90)')
+    # Listings a bulk save rejected, kept for inspection instead of failing the batch
+    cur.execute('''
+    CREATE TABLE IF NOT EXISTS property_rejects (
+        id SERIAL PRIMARY KEY,
+        url TEXT,
+        reason TEXT NOT NULL,
+        listing JSONB,
+        rejected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    conn.commit()
+    cur.close()
+    conn.close()
+
+def create_scrape_urls_table():
+    """Create the table that remembers per-URL scraping state between runs."""
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute('''
+    CREATE TABLE IF NOT EXISTS scrape_urls (
+        url TEXT PRIMARY KEY,
+        fetch_path TEXT,
+        checked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    cur.execute('ALTER TABLE scrape_urls ADD COLUMN IF NOT EXISTS ready_ms REAL')
+    cur.execute('ALTER TABLE scrape_urls ADD COLUMN IF NOT EXISTS ready_samples INTEGER DEFAULT 0')
+    # URL frontier: what discovery found, where, and when it was last fetched
+    cur.execute("ALTER TABLE scrape_urls ADD COLUMN IF NOT EXISTS kind TEXT DEFAULT 'listing'")
+    cur.execute('ALTER TABLE scrape_urls ADD COLUMN IF NOT EXISTS source TEXT')
+    cur.execute('ALTER TABLE scrape_urls ADD COLUMN IF NOT EXISTS lastmod TIMESTAMP')
+    cur.execute('ALTER TABLE scrape_urls ADD COLUMN IF NOT EXISTS first_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP')
+    cur.execute('ALTER TABLE scrape_urls ADD COLUMN IF NOT EXISTS last_seen_at TIMESTAMP')
+    cur.execute('ALTER TABLE scrape_urls ADD COLUMN IF NOT EXISTS removed_at TIMESTAMP')
+    cur.execute('ALTER TABLE scrape_urls ADD COLUMN IF NOT EXISTS fetched_at TIMESTAMP')
+    cur.execute('ALTER TABLE scrape_urls ADD COLUMN IF NOT EXISTS etag TEXT')
+    cur.execute('ALTER TABLE scrape_urls ADD COLUMN IF NOT EXISTS last_modified TEXT')
+    cur.execute('ALTER TABLE scrape_urls ADD COLUMN IF NOT EXISTS content_hash TEXT')
+    conn.commit()
+    cur.close()
+    conn.close()
+
+def load_fetch_paths():
+    """Return {url: {'path': ..., 'checked_at': ...}} for every URL with a known fetch path."""
+    conn = None
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute('SELECT url, fetch_path, checked_at FROM scrape_urls WHERE fetch_path IS NOT NULL')
+        paths = {url: {'path': path, 'checked_at': checked_at} for url, path, checked_at in cur.fetchall()}
+        cur.close()
+        return paths
+    except Exception as e:
+        print(f"Error loading fetch paths: {e}")
+        return {}
+    finally:
+        if conn:
+            conn.close()
+
+def save_fetch_paths(paths):
+    """Store the fetch path ('http' or 'browser') that worked for each URL."""
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.executemany('''
+        INSERT INTO scrape_urls (url, fetch_path, checked_at)
+        VALUES (%s, %s, CURRENT_TIMESTAMP)
+        ON CONFLICT (url) DO UPDATE
+        SET fetch_path = EXCLUDED.fetch_path,
+            checked_at = EXCLUDED.checked_at
+        ''', list(paths.items()))
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"Error saving fetch paths: {e}")
+    finally:
+        cur.close()
+        conn.close()
+
+def load_frontier():
+    """Return {url: row dict} for every URL in the frontier, listings and discovery sources alike."""
+    conn = None
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute('''
+        SELECT url, kind, source, lastmod, last_seen_at, removed_at, fetched_at, etag, last_modified, fetch_path
+        FROM scrape_urls
+        ''')
+        columns = [column[0] for column in cur.description]
+        frontier = {row[0]: dict(zip(columns, row)) for row in cur.fetchall()}
+        cur.close()
+        return frontier
+    except Exception as e:
+        print(f"Error loading URL frontier: {e}")
+        return {}
+    finally:
+        if conn:
+            conn.close()
+
+def save_frontier(seen, removed=()):
+    """Record a discovery pass.
+
+    ``seen`` maps url -> {'kind', 'source', 'lastmod', 'etag', 'last_modified'};
+    those URLs are marked as seen now (and no longer removed). URLs in
+    ``removed`` are marked as gone from the site.
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.executemany('''
+        INSERT INTO scrape_urls (url, kind, source, lastmod, etag, last_modified, last_seen_at)
+        VALUES (%s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
+        ON CONFLICT (url) DO UPDATE
+        SET kind = EXCLUDED.kind,
+            source = COALESCE(EXCLUDED.source, scrape_urls.source),
+            lastmod = COALESCE(EXCLUDED.lastmod, scrape_urls.lastmod),
+            etag = COALESCE(EXCLUDED.etag, scrape_urls.etag),
+            last_modified = COALESCE(EXCLUDED.last_modified, scrape_urls.last_modified),
+            last_seen_at = EXCLUDED.last_seen_at,
+            removed_at = NULL
+        ''', [
+            (url, row.get('kind', 'listing'), row.get('source'), row.get('lastmod'),
+             row.get('etag'), row.get('last_modified'))
+            for url, row in seen.items()
+        ])
+        if removed:
+            cur.execute('''
+            UPDATE scrape_urls SET removed_at = CURRENT_TIMESTAMP
+            WHERE url = ANY(%s) AND removed_at IS NULL
+            ''', (list(removed),))
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"Error saving URL frontier: {e}")
+    finally:
+        cur.close()
+        conn.close()
+
+def load_page_validators():
+    """Return {url: {'etag', 'last_modified', 'content_hash'}} for listings already saved to properties.
+
+    Listings missing from properties are left out so they are always fetched
+    and saved in full, even if their page has not changed.
+    """
+    conn = None
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute('''
+        SELECT s.url, s.etag, s.last_modified, s.content_hash
+        FROM scrape_urls s
+        WHERE s.content_hash IS NOT NULL
+          AND EXISTS (SELECT 1 FROM properties p WHERE p.url = s.url)
+        ''')
+        validators = {
+            url: {'etag': etag, 'last_modified': last_modified, 'content_hash': content_hash}
+            for url, etag, last_modified, content_hash in cur.fetchall()
+        }
+        cur.close()
+        return validators
+    except Exception as e:
+        print(f"Error loading page validators: {e}")
+        return {}
+    finally:
+        if conn:
+            conn.close()
+
+def mark_urls_fetched(pages):
+    """Stamp the listings fetched in this run and store their validators.
+
+    ``pages`` maps url -> {'etag', 'last_modified', 'content_hash'}.
+    """
+    if not pages:
+        return
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.executemany('''
+        INSERT INTO scrape_urls (url, etag, last_modified, content_hash, fetched_at, first_seen_at)
+        VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+        ON CONFLICT (url) DO UPDATE
+        SET etag = EXCLUDED.etag,
+            last_modified = EXCLUDED.last_modified,
+            content_hash = EXCLUDED.content_hash,
+            fetched_at = EXCLUDED.fetched_at
+        ''', [
+            (url, page.get('etag'), page.get('last_modified'), page.get('content_hash'))
+            for url, page in pages.items()
+        ])
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"Error marking fetched URLs: {e}")
+    finally:
+        cur.close()
+        conn.close()
+
+def create_scrape_jobs_table():
+    """Create the work queue scraper workers claim listing URLs from."""
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute('''
+    CREATE TABLE IF NOT EXISTS scrape_jobs (
+        id SERIAL PRIMARY KEY,
+        url TEXT NOT NULL UNIQUE,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        available_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        leased_by TEXT,
+        lease_expires_at TIMESTAMP,
+        heartbeat_at TIMESTAMP,
+        last_error TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        finished_at TIMESTAMP
+    )
+    ''')
+    cur.execute('''
+    CREATE INDEX IF NOT EXISTS scrape_jobs_claim_idx
+    ON scrape_jobs (available_at, id) WHERE status IN ('pending', 'running')
+    ''')
+    conn.commit()
+    cur.close()
+    conn.close()
+
+def enqueue_scrape_jobs(urls):
+    """Queue URLs for the workers. Jobs already pending or running are left alone. Returns the number queued."""
+    if not urls:
+        return 0
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute('''
+        INSERT INTO scrape_jobs (url)
+        SELECT url FROM unnest(%s) AS url
+        ON CONFLICT (url) DO UPDATE
+        SET status = 'pending',
+            attempts = 0,
+            available_at = CURRENT_TIMESTAMP,
+            leased_by = NULL,
+            lease_expires_at = NULL,
+            last_error = NULL,
+            finished_at = NULL
+        WHERE scrape_jobs.status IN ('done', 'failed')
+        ''', (list(dict.fromkeys(urls)),))
+        queued = cur.rowcount
+        conn.commit()
+        return queued
+    except Exception as e:
+        conn.rollback()
+        print(f"Error queueing scrape jobs: {e}")
+        return 0
+    finally:
+        cur.close()
+        conn.close()
+
+def claim_scrape_jobs(worker_id, limit, lease_seconds=None):
+    """Lease up to ``limit`` jobs to a worker and return their URLs.
+
+    Takes pending jobs that are due and running jobs whose lease expired (a
+    dead worker's), skipping rows another worker is claiming right now.
+    Expired jobs already at the attempt limit are failed instead.
+    """
+    lease_seconds = lease_seconds or SCRAPE_JOB_LEASE_SECONDS
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute('''
+        UPDATE scrape_jobs
+        SET status = 'failed', finished_at = CURRENT_TIMESTAMP, leased_by = NULL,
+            last_error = COALESCE(last_error, 'lease expired')
+        WHERE status = 'running' AND lease_expires_at < CURRENT_TIMESTAMP AND attempts >= %s
+        ''', (SCRAPE_JOB_MAX_ATTEMPTS,))
+        cur.execute('''
+        UPDATE scrape_jobs
+        SET status = 'running',
+            attempts = attempts + 1,
+            leased_by = %s,
+            lease_expires_at = CURRENT_TIMESTAMP + make_interval(secs => %s),
+            heartbeat_at = CURRENT_TIMESTAMP
+        WHERE id IN (
+            SELECT id FROM scrape_jobs
+            WHERE (status = 'pending' AND available_at <= CURRENT_TIMESTAMP)
+               OR (status = 'running' AND lease_expires_at < CURRENT_TIMESTAMP)
+            ORDER BY available_at, id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING url
+        ''', (worker_id, lease_seconds, limit))
+        urls = [row[0] for row in cur.fetchall()]
+        conn.commit()
+        return urls
+    except Exception as e:
+        conn.rollback()
+        print(f"Error claiming scrape jobs: {e}")
+        return []
+    finally:
+        cur.close()
+        conn.close()
+
+def heartbeat_scrape_jobs(worker_id, urls, lease_seconds=None):
+    """Extend the leases a worker still holds. Returns how many were extended."""
+    if not urls:
+        return 0
+    lease_seconds = lease_seconds or SCRAPE_JOB_LEASE_SECONDS
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute('''
+        UPDATE scrape_jobs
+        SET lease_expires_at = CURRENT_TIMESTAMP + make_interval(secs => %s),
+            heartbeat_at = CURRENT_TIMESTAMP
+        WHERE url = ANY(%s) AND status = 'running' AND leased_by = %s
+        ''', (lease_seconds, list(urls), worker_id))
+        extended = cur.rowcount
+        conn.commit()
+        return extended
+    except Exception as e:
+        conn.rollback()
+        print(f"Error renewing scrape job leases: {e}")
+        return 0
+    finally:
+        cur.close()
+        conn.close()
+
+def finish_scrape_job(worker_id, url, error=None):
+    """Record a job's outcome: done, or retried with exponential backoff until the attempt limit."""
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        if error is None:
+            cur.execute('''
+            UPDATE scrape_jobs
+            SET status = 'done', finished_at = CURRENT_TIMESTAMP, leased_by = NULL,
+                lease_expires_at = NULL, last_error = NULL
+            WHERE url = %s AND status = 'running' AND leased_by = %s
+            ''', (url, worker_id))
+        else:
+            cur.execute('''
+            UPDATE scrape_jobs
+            SET status = CASE WHEN attempts >= %s THEN 'failed' ELSE 'pending' END,
+                available_at = CURRENT_TIMESTAMP
+                               + make_interval(secs => %s * power(2, LEAST(attempts - 1, 10))),
+                finished_at = CASE WHEN attempts >= %s THEN CURRENT_TIMESTAMP END,
+                leased_by = NULL,
+                lease_expires_at = NULL,
+                last_error = %s
+            WHERE url = %s AND status = 'running' AND leased_by = %s
+            ''', (SCRAPE_JOB_MAX_ATTEMPTS, SCRAPE_JOB_BACKOFF_SECONDS, SCRAPE_JOB_MAX_ATTEMPTS,
+                  str(error)[:1000], url, worker_id))
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"Error finishing scrape job {url}: {e}")
+    finally:
+        cur.close()
+        conn.close()
+
+def scrape_job_counts():
+    """Return {status: count} for the work queue."""
+    conn = None
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute('SELECT status, count(*) FROM scrape_jobs GROUP BY status')
+        counts = dict(cur.fetchall())
+        cur.close()
+        return counts
+    except Exception as e:
+        print(f"Error counting scrape jobs: {e}")
+        return {}
+    finally:
+        if conn:
+            conn.close()
+
+# States a URL can end a run in; anything else is picked up again by --resume
+RUN_URL_DONE_STATES = ('saved', 'unchanged')
+
+def create_scrape_runs_table():
+    """Create the run ledger: one row per scrape run and one per URL it covers."""
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute('''
+    CREATE TABLE IF NOT EXISTS scrape_runs (
+        id SERIAL PRIMARY KEY,
+        mode TEXT NOT NULL,
+        target_table TEXT NOT NULL DEFAULT 'properties',
+        status TEXT NOT NULL DEFAULT 'running',
+        url_count INTEGER NOT NULL DEFAULT 0,
+        stats JSONB,
+        started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        resumed_at TIMESTAMP,
+        finished_at TIMESTAMP
+    )
+    ''')
+    # Stage timings, bytes and peak memory from scraping.metrics
+    cur.execute('ALTER TABLE scrape_runs ADD COLUMN IF NOT EXISTS metrics JSONB')
+    cur.execute('''
+    CREATE TABLE IF NOT EXISTS scrape_run_urls (
+        run_id INTEGER NOT NULL REFERENCES scrape_runs(id) ON DELETE CASCADE,
+        url TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        state TEXT NOT NULL DEFAULT 'pending',
+        fetch_ms INTEGER,
+        fetched_at TIMESTAMP,
+        parsed_at TIMESTAMP,
+        finished_at TIMESTAMP,
+        error TEXT,
+        PRIMARY KEY (run_id, url)
+    )
+    ''')
     conn.commit()
     cur.close()
     conn.close()
 
+def start_scrape_run(mode, urls, target_table='properties'):
+    """Record a new run over ``urls`` and return its id.
+
+    Any earlier run left unfinished is marked abandoned, so --resume only
+    ever continues the newest one.
+    """
+    urls = list(dict.fromkeys(urls))
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute('''
+        UPDATE scrape_runs SET status = 'abandoned', finished_at = CURRENT_TIMESTAMP
+        WHERE status IN ('running', 'interrupted')
+        ''')
+        cur.execute('''
+        INSERT INTO scrape_runs (mode, target_table, url_count) VALUES (%s, %s, %s) RETURNING id
+        ''', (mode, target_table, len(urls)))
+        run_id = cur.fetchone()[0]
+        cur.execute('''
+        INSERT INTO scrape_run_urls (run_id, url, position)
+        SELECT %s, url, position FROM unnest(%s::text[]) WITH ORDINALITY AS u(url, position)
+        ''', (run_id, urls))
+        conn.commit()
+        return run_id
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+def load_resumable_scrape_run():
+    """Return the newest unfinished run with the URLs it has left, or None.
+
+    The result has the run's ``id``, ``mode``, ``target_table``, ``counts``
+    ({state: count}) and ``urls``: every URL not yet saved or found
+    unchanged, in the run's original order. Failed URLs are tried again.
+    """
+    conn = None
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute('''
+        SELECT id, mode, target_table FROM scrape_runs
+        WHERE status IN ('running', 'interrupted')
+        ORDER BY id DESC LIMIT 1
+        ''')
+        row = cur.fetchone()
+        if row is None:
+            cur.close()
+            return None
+        run = {'id': row[0], 'mode': row[1], 'target_table': row[2]}
+        cur.execute('SELECT state, count(*) FROM scrape_run_urls WHERE run_id = %s GROUP BY state', (run['id'],))
+        run['counts'] = dict(cur.fetchall())
+        cur.execute('''
+        SELECT url FROM scrape_run_urls
+        WHERE run_id = %s AND state <> ALL(%s)
+        ORDER BY position
+        ''', (run['id'], list(RUN_URL_DONE_STATES)))
+        run['urls'] = [url for url, in cur.fetchall()]
+        cur.execute('UPDATE scrape_runs SET resumed_at = CURRENT_TIMESTAMP WHERE id = %s', (run['id'],))
+        conn.commit()
+        cur.close()
+        return run
+    except Exception as e:
+        print(f"Error loading the last scrape run: {e}")
+        return None
+    finally:
+        if conn:
+            conn.close()
+
+def record_scrape_run_progress(run_id, updates):
+    """Checkpoint URL states for a run.
+
+    ``updates`` maps url -> {'state', 'error', 'fetch_ms', 'fetched_at',
+    'parsed_at', 'finished_at'}; missing values leave the stored ones alone.
+    """
+    if not updates:
+        return
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        # execute_values owns the only %s placeholder, so the run id is inlined
+        execute_values(cur, f'''
+        UPDATE scrape_run_urls AS r
+        SET state = v.state,
+            error = CASE WHEN v.state = 'failed' THEN v.error ELSE NULL END,
+            fetch_ms = COALESCE(v.fetch_ms, r.fetch_ms),
+            fetched_at = COALESCE(v.fetched_at, r.fetched_at),
+            parsed_at = COALESCE(v.parsed_at, r.parsed_at),
+            finished_at = COALESCE(v.finished_at, r.finished_at)
+        FROM (VALUES %s) AS v (url, state, error, fetch_ms, fetched_at, parsed_at, finished_at)
+        WHERE r.run_id = {int(run_id)} AND r.url = v.url
+        ''', [
+            (url, row['state'], row.get('error'), row.get('fetch_ms'),
+             row.get('fetched_at'), row.get('parsed_at'), row.get('finished_at'))
+            for url, row in updates.items()
+        ], template='(%s, %s, %s, %s::integer, %s::timestamp, %s::timestamp, %s::timestamp)')
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"Error checkpointing scrape run {run_id}: {e}")
+    finally:
+        cur.close()
+        conn.close()
+
+def finish_scrape_run(run_id, stats=None, metrics=None):
+    """Close a run, storing its counters and performance report.
+
+    It stays resumable (as 'interrupted') while any URL is unfinished.
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute('''
+        UPDATE scrape_runs
+        SET stats = %s,
+            metrics = COALESCE(%s, metrics),
+            finished_at = CURRENT_TIMESTAMP,
+            status = CASE WHEN EXISTS (
+                SELECT 1 FROM scrape_run_urls
+                WHERE run_id = %s AND state NOT IN ('saved', 'unchanged', 'failed')
+            ) THEN 'interrupted' ELSE 'finished' END
+        WHERE id = %s
+        RETURNING status
+        ''', (json.dumps(stats or {}), json.dumps(metrics) if metrics else None, run_id, run_id))
+        status = cur.fetchone()[0]
+        conn.commit()
+        return status
+    except Exception as e:
+        conn.rollback()
+        print(f"Error finishing scrape run {run_id}: {e}")
+        return None
+    finally:
+        cur.close()
+        conn.close()
+
+def load_ready_stats():
+    """Return {url: {'ready_ms': ..., 'samples': ...}} of page readiness timings."""
+    conn = None
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute('SELECT url, ready_ms, ready_samples FROM scrape_urls WHERE ready_ms IS NOT NULL')
+        stats = {url: {'ready_ms': ready_ms, 'samples': samples or 0} for url, ready_ms, samples in cur.fetchall()}
+        cur.close()
+        return stats
+    except Exception as e:
+        print(f"Error loading readiness stats: {e}")
+        return {}
+    finally:
+        if conn:
+            conn.close()
+
+def save_ready_stats(stats):
+    """Store the per-URL readiness timing averages."""
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.executemany('''
+        INSERT INTO scrape_urls (url, ready_ms, ready_samples)
+        VALUES (%s, %s, %s)
+        ON CONFLICT (url) DO UPDATE
+        SET ready_ms = EXCLUDED.ready_ms,
+            ready_samples = EXCLUDED.ready_samples
+        ''', [(url, s['ready_ms'], s['samples']) for url, s in stats.items()])
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"Error saving readiness stats: {e}")
+    finally:
+        cur.close()
+        conn.close()
+
+@contextmanager
+def advisory_lock(key, wait=True, timeout_ms=15000):
+    """Hold a Postgres advisory lock on ``key`` for the duration of the block.
+
+    Coordinates work across server processes. Yields True when the lock was
+    acquired; with ``wait=False`` it does not block and yields False if
+    another session holds the lock. Yields None when the lock could not be
+    taken at all (database unavailable, lock timeout) so callers can carry
+    on without it.
+    """
+    conn = None
+    acquired = None
+    try:
+        # A dedicated connection: the lock and lock_timeout are session state
+        # that must not outlive the block on a pooled connection
+        conn = psycopg2.connect(**DB_PARAMS)
+        conn.autocommit = True
+        cur = conn.cursor()
+        if wait:
+            cur.execute("SET lock_timeout = %s", (f"{timeout_ms}ms",))
+            cur.execute('SELECT pg_advisory_lock(hashtext(%s))', (key,))
+            acquired = True
+        else:
+            cur.execute('SELECT pg_try_advisory_lock(hashtext(%s))', (key,))
+            acquired = bool(cur.fetchone()[0])
+    except psycopg2.Error as e:
+        print(f"Could not take advisory lock for {key}: {e}")
+
+    try:
+        yield acquired
+    finally:
+        if conn:
+            try:
+                if acquired:
+                    conn.cursor().execute('SELECT pg_advisory_unlock(hashtext(%s))', (key,))
+            except psycopg2.Error as e:
+                print(f"Error releasing advisory lock for {key}: {e}")
+            conn.close()
+
+SHADOW_TABLE = 'properties_shadow'
+FOREIGN_KEY_PATTERN = re.compile(r'^FOREIGN KEY \((\w+)\) REFERENCES (?:\w+\.)?properties\((\w+)\)')
+INDEX_TABLE_PATTERN = re.compile(r' ON (?:ONLY )?(?:\w+\.)?properties ')
+
+def _properties_indexes(cur):
+    """Return (name, kind, definition) for every index of properties.
+
+    kind is 'p' or 'u' for primary key / unique constraints (definition is
+    the constraint clause) and 'i' for plain indexes (a CREATE INDEX).
+    """
+    cur.execute('''
+    SELECT conname, contype, pg_get_constraintdef(oid)
+    FROM pg_constraint
+    WHERE conrelid = 'properties'::regclass AND contype IN ('p', 'u')
+    ''')
+    indexes = cur.fetchall()
+    cur.execute('''
+    SELECT i.relname, 'i', pg_get_indexdef(x.indexrelid)
+    FROM pg_index x
+    JOIN pg_class i ON i.oid = x.indexrelid
+    WHERE x.indrelid = 'properties'::regclass
+      AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid)
+    ''')
+    return indexes + cur.fetchall()
+
+def _build_shadow_index(cur, name, kind, definition):
+    if kind == 'i':
+        definition = definition.replace(f' {name} ON ', f' {name}_shadow ON ', 1)
+        cur.execute(INDEX_TABLE_PATTERN.sub(f' ON {SHADOW_TABLE} ', definition, count=1))
+    else:
+        cur.execute(f'ALTER TABLE {SHADOW_TABLE} ADD CONSTRAINT {name}_shadow {definition}')
+
+def create_shadow_properties_table(keep_existing=False):
+    """Start a full refresh: create an empty copy of properties to load listings into.
+
+    Only the unique constraints are built up front (the upsert needs the one
+    on url); the primary key and other indexes are built by
+    swap_shadow_properties once the load is done. With ``keep_existing`` a
+    shadow table left by an interrupted refresh is kept as it is. Returns
+    True if a new, empty table was created.
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        if keep_existing:
+            cur.execute('SELECT to_regclass(%s)', (SHADOW_TABLE,))
+            if cur.fetchone()[0] is not None:
+                return False
+        cur.execute(f'DROP TABLE IF EXISTS {SHADOW_TABLE}')
+        # Shares the id sequence through the copied default, so new ids never clash with live ones
+        cur.execute(f'CREATE TABLE {SHADOW_TABLE} (LIKE properties INCLUDING DEFAULTS INCLUDING CONSTRAINTS) WITH (fillfactor = 90)')
+        for name, kind, definition in _properties_indexes(cur):
+            if kind == 'u':
+                _build_shadow_index(cur, name, kind, definition)
+        conn.commit()
+        return True
+    finally:
+        cur.close()
+        conn.close()
+
+def _carry_over_ids(cur, changed_only=False):
+    """Give shadow rows the id (and first-seen data) of the live row with the same url."""
+    cur.execute(f'''
+    UPDATE {SHADOW_TABLE} s
+    SET id = p.id,
+        created_at = p.created_at,
+        map_image_url = COALESCE(s.map_image_url, p.map_image_url)
+    FROM properties p
+    WHERE p.url = s.url {'AND s.id <> p.id' if changed_only else ''}
+    ''')
+
+def drop_shadow_properties_table():
+    """Abandon a full refresh."""
+    conn = get_connection()
+    conn.autocommit = True
+    try:
+        conn.cursor().execute(f'DROP TABLE IF EXISTS {SHADOW_TABLE}')
+    finally:
+        conn.close()
+
+def swap_shadow_properties(min_ratio=None):
+    """Finish a full refresh by swapping the shadow table in for properties.
+
+    Ids of listings that still exist are carried over, so saved listings keep
+    pointing at the same property; saved rows for listings that are gone are
+    removed, as the ON DELETE CASCADE would have. Indexes are built before any
+    lock is taken. The swap itself is one short transaction of renames,
+    retried if the lock cannot be had within FULL_REFRESH_LOCK_TIMEOUT_MS, so
+    readers see either the old or the new table and never wait long.
+
+    The swap is abandoned when the shadow table holds fewer than
+    ``min_ratio`` times the live rows (e.g. the site was down mid-refresh).
+    Returns True when the new table is live.
+    """
+    min_ratio = FULL_REFRESH_MIN_RATIO if min_ratio is None else min_ratio
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(f'SELECT count(*) FROM {SHADOW_TABLE}')
+        shadow_rows = cur.fetchone()[0]
+        cur.execute('SELECT count(*) FROM properties')
+        live_rows = cur.fetchone()[0]
+        if not shadow_rows or shadow_rows < live_rows * min_ratio:
+            print(f"Full refresh loaded {shadow_rows} listing(s) against {live_rows} live; keeping the live table")
+            cur.execute(f'DROP TABLE {SHADOW_TABLE}')
+            conn.commit()
+            return False
+
+        indexes = _properties_indexes(cur)
+        _carry_over_ids(cur)
+        for name, kind, definition in indexes:
+            if kind != 'u':
+                _build_shadow_index(cur, name, kind, definition)
+        cur.execute(f'ANALYZE {SHADOW_TABLE}')
+        conn.commit()
+
+        foreign_keys = []
+        for attempt in range(1, FULL_REFRESH_SWAP_ATTEMPTS + 1):
+            try:
+                cur.execute('SET LOCAL lock_timeout = %s', (f'{FULL_REFRESH_LOCK_TIMEOUT_MS}ms',))
+                cur.execute('LOCK TABLE properties IN ACCESS EXCLUSIVE MODE')
+                # Listings added to the live table since the load started
+                _carry_over_ids(cur, changed_only=True)
+                cur.execute("SELECT pg_get_serial_sequence('properties', 'id')")
+                sequence = cur.fetchone()[0]
+                cur.execute('''
+                SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid)
+                FROM pg_constraint
+                WHERE confrelid = 'properties'::regclass AND contype = 'f'
+                ''')
+                foreign_keys = cur.fetchall()
+                for table, name, definition in foreign_keys:
+                    match = FOREIGN_KEY_PATTERN.match(definition)
+                    if match:
+                        column, referenced = match.groups()
+                        cur.execute(f'''
+                        DELETE FROM {table} t
+                        WHERE NOT EXISTS (SELECT 1 FROM {SHADOW_TABLE} s WHERE s.{referenced} = t.{column})
+                        ''')
+                    cur.execute(f'ALTER TABLE {table} DROP CONSTRAINT {name}')
+
+                for name, kind, _ in indexes:
+                    if kind == 'i':
+                        cur.execute(f'ALTER INDEX {name} RENAME TO {name}_old')
+                        cur.execute(f'ALTER INDEX {name}_shadow RENAME TO {name}')
+                    else:
+                        cur.execute(f'ALTER TABLE properties RENAME CONSTRAINT {name} TO {name}_old')
+                        cur.execute(f'ALTER TABLE {SHADOW_TABLE} RENAME CONSTRAINT {name}_shadow TO {name}')
+                cur.execute('ALTER TABLE properties RENAME TO properties_old')
+                cur.execute(f'ALTER TABLE {SHADOW_TABLE} RENAME TO properties')
+                if sequence:
+                    # Otherwise dropping the old table would drop the id sequence with it
+                    cur.execute(f'ALTER SEQUENCE {sequence} OWNED BY properties.id')
+                for table, name, definition in foreign_keys:
+                    # NOT VALID skips the scan under the lock; validated below
+                    cur.execute(f'ALTER TABLE {table} ADD CONSTRAINT {name} {definition} NOT VALID')
+                conn.commit()
+                break
+            except psycopg2.OperationalError as e:
+                conn.rollback()
+                if e.pgcode != '55P03' or attempt == FULL_REFRESH_SWAP_ATTEMPTS:
+                    raise
+                print(f"Properties table busy, retrying the swap ({attempt}/{FULL_REFRESH_SWAP_ATTEMPTS})")
+                time.sleep(attempt)
+
+        # Both only lock the old table or allow concurrent reads and writes
+        for table, name, _ in foreign_keys:
+            cur.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {name}')
+        cur.execute('DROP TABLE properties_old')
+        conn.commit()
+        print(f"Full refresh swapped in {shadow_rows} listing(s), replacing {live_rows}")
+        return True
+    except Exception as e:
+        conn.rollback()
+        print(f"Error swapping in the refreshed properties table: {e}")
+        return False
+    finally:
+        cur.close()
+        conn.close()
+
 def truncate_properties_table():
-    """Truncate the properties table before starting a new scrape."""
+    """Truncate the properties table before starting a new scrape.
+
+    Empties the listings page and cascades into saved_listings while it runs;
+    full refreshes use create_shadow_properties_table / swap_shadow_properties.
+    """
     conn = None # Initialize conn to None
     try:
-        conn = psycopg2.connect(**DB_PARAMS)
+        conn = get_connection()
         cur = conn.cursor()
         print("Truncating properties table...")
         cur.execute('TRUNCATE TABLE properties RESTART IDENTITY CASCADE;')
@@ -48,40 +957,348 @@ def truncate_properties_table():
             cur.close()
             conn.close()
 
-def save_to_database(listings):
-    conn = psycopg2.connect(**DB_PARAMS)
+def validate_listing(listing):
+    """Return the reason a listing cannot be saved, or None if it is valid."""
+    if not isinstance(listing, dict):
+        return "not a listing dict"
+    if not listing.get('url') or not str(listing['url']).startswith(('http://', 'https://')):
+        return "missing or invalid url"
+    if not listing.get('title'):
+        return "missing title"
+    for column in INTEGER_COLUMNS:
+        value = listing.get(column)
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, int) or not 0 <= value < 2 ** 31:
+            return f"{column} is not a valid count: {value!r}"
+    for column in ARRAY_COLUMNS:
+        value = listing.get(column)
+        if value is not None and not (isinstance(value, (list, tuple)) and all(isinstance(v, str) for v in value)):
+            return f"{column} is not a list of strings"
+    for column in FLOAT_COLUMNS:
+        value = listing.get(column)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))
+                                  or not math.isfinite(value)):
+            return f"{column} is not a number: {value!r}"
+    for column in set(LISTING_COLUMNS) - INTEGER_COLUMNS - ARRAY_COLUMNS - FLOAT_COLUMNS:
+        value = listing.get(column)
+        if value is not None and not isinstance(value, str):
+            return f"{column} is not text"
+    return None
+
+def listing_row_hash(listing):
+    """Hash of the columns save_to_database writes for a listing."""
+    values = [listing.get(column) for column in LISTING_COLUMNS]
+    return hashlib.md5(json.dumps(values, ensure_ascii=False, default=str).encode('utf-8')).hexdigest()
+
+def _count_writes(stats, written, total):
+    """Add one save's outcome to ``stats``: inserted, updated, touched (last seen only) and unchanged."""
+    if stats is None:
+        return
+    for key in ('inserted', 'updated', 'touched', 'unchanged'):
+        stats.setdefault(key, 0)
+    for _, inserted, changed in written:
+        stats['inserted' if inserted else 'updated' if changed else 'touched'] += 1
+    stats['unchanged'] += total - len(written)
+
+def _copy_text(value):
+    """Escape a text value for COPY's text format."""
+    return (value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+            .replace('\r', '\\r').replace('\x00', ''))
+
+def _copy_array(values):
+    """Format a list of strings as a Postgres array literal."""
+    return '{' + ','.join('"' + v.replace('\\', '\\\\').replace('"', '\\"') + '"' for v in values) + '}'
+
+def _copy_row(seq, listing):
+    fields = [str(seq)]
+    for column in LISTING_COLUMNS:
+        value = listing.get(column)
+        if value is None:
+            fields.append('\\N')
+        elif column in ARRAY_COLUMNS:
+            fields.append(_copy_text(_copy_array(value)))
+        elif column in INTEGER_COLUMNS:
+            fields.append(str(value))
+        elif column in FLOAT_COLUMNS:
+            fields.append(repr(float(value)))
+        else:
+            fields.append(_copy_text(value))
+    fields.append('t' if 'amenities' in listing else 'f')
+    fields.append(listing_row_hash(listing))
+    return '\t'.join(fields) + '\n'
+
+def save_to_database(listings, stats=None, table='properties'):
+    """Upsert a batch of listings into properties in one transaction. Returns the URLs that were saved.
+
+    Valid listings are COPYed into a temporary staging table and merged with
+    a single INSERT ... ON CONFLICT; when a URL appears more than once in the
+    batch the last occurrence wins. Rows whose content hash is unchanged are
+    not rewritten. Listings that fail validation are written to
+    property_rejects instead of aborting the batch. If the bulk path fails as
+    a whole, the batch is retried one row at a time.
+
+    If ``stats`` is given, the inserted / updated / touched / unchanged /
+    rejected counts are added to it. ``table`` is the table written to
+    (the shadow table during a full refresh).
+    """
+    rows, rejects = [], []
+    for listing in listings:
+        if isinstance(listing, dict):
+            listing = normalize_listing(listing)
+        reason = validate_listing(listing)
+        if reason:
+            rejects.append(listing)
+            print(f"Rejected listing {listing.get('url') if isinstance(listing, dict) else listing!r}: {reason}")
+        else:
+            rows.append(listing)
+    if not rows and not rejects:
+        return []
+
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        saved = []
+        if rows:
+            cur.execute('''
+            CREATE TEMP TABLE properties_staging (
+                seq INTEGER,
+                title TEXT,
+                price TEXT,
+                location TEXT,
+                url TEXT,
+                bedrooms INTEGER,
+                image_url TEXT,
+                map_image_url TEXT,
+                amenities TEXT[],
+                description TEXT,
+                availability TEXT,
+                bathrooms INTEGER,
+                photos TEXT[],
+                price_cents INTEGER,
+                price_period TEXT,
+                price_per_bedroom INTEGER,
+                price_monthly_cents INTEGER,
+                latitude DOUBLE PRECISION,
+                longitude DOUBLE PRECISION,
+                distance_miles REAL,
+                walk_minutes REAL,
+                has_details BOOLEAN,
+                row_hash TEXT
+            ) ON COMMIT DROP
+            ''')
+            buffer = io.StringIO(''.join(_copy_row(seq, listing) for seq, listing in enumerate(rows)))
+            cur.copy_expert(
+                f"COPY properties_staging (seq, {', '.join(LISTING_COLUMNS)}, has_details, row_hash) FROM STDIN",
+                buffer
+            )
+            cur.execute(f'''
+            INSERT INTO {table} AS properties (title, price, location, url, bedrooms, image_url, map_image_url,
+                                               amenities, description, availability, bathrooms, photos,
+                                               price_cents, price_period, price_per_bedroom, price_monthly_cents,
+                                               latitude, longitude, distance_miles, walk_minutes,
+                                               details_scraped_at, row_hash)
+            SELECT DISTINCT ON (url)
+                   title, price, location, url, bedrooms, image_url, map_image_url,
+                   amenities, description, availability, bathrooms, photos,
+                   price_cents, price_period, price_per_bedroom, price_monthly_cents,
+                   latitude, longitude, distance_miles, walk_minutes,
+                   CASE WHEN has_details THEN CURRENT_TIMESTAMP END, row_hash
+            FROM properties_staging
+            ORDER BY url, seq DESC
+            ''' + UPSERT_CONFLICT_SQL, (LAST_SEEN_REFRESH_SECONDS,))
+            written = cur.fetchall()
+            # Every staged row is stored once the merge commits, written or not
+            saved = list(dict.fromkeys(listing['url'] for listing in rows))
+            _count_writes(stats, written, len(saved))
+        if rejects:
+            execute_values(cur, '''
+            INSERT INTO property_rejects (url, reason, listing) VALUES %s
+            ''', [
+                (listing.get('url') if isinstance(listing, dict) else None,
+                 validate_listing(listing),
+                 json.dumps(listing, default=str))
+                for listing in rejects
+            ])
+        conn.commit()
+        if stats is not None:
+            stats['rejected'] = stats.get('rejected', 0) + len(rejects)
+        return saved
+    except Exception as e:
+        conn.rollback()
+        print(f"Bulk save of {len(rows)} listing(s) failed, saving row by row: {e}")
+        return save_listings_row_by_row(rows, stats, table)
+    finally:
+        cur.close()
+        conn.close()
+
+def save_listings_row_by_row(listings, stats=None, table='properties'):
+    """Upsert listings one statement and one commit at a time. Returns the URLs that were saved.
+
+    The original write path, kept as the fallback for save_to_database and as
+    the baseline in benchmarks/save_benchmark.py.
+    """
+    conn = get_connection()
     cur = conn.cursor()
+    saved = []
+    written = []
     for listing in listings:
         try:
-            cur.execute('''
-            INSERT INTO properties (title, price, location, url, bedrooms, image_url, map_image_url)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (url) DO UPDATE 
-            SET title = EXCLUDED.title,
-                price = EXCLUDED.price,
-                location = EXCLUDED.location,
-                bedrooms = EXCLUDED.bedrooms,
-                image_url = EXCLUDED.image_url,
-                map_image_url = EXCLUDED.map_image_url
-            ''', (
+            listing = normalize_listing(listing)
+            cur.execute(f'''
+            INSERT INTO {table} AS properties (title, price, location, url, bedrooms, image_url, map_image_url,
+                                               amenities, description, availability, bathrooms, photos,
+                                               price_cents, price_period, price_per_bedroom, price_monthly_cents,
+                                               latitude, longitude, distance_miles, walk_minutes,
+                                               details_scraped_at, row_hash)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
+                    CASE WHEN %s THEN CURRENT_TIMESTAMP END, %s)
+            ''' + UPSERT_CONFLICT_SQL, (
                 listing['title'],
                 listing['price'],
                 listing['location'],
                 listing['url'],
                 listing['bedrooms'],
                 listing.get('image_url'),
-                listing.get('map_image_url')
+                listing.get('map_image_url'),
+                listing.get('amenities'),
+                listing.get('description'),
+                listing.get('availability'),
+                listing.get('bathrooms'),
+                listing.get('photos'),
+                listing.get('price_cents'),
+                listing.get('price_period'),
+                listing.get('price_per_bedroom'),
+                listing.get('price_monthly_cents'),
+                listing.get('latitude'),
+                listing.get('longitude'),
+                listing.get('distance_miles'),
+                listing.get('walk_minutes'),
+                'amenities' in listing,
+                listing_row_hash(listing),
+                LAST_SEEN_REFRESH_SECONDS
             ))
+            written.extend(cur.fetchall())
             conn.commit()
+            saved.append(listing['url'])
         except Exception as e:
             conn.rollback()
-            print(f"Error saving {listing['title']}: {e}")
+            print(f"Error saving {listing.get('title')}: {e}")
     cur.close()
     conn.close()
+    _count_writes(stats, written, len(saved))
+    return saved
+
+def save_property_details(url, details):
+    """Store the detail fields of one listing and stamp when they were scraped."""
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute('''
+        UPDATE properties
+        SET amenities = %s,
+            description = %s,
+            availability = %s,
+            bathrooms = %s,
+            photos = %s,
+            details_scraped_at = CURRENT_TIMESTAMP
+        WHERE url = %s
+        RETURNING details_scraped_at
+        ''', (
+            details.get('amenities'),
+            details.get('description'),
+            details.get('availability'),
+            details.get('bathrooms'),
+            details.get('photos'),
+            url
+        ))
+        row = cur.fetchone()
+        conn.commit()
+        return row[0] if row else None
+    except Exception as e:
+        conn.rollback()
+        print(f"Error saving details for {url}: {e}")
+        return None
+    finally:
+        cur.close()
+        conn.close()
+
+# Columns scraping/normalize.py derives, with their SQL types, in the order
+# update_normalized_columns takes them
+NORMALIZED_COLUMNS = [
+    ('bedrooms', 'integer'), ('price_cents', 'integer'), ('price_period', 'text'),
+    ('price_per_bedroom', 'integer'), ('price_monthly_cents', 'integer'),
+    ('latitude', 'double precision'), ('longitude', 'double precision'),
+    ('distance_miles', 'real'), ('walk_minutes', 'real'),
+]
+
+def normalized_values(row_id, listing):
+    """The update_normalized_columns row for a normalised listing."""
+    return (row_id,) + tuple(listing[column] for column, _ in NORMALIZED_COLUMNS)
+
+def update_normalized_columns(cur, rows):
+    """Write normalised values for existing rows in one UPDATE ... FROM (VALUES ...).
+
+    ``rows`` are (id, *NORMALIZED_COLUMNS) tuples, as built by
+    normalized_values. Only rows whose values actually change are rewritten.
+    Runs on the caller's cursor and transaction; returns the number of rows
+    updated.
+    """
+    if not rows:
+        return 0
+    columns = [column for column, _ in NORMALIZED_COLUMNS]
+    execute_values(cur, f'''
+    UPDATE properties AS p
+    SET {', '.join(f'{column} = v.{column}' for column in columns)}
+    FROM (VALUES %s) AS v (id, {', '.join(columns)})
+    WHERE p.id = v.id
+      AND ({' OR '.join(f'p.{column} IS DISTINCT FROM v.{column}' for column in columns)})
+    ''', rows, template='(%s, ' + ', '.join(f'%s::{kind}' for _, kind in NORMALIZED_COLUMNS) + ')',
+        page_size=len(rows))
+    return cur.rowcount
+
+def backfill_normalized_columns(batch_size=1000):
+    """Run scraping/normalize.py over rows saved before it (or before its current rules).
+
+    Fills bedrooms missing from the page, the price_* columns, the
+    coordinates and distance to campus and the walking time, so run it
+    again after replacing the gazetteer or the street graph. Walks
+    properties in id order, one batch and one commit at a time, and only
+    rewrites rows whose values change, so it is safe to run again. Returns the number of rows updated.
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+    updated = 0
+    last_id = 0
+    try:
+        while True:
+            cur.execute('''
+            SELECT id, title, price, bedrooms, location FROM properties WHERE id > %s ORDER BY id LIMIT %s
+            ''', (last_id, batch_size))
+            rows = cur.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            values = [
+                normalized_values(row_id, normalize_listing(
+                    {'title': title, 'price': price, 'bedrooms': bedrooms, 'location': location}
+                ))
+                for row_id, title, price, bedrooms, location in rows
+            ]
+            updated += update_normalized_columns(cur, values)
+            conn.commit()
+        print(f"Backfilled normalised columns on {updated} row(s)")
+        return updated
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
 
 def delete_listing_by_title(title):
     """Delete a listing from the database by its title"""
-    conn = psycopg2.connect(**DB_PARAMS)
+    conn = get_connection()
     cur = conn.cursor()
     try:
         cur.execute('''
@@ -0,0 +1,257 @@
+"""
+# Database Connection Pool
+# This file provides:
+# - One thread-safe pool of Postgres connections per process, shared by
+#   config/db.py, the scraper and every Flask blueprint
+# - Checkout with a bounded wait, a health check on connections that sat
+#   idle, and recycling of connections older than DB_POOL_MAX_LIFETIME_SECONDS
+# - Wait-time and usage counters, exported on the server's /metrics
+"""
+
+import os
+import time
+import threading
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+
+from .configuration import (
+    DB_PARAMS, DB_POOL_MIN, DB_POOL_MAX, DB_POOL_TIMEOUT_SECONDS, DB_POOL_MAX_LIFETIME_SECONDS,
+    DB_POOL_HEALTH_CHECK_SECONDS
+)
+
+
+class PoolTimeout(PoolError):
+    """No connection came free within DB_POOL_TIMEOUT_SECONDS."""
+
+
+class PooledConnection:
+    """A connection checked out of the pool.
+
+    Behaves like the psycopg2 connection it wraps, except that close() hands
+    it back to the pool, so code written against psycopg2.connect works
+    unchanged. A wrapper dropped without close() is returned when it is
+    garbage collected. After defer_close(), close() does nothing and only
+    release() returns the connection; request-scoped connections use this
+    so helpers that close "their" connection cannot pull it from under the
+    handler.
+    """
+
+    def __init__(self, pool, conn):
+        object.__setattr__(self, '_pool', pool)
+        object.__setattr__(self, '_conn', conn)
+        object.__setattr__(self, '_deferred', False)
+
+    def __getattr__(self, name):
+        conn = self._conn
+        if conn is None:
+            raise psycopg2.InterfaceError("connection already returned to the pool")
+        return getattr(conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+    @property
+    def released(self):
+        return self._conn is None
+
+    @property
+    def closed(self):
+        return 1 if self._conn is None else self._conn.closed
+
+    def defer_close(self):
+        object.__setattr__(self, '_deferred', True)
+
+    def close(self):
+        if not self._deferred:
+            self.release()
+
+    def release(self):
+        """Return the connection to the pool now."""
+        conn = self._conn
+        if conn is not None:
+            object.__setattr__(self, '_conn', None)
+            self._pool.release(conn)
+
+    def __del__(self):
+        try:
+            self.release()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """psycopg2's ThreadedConnectionPool with waiting, health checks and recycling.
+
+    At most ``maxconn`` connections are open; callers beyond that wait up to
+    ``timeout`` seconds for one to come back rather than failing at once.
+    A connection idle for longer than ``health_check`` seconds is pinged
+    before it is handed out, and one older than ``max_lifetime`` seconds is
+    closed and replaced, so restarts and failovers on the database side are
+    never seen by a request. Returned connections are rolled back and put
+    back in their default (non-autocommit) mode.
+    """
+
+    def __init__(self, params=None, minconn=None, maxconn=None, timeout=None, max_lifetime=None,
+                 health_check=None):
+        self.params = dict(params or DB_PARAMS)
+        self.maxconn = max(1, maxconn or DB_POOL_MAX)
+        self.minconn = min(self.maxconn, DB_POOL_MIN if minconn is None else minconn)
+        self.timeout = DB_POOL_TIMEOUT_SECONDS if timeout is None else timeout
+        self.max_lifetime = max_lifetime or DB_POOL_MAX_LIFETIME_SECONDS
+        self.health_check = DB_POOL_HEALTH_CHECK_SECONDS if health_check is None else health_check
+        self._pool = None
+        self._slots = threading.BoundedSemaphore(self.maxconn)
+        self._opened_at = {}
+        self._used_at = {}
+        self._lock = threading.Lock()
+        self.stats = {'checkouts': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0, 'timeouts': 0,
+                      'opened': 0, 'recycled': 0, 'failed_checks': 0, 'in_use': 0}
+
+    def _raw_pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadedConnectionPool(self.minconn, self.maxconn, **self.params)
+        return self._pool
+
+    def _discard(self, conn):
+        with self._lock:
+            self._opened_at.pop(id(conn), None)
+            self._used_at.pop(id(conn), None)
+        try:
+            self._raw_pool().putconn(conn, close=True)
+        except PoolError:
+            pass
+
+    def _healthy_connection(self):
+        raw = self._raw_pool()
+        # Every stale connection is replaced, so this ends within maxconn + 1 tries
+        for _ in range(self.maxconn + 1):
+            conn = raw.getconn()
+            now = time.monotonic()
+            with self._lock:
+                if id(conn) not in self._opened_at:
+                    self._opened_at[id(conn)] = now
+                    self._used_at[id(conn)] = now
+                    self.stats['opened'] += 1
+                opened_at = self._opened_at[id(conn)]
+                used_at = self._used_at[id(conn)]
+            if conn.closed or now - opened_at > self.max_lifetime:
+                with self._lock:
+                    self.stats['recycled'] += 1
+                self._discard(conn)
+                continue
+            if now - used_at > self.health_check:
+                try:
+                    cur = conn.cursor()
+                    cur.execute('SELECT 1')
+                    cur.close()
+                    conn.rollback()
+                except psycopg2.Error:
+                    with self._lock:
+                        self.stats['failed_checks'] += 1
+                    self._discard(conn)
+                    continue
+            return conn
+        raise PoolError("could not get a healthy database connection")
+
+    def checkout(self):
+        """Return a PooledConnection, waiting up to ``timeout`` seconds for one to be free."""
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self.stats['timeouts'] += 1
+            raise PoolTimeout(f"no database connection free after {self.timeout:g}s "
+                              f"({self.maxconn} in use)")
+        waited = time.monotonic() - started
+        try:
+            conn = self._healthy_connection()
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.stats['checkouts'] += 1
+            self.stats['wait_seconds'] += waited
+            self.stats['max_wait_seconds'] = max(self.stats['max_wait_seconds'], waited)
+            self.stats['in_use'] += 1
+        return PooledConnection(self, conn)
+
+    def release(self, conn):
+        """Take a connection back: roll back anything left open and reset it for the next user."""
+        discard = bool(conn.closed)
+        if not discard:
+            try:
+                status = conn.info.transaction_status
+                if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                    discard = True
+                else:
+                    if status != extensions.TRANSACTION_STATUS_IDLE:
+                        conn.rollback()
+                    if conn.autocommit:
+                        conn.autocommit = False
+            except psycopg2.Error:
+                discard = True
+        with self._lock:
+            self.stats['in_use'] -= 1
+            opened_at = self._opened_at.get(id(conn))
+            if opened_at is not None and time.monotonic() - opened_at > self.max_lifetime:
+                discard = True
+                self.stats['recycled'] += 1
+            if not discard:
+                self._used_at[id(conn)] = time.monotonic()
+        try:
+            if discard:
+                self._discard(conn)
+            else:
+                self._raw_pool().putconn(conn)
+        finally:
+            self._slots.release()
+
+    def snapshot(self):
+        """Counters plus the current number of open and idle connections."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['open'] = len(self._opened_at)
+        stats['idle'] = stats['open'] - stats['in_use']
+        stats['max'] = self.maxconn
+        return stats
+
+    def close_all(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._opened_at.clear()
+            self._used_at.clear()
+        if pool is not None:
+            pool.closeall()
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+# Pools inherited across a fork. Never closed or collected in the child, as
+# that would end the parent's sessions on the shared sockets
+_inherited = []
+
+
+def get_pool():
+    """Return this process's pool, creating it on first use (and afresh after a fork)."""
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                if _pool is not None:
+                    _inherited.append(_pool)
+                _pool = ConnectionPool()
+                _pool_pid = os.getpid()
+    return _pool
+
+
+def get_connection():
+    """Check a connection out of the shared pool. close() returns it."""
+    return get_pool().checkout()
+
+
+def pool_stats():
+    return get_pool().snapshot()
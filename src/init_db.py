@@ -6,6 +6,11 @@ import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 import os
 
+try:
+    from config.configuration import DB_PARAMS as SHARED_DB_PARAMS
+except ImportError:
+    from src.config.configuration import DB_PARAMS as SHARED_DB_PARAMS
+
 # Database connection parameters for development
 DEV_DB_PARAMS = {
     'host': os.environ.get('POSTGRES_HOST', 'host.docker.internal'),  # Use environment variable or fallback
@@ -14,13 +19,8 @@ DEV_DB_PARAMS = {
     'password': os.environ.get('POSTGRES_PASSWORD', 'team13')  # Use environment variable or fallback
 }
 
-# Database connection parameters for production (Docker)
-PROD_DB_PARAMS = {
-    'host': 'database',
-    'database': 'test_db',
-    'user': 'postgres',
-    'password': 'team13'
-}
+# Database connection parameters for production (Docker), shared with the app
+PROD_DB_PARAMS = SHARED_DB_PARAMS
 
 # Choose parameters based on environment
 DB_PARAMS = DEV_DB_PARAMS if os.environ.get('FLASK_ENV') != 'production' else PROD_DB_PARAMS
@@ -75,6 +75,37 @@ def init_db():
         )
         ''')
         
+        # Listing details stored at scrape time
+        cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS amenities TEXT[]')
+        cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS description TEXT')
+        cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS availability TEXT')
+        cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS bathrooms INTEGER')
+        cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS photos TEXT[]')
+        cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS details_scraped_at TIMESTAMP')
+        cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS row_hash TEXT')
+        cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP')
+        cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS last_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP')
+        
+        # Normalised price filled at ingest, indexed for the listings filters and sorts
+        cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS price_cents INTEGER')
+        cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS price_period TEXT')
+        cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS price_per_bedroom INTEGER')
+        cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS price_monthly_cents INTEGER')
+        cur.execute('DROP INDEX IF EXISTS properties_price_cents_idx')
+        cur.execute('DROP INDEX IF EXISTS properties_bedrooms_price_cents_idx')
+        cur.execute('CREATE INDEX IF NOT EXISTS properties_price_monthly_cents_idx ON properties (price_monthly_cents, id)')
+        cur.execute('CREATE INDEX IF NOT EXISTS properties_bedrooms_price_monthly_cents_idx '
+                    'ON properties (bedrooms, price_monthly_cents)')
+        
+        # Coordinates from the offline geocoder and the indexed distance to campus
+        cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION')
+        cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION')
+        cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS distance_miles REAL')
+        cur.execute('CREATE INDEX IF NOT EXISTS properties_distance_miles_idx ON properties (distance_miles, id)')
+        cur.execute('ALTER TABLE properties ADD COLUMN IF NOT EXISTS walk_minutes REAL')
+        cur.execute('CREATE INDEX IF NOT EXISTS properties_walk_minutes_idx ON properties (walk_minutes, id)')
+        cur.execute('ALTER TABLE properties SET (fillfactor = 90)')
+        
         # Create student table
         cur.execute('''
         CREATE TABLE IF NOT EXISTS student (
@@ -7,27 +7,77 @@ This script:
 3. Updates the PostgreSQL database with the data
 """
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
 import re
 import time
-import requests
 import os
 import sys
-from urllib.parse import urljoin
+import pstats
+import cProfile
+import argparse
+import tracemalloc
+from functools import partial
 
 # Import directly for Docker environment
 try:
-    from config.db import create_properties_table, save_to_database
+    from config.configuration import (
+        HTTP_POOL_SIZE, SCRAPE_MODE, WIX_DATA_MODE, SCRAPE_JOB_BATCH_SIZE, SCRAPE_JOB_POLL_SECONDS,
+        THROTTLE_MAX_CONCURRENCY, METRICS_FILE, PROFILE_DIR
+    )
+    from config.db import (
+        SHADOW_TABLE, backfill_normalized_columns, create_properties_table, create_scrape_jobs_table,
+        create_scrape_runs_table, create_scrape_urls_table, create_shadow_properties_table, enqueue_scrape_jobs,
+        finish_scrape_run, load_resumable_scrape_run, mark_urls_fetched, save_to_database, scrape_job_counts,
+        start_scrape_run, swap_shadow_properties
+    )
+    from scraping.amenities import classify_amenities
+    from scraping.archive import PageArchive, open_archive, read_blob
+    from scraping.discovery import discover_listings
+    from scraping.driver_pool import DriverPool
+    from scraping.fetch_strategy import FetchStrategy, get_session
+    from scraping.pipeline import ListingPipeline
+    from scraping.metrics import RunMetrics, count, measure, record, stage, write_prometheus_file
+    from scraping.metrics import print_report as print_metrics_report
+    from scraping.listing_parser import (
+        parse_document, find_amenities, find_availability, find_bathrooms, find_bedrooms, find_description,
+        find_photos, find_price, select_image
+    )
+    from scraping.readiness import NetworkMonitor, ReadinessTracker
+    from scraping.resource_policy import ResourcePolicy
+    from scraping.run_ledger import RunLedger
+    from scraping.throttle import get_throttle
+    from scraping.wix_data import NetworkPayloadCapture, extract_listing_data
+    from scraping.work_queue import JobLeases
 except ImportError:
     # Fallback for local development
     sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-    from src.config.db import create_properties_table, save_to_database
+    from src.config.configuration import (
+        HTTP_POOL_SIZE, SCRAPE_MODE, WIX_DATA_MODE, SCRAPE_JOB_BATCH_SIZE, SCRAPE_JOB_POLL_SECONDS,
+        THROTTLE_MAX_CONCURRENCY, METRICS_FILE, PROFILE_DIR
+    )
+    from src.config.db import (
+        SHADOW_TABLE, backfill_normalized_columns, create_properties_table, create_scrape_jobs_table,
+        create_scrape_runs_table, create_scrape_urls_table, create_shadow_properties_table, enqueue_scrape_jobs,
+        finish_scrape_run, load_resumable_scrape_run, mark_urls_fetched, save_to_database, scrape_job_counts,
+        start_scrape_run, swap_shadow_properties
+    )
+    from src.scraping.amenities import classify_amenities
+    from src.scraping.archive import PageArchive, open_archive, read_blob
+    from src.scraping.discovery import discover_listings
+    from src.scraping.driver_pool import DriverPool
+    from src.scraping.fetch_strategy import FetchStrategy, get_session
+    from src.scraping.pipeline import ListingPipeline
+    from src.scraping.metrics import RunMetrics, count, measure, record, stage, write_prometheus_file
+    from src.scraping.metrics import print_report as print_metrics_report
+    from src.scraping.listing_parser import (
+        parse_document, find_amenities, find_availability, find_bathrooms, find_bedrooms, find_description,
+        find_photos, find_price, select_image
+    )
+    from src.scraping.readiness import NetworkMonitor, ReadinessTracker
+    from src.scraping.resource_policy import ResourcePolicy
+    from src.scraping.run_ledger import RunLedger
+    from src.scraping.throttle import get_throttle
+    from src.scraping.wix_data import NetworkPayloadCapture, extract_listing_data
+    from src.scraping.work_queue import JobLeases
 
 BASE_URL = "https://www.binghamtonwest.com"
 BEDROOM_CATEGORIES = {
@@ -60,406 +110,350 @@ def format_address_from_url(url_path):
     
     return formatted_address
 
-def fetch_property_listings():
-    """Fetch and parse property listings from Binghamton West using Selenium."""
-    print(f"Fetching property listings from {BASE_URL}")
-
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-gpu")
-    options.binary_location = "/usr/bin/google-chrome"
-    
-    # Set up Chrome Service with the path to chromedriver installed in the Dockerfile
-    service = Service(executable_path="/usr/local/bin/chromedriver")
-    
-    # Initialize Chrome driver with service and options
-    driver = webdriver.Chrome(service=service, options=options)
-    
-    # Hard-code property URLs based on the website structure
-    # This is more reliable than trying to navigate the menu
-    property_urls = {
-        # 1 Bedrooms
-        1: [
-            "https://www.binghamtonwest.com/10-seminary-apt-2",
-            "https://www.binghamtonwest.com/10-seminary-apt-3",
-            "https://www.binghamtonwest.com/14-seminary-apt-2a",
-            "https://www.binghamtonwest.com/14-seminary-apt-2nd-fl",
-            "https://www.binghamtonwest.com/14-seminary-apt-3rd-fl",
-            "https://www.binghamtonwest.com/16-seminary-apt-1f",
-            "https://www.binghamtonwest.com/16-seminary-apt-3",
-            "https://www.binghamtonwest.com/18-5-seminary-apt-1",
-            "https://www.binghamtonwest.com/18-5-seminary-apt-2",
-            "https://www.binghamtonwest.com/31-leroy-apt-4",
-            "https://www.binghamtonwest.com/40-walnut-apt-1",
-            "https://www.binghamtonwest.com/40-walnut-apt-2",
-            "https://www.binghamtonwest.com/43-leroy-apt-1f",
-            "https://www.binghamtonwest.com/43-leroy-apt-2r",
-            "https://www.binghamtonwest.com/68-chapin-apt-2l",
-            "https://www.binghamtonwest.com/69-st-john-apt-2r",
-            "https://www.binghamtonwest.com/93-murray-apt-2"
-        ],
-        # 2 Bedrooms
-        2: [
-            "https://www.binghamtonwest.com/4-seminary-apt-3",
-            "https://www.binghamtonwest.com/10-johnson-apt-l-or-r",
-            "https://www.binghamtonwest.com/10-seminary-apt-1",
-            "https://www.binghamtonwest.com/12-vincent",
-            "https://www.binghamtonwest.com/14-seminary-apt-1",
-            "https://www.binghamtonwest.com/16-seminary-apt-1r",
-            "https://www.binghamtonwest.com/18-seminary-apt-2",
-            "https://www.binghamtonwest.com/29-leroy-apt-6",
-            "https://www.binghamtonwest.com/38-5-oak",
-            "https://www.binghamtonwest.com/41-kneeland-apt-1-2",
-            "https://www.binghamtonwest.com/41-leroy-apt-2",
-            "https://www.binghamtonwest.com/53-5-murray-apt-1",
-            "https://www.binghamtonwest.com/68-chapin-apt-1l",
-            "https://www.binghamtonwest.com/69-st-john-apt-1",
-            "https://www.binghamtonwest.com/74-oak-apt-1",
-            "https://www.binghamtonwest.com/93-murray-apt-1",
-            "https://www.binghamtonwest.com/160-seminary-apt-1-or-2"
-        ],
-        # 3 Bedrooms
-        3: [
-            "https://www.binghamtonwest.com/2-ayres-apt-r",
-            "https://www.binghamtonwest.com/4-seminary-apt-2",
-            "https://www.binghamtonwest.com/5-ayres-apt-1-or-2",
-            "https://www.binghamtonwest.com/18-seminary-apt-1",
-            "https://www.binghamtonwest.com/41-leroy-apt-1",
-            "https://www.binghamtonwest.com/50-leroy-apt-l",
-            "https://www.binghamtonwest.com/56-st-john-apt-r",
-            "https://www.binghamtonwest.com/59-murray-apt-1-or-2",
-            "https://www.binghamtonwest.com/74-oak-apt-2-or-3",
-            "https://www.binghamtonwest.com/93-chapin-apt-r",
-            "https://www.binghamtonwest.com/104-chapin-apt-2"
-        ],
-        # 4 Bedrooms
-        4: [
-            "https://www.binghamtonwest.com/6-ayres",
-            "https://www.binghamtonwest.com/7-walnut",
-            "https://www.binghamtonwest.com/25-seminary",
-            "https://www.binghamtonwest.com/38-st-john",
-            "https://www.binghamtonwest.com/40-st-john",
-            "https://www.binghamtonwest.com/44-murray",
-            "https://www.binghamtonwest.com/50-leroy-apt-r",
-            "https://www.binghamtonwest.com/53-5-murray-apt-2",
-            "https://www.binghamtonwest.com/54-leroy",
-            "https://www.binghamtonwest.com/55-st-john",
-            "https://www.binghamtonwest.com/93-chapin-apt-l",
-            "https://www.binghamtonwest.com/106-murray"
-        ],
-        # 5 Bedrooms - add more URLs as needed
-        5: [
-            "https://www.binghamtonwest.com/3-ayres",
-            "https://www.binghamtonwest.com/17-st-john",
-            "https://www.binghamtonwest.com/18-seminary",
-            "https://www.binghamtonwest.com/23-ayres",
-            "https://www.binghamtonwest.com/29-seminary",
-            "https://www.binghamtonwest.com/30-seminary",
-            "https://www.binghamtonwest.com/38-oak"
-        ],
-        # 6 Bedrooms - add more URLs as needed
-        6: [
-            "https://www.binghamtonwest.com/2-ayres",
-            "https://www.binghamtonwest.com/5-ayres",
-            "https://www.binghamtonwest.com/11-ayres",
-            "https://www.binghamtonwest.com/13-seminary"
-        ],
-        # 7 Bedrooms - add more URLs as needed
-        7: [
-            "https://www.binghamtonwest.com/50-leroy",
-            "https://www.binghamtonwest.com/93-chapin",
-            "https://www.binghamtonwest.com/97-chapin"
-        ]
-    }
+# Listings known before sitemap discovery existed. Only used to bootstrap an
+# empty frontier when discovery finds nothing (e.g. the sitemap is unreachable).
+SEED_URLS = [
+    "https://www.binghamtonwest.com/10-seminary-apt-2",
+    "https://www.binghamtonwest.com/10-seminary-apt-3",
+    "https://www.binghamtonwest.com/14-seminary-apt-2a",
+    "https://www.binghamtonwest.com/14-seminary-apt-2nd-fl",
+    "https://www.binghamtonwest.com/14-seminary-apt-3rd-fl",
+    "https://www.binghamtonwest.com/16-seminary-apt-1f",
+    "https://www.binghamtonwest.com/16-seminary-apt-3",
+    "https://www.binghamtonwest.com/18-5-seminary-apt-1",
+    "https://www.binghamtonwest.com/18-5-seminary-apt-2",
+    "https://www.binghamtonwest.com/31-leroy-apt-4",
+    "https://www.binghamtonwest.com/40-walnut-apt-1",
+    "https://www.binghamtonwest.com/40-walnut-apt-2",
+    "https://www.binghamtonwest.com/43-leroy-apt-1f",
+    "https://www.binghamtonwest.com/43-leroy-apt-2r",
+    "https://www.binghamtonwest.com/68-chapin-apt-2l",
+    "https://www.binghamtonwest.com/69-st-john-apt-2r",
+    "https://www.binghamtonwest.com/93-murray-apt-2",
+    "https://www.binghamtonwest.com/4-seminary-apt-3",
+    "https://www.binghamtonwest.com/10-johnson-apt-l-or-r",
+    "https://www.binghamtonwest.com/10-seminary-apt-1",
+    "https://www.binghamtonwest.com/12-vincent",
+    "https://www.binghamtonwest.com/14-seminary-apt-1",
+    "https://www.binghamtonwest.com/16-seminary-apt-1r",
+    "https://www.binghamtonwest.com/18-seminary-apt-2",
+    "https://www.binghamtonwest.com/29-leroy-apt-6",
+    "https://www.binghamtonwest.com/38-5-oak",
+    "https://www.binghamtonwest.com/41-kneeland-apt-1-2",
+    "https://www.binghamtonwest.com/41-leroy-apt-2",
+    "https://www.binghamtonwest.com/53-5-murray-apt-1",
+    "https://www.binghamtonwest.com/68-chapin-apt-1l",
+    "https://www.binghamtonwest.com/69-st-john-apt-1",
+    "https://www.binghamtonwest.com/74-oak-apt-1",
+    "https://www.binghamtonwest.com/93-murray-apt-1",
+    "https://www.binghamtonwest.com/160-seminary-apt-1-or-2",
+    "https://www.binghamtonwest.com/2-ayres-apt-r",
+    "https://www.binghamtonwest.com/4-seminary-apt-2",
+    "https://www.binghamtonwest.com/5-ayres-apt-1-or-2",
+    "https://www.binghamtonwest.com/18-seminary-apt-1",
+    "https://www.binghamtonwest.com/41-leroy-apt-1",
+    "https://www.binghamtonwest.com/50-leroy-apt-l",
+    "https://www.binghamtonwest.com/56-st-john-apt-r",
+    "https://www.binghamtonwest.com/59-murray-apt-1-or-2",
+    "https://www.binghamtonwest.com/74-oak-apt-2-or-3",
+    "https://www.binghamtonwest.com/93-chapin-apt-r",
+    "https://www.binghamtonwest.com/104-chapin-apt-2",
+    "https://www.binghamtonwest.com/6-ayres",
+    "https://www.binghamtonwest.com/7-walnut",
+    "https://www.binghamtonwest.com/25-seminary",
+    "https://www.binghamtonwest.com/38-st-john",
+    "https://www.binghamtonwest.com/40-st-john",
+    "https://www.binghamtonwest.com/44-murray",
+    "https://www.binghamtonwest.com/50-leroy-apt-r",
+    "https://www.binghamtonwest.com/53-5-murray-apt-2",
+    "https://www.binghamtonwest.com/54-leroy",
+    "https://www.binghamtonwest.com/55-st-john",
+    "https://www.binghamtonwest.com/93-chapin-apt-l",
+    "https://www.binghamtonwest.com/106-murray",
+    "https://www.binghamtonwest.com/3-ayres",
+    "https://www.binghamtonwest.com/17-st-john",
+    "https://www.binghamtonwest.com/18-seminary",
+    "https://www.binghamtonwest.com/23-ayres",
+    "https://www.binghamtonwest.com/29-seminary",
+    "https://www.binghamtonwest.com/30-seminary",
+    "https://www.binghamtonwest.com/38-oak",
+    "https://www.binghamtonwest.com/2-ayres",
+    "https://www.binghamtonwest.com/5-ayres",
+    "https://www.binghamtonwest.com/11-ayres",
+    "https://www.binghamtonwest.com/13-seminary",
+    "https://www.binghamtonwest.com/50-leroy",
+    "https://www.binghamtonwest.com/93-chapin",
+    "https://www.binghamtonwest.com/97-chapin"
+]
+
+def load_browser_page(readiness, resource_policy, driver, apartment_url):
+    """Load a listing in a Chrome driver and wait until it is ready.
+
+    Returns the rendered page source and any Wix data payloads captured from
+    the network while the page loaded.
+    """
+    monitor = NetworkMonitor(driver)
+    page_resources = resource_policy.attach(driver, monitor)
+    capture = None
+    if WIX_DATA_MODE != 'off':
+        capture = NetworkPayloadCapture(driver)
+        monitor.add_listener(capture.on_event)
+    timing = readiness.load(driver, apartment_url, monitor)
+    record('render_load', timing['load_seconds'])
+    record('render_wait', timing['wait_seconds'])
+    page_html = driver.page_source
+    payloads = capture.collect() if capture else []
     
-    # Get all listings from the direct URLs
-    all_listings = []
+    if page_resources:
+        report = page_resources.finish(apartment_url, timing['load_seconds'] + timing['wait_seconds'])
+        count('bytes_downloaded', report['bytes_downloaded'])
+        saved_kb = f"{report['bytes_saved'] / 1024:.0f} KB" if report['bytes_saved'] is not None else "unknown bytes"
+        saved_s = f"{report['seconds_saved']:.1f}s" if report['seconds_saved'] is not None else "unknown time"
+        print(f"Resources for {apartment_url}: {report['bytes_downloaded'] / 1024:.0f} KB downloaded, "
+              f"{sum(report['blocked'].values())} blocked, saved {saved_kb} and {saved_s}")
+    return page_html, payloads
+
+def fetch_listing(strategy, archive, apartment_url):
+    """Fetch one listing URL (HTTP first, Chrome if needed) and archive it.
+
+    Runs in the pipeline's fetcher threads; parsing happens in a worker process.
+    """
+    print(f"Visiting {apartment_url}")
+    page = strategy.fetch(apartment_url)
+    if archive and page['html']:
+        archive.add(apartment_url, page['html'], page['payloads'], path=page['path'],
+                    digest=page['validators'].get('content_hash'))
+    if page['changed']:
+        print(f"Fetched {apartment_url} via {page['path']}")
+    else:
+        print(f"Unchanged since last run: {apartment_url} (via {page['path']})")
+    return page
+
+class ListingFetcher:
+    """The fetch, parse and save machinery for listing URLs, set up once for any number of batches.
+
+    Chrome drivers, the parser process pool and the learned fetch paths,
+    validators and readiness statistics are kept between ``fetch`` calls,
+    so a worker that scrapes many small batches pays for them once. Use it
+    as a context manager; leaving it stops the drivers and parsers, saves
+    what was learned and prints the report for every batch it fetched.
+    """
+
+    def __init__(self, pool_size=None, incremental=True, table='properties', report=None, progress=None,
+                 metrics=None):
+        self.table = table
+        self.report = report
+        self.progress = progress
+        self.metrics = metrics or RunMetrics()
+        self.write_stats = {}
+        self.totals = {'urls': 0, 'seconds': 0.0}
+        # Pipeline counters summed over every batch
+        self.stats = {}
+        # Chrome drivers are started lazily, so a run where every page is served
+        # over plain HTTP never launches a browser
+        self.pool = DriverPool(size=pool_size)
+        self.readiness = ReadinessTracker()
+        self.resource_policy = ResourcePolicy()
+        self.archive = open_archive()
+        self.strategy = FetchStrategy(
+            self.pool,
+            load_browser_page=partial(load_browser_page, self.readiness, self.resource_policy),
+            validators=None if incremental else {}
+        )
+        self.pipeline = None
+
+    def _open_pipeline(self):
+        self.pipeline = ListingPipeline(
+            fetch=partial(fetch_listing, self.strategy, self.archive),
+            parse=parse_listing_page,
+            save=partial(save_to_database, stats=self.write_stats, table=self.table),
+            # Validators describe what the live table holds, so a shadow load
+            # that might never be swapped in does not record them
+            mark=mark_urls_fetched if self.table == 'properties' else None,
+            report=self.report,
+            progress=self.progress,
+            metrics=self.metrics,
+            # The throttle decides how many of these actually hit the site at once
+            fetch_workers=max(self.pool.size, HTTP_POOL_SIZE, THROTTLE_MAX_CONCURRENCY)
+        ).__enter__()
+
+    def __enter__(self):
+        self._open_pipeline()
+        print(f"Using {self.pipeline.fetch_workers} fetcher(s), {self.pipeline.parse_workers} parser "
+              f"process(es) and up to {self.pool.size} Chrome driver(s)")
+        return self
+
+    def fetch(self, urls):
+        """Fetch, parse and save one batch of URLs. Returns the pipeline counters for the batch."""
+        jobs = list(urls)
+        print(f"Fetching {len(jobs)} property listing(s) from {BASE_URL}")
+        started = time.monotonic()
+        before = dict(self.pipeline.stats)
+        try:
+            stats = self.pipeline.run(jobs)
+        except Exception as e:
+            print(f"Error processing listings: {e}")
+            stats = {key: value - before[key] for key, value in self.pipeline.stats.items()}
+            # A failed run can leave its queues half drained; start the next batch on a clean pipeline
+            self.pipeline.__exit__(None, None, None)
+            self._open_pipeline()
+        # Learned paths and readiness timings are written as they accumulate,
+        # so a worker that is killed loses at most one batch of them
+        self.strategy.save()
+        self.readiness.save()
+        for key, value in stats.items():
+            self.stats[key] = self.stats.get(key, 0) + value
+        self.totals['urls'] += len(jobs)
+        self.totals['seconds'] += time.monotonic() - started
+        return stats
+
+    def __exit__(self, *exc_info):
+        try:
+            self.pipeline.__exit__(*exc_info)
+        finally:
+            self.pool.close()
+            self.strategy.save()
+            self.readiness.save()
+            self.resource_policy.save_profile()
+        if exc_info[0] is None:
+            self.print_report()
+        return False
+
+    def print_report(self):
+        stats = dict.fromkeys(self.pipeline.stats, 0)
+        stats.update(self.stats)
+        not_modified = self.strategy.stats['not_modified']
+        print(f"Checked {self.totals['urls']} listing(s) in {self.totals['seconds']:.1f}s: "
+              f"{stats['fetched'] - not_modified} fetched, "
+              f"{stats['unchanged']} unchanged ({not_modified} not modified), {stats['changed']} changed, "
+              f"{stats['failed']} failed; saved {stats['saved']} in {stats['batches']} batch(es)")
+        print_write_stats(self.write_stats)
+        print(f"Fetch paths: {self.strategy.stats['http']} via HTTP, {self.strategy.stats['browser']} via browser, "
+              f"{self.strategy.stats['escalated']} escalated, recycled {self.pool.recycled} driver(s)")
+        print_metrics_report(self.metrics.report())
+        get_throttle().print_report()
+        self.readiness.print_report()
+        self.resource_policy.print_report()
+        if self.archive:
+            self.archive.print_report()
+
+def fetch_property_listings(urls, pool_size=None, incremental=True, table='properties', report=None,
+                            progress=None, metrics=None):
+    """Fetch, parse and save the given listing URLs, rendering with Selenium only when needed.
+
+    Pages stream through a ListingPipeline: fetcher threads, parser
+    processes and batched database writes, so listings are saved while the
+    rest are still being fetched. With ``incremental`` the validators stored
+    by the previous run are used to skip unchanged pages; without it every
+    page is fetched and parsed. Listings are written to ``table``,
+    ``report(url, error)`` is told the outcome of every URL and
+    ``progress`` follows each URL through the stages (see ListingPipeline).
+    Stage timings and byte counts are collected into ``metrics``.
+
+    Returns the pipeline counters (fetched, unchanged, changed, saved, failed).
+    """
+    with ListingFetcher(pool_size, incremental, table, report, progress, metrics) as fetcher:
+        return fetcher.fetch(urls)
+
+def print_write_stats(write_stats):
+    """Report how many property rows a run actually modified."""
+    if not write_stats:
+        return
+    print(f"Database: {write_stats.get('inserted', 0) + write_stats.get('updated', 0)} row(s) modified "
+          f"({write_stats.get('inserted', 0)} inserted, {write_stats.get('updated', 0)} updated), "
+          f"{write_stats.get('unchanged', 0)} unchanged, {write_stats.get('touched', 0)} last-seen refreshed, "
+          f"{write_stats.get('rejected', 0)} rejected")
+
+def read_archived_page(archive_dir, records, apartment_url):
+    """Load an archived page as a fetch result for the replay pipeline."""
+    page = read_blob(archive_dir, records[apartment_url])
+    return {'html': page['html'], 'payloads': page['payloads'], 'changed': True, 'validators': None}
+
+def replay_archive(since=None, until=None, workers=None, save=True):
+    """Re-extract the newest archived page of every listing, with no network access.
+
+    Pages go through the same pipeline as a live run, parsed in parallel
+    worker processes. ``since`` / ``until`` (ISO timestamps) limit the
+    replay to pages fetched in that window. Unless ``save`` is False the
+    listings are written to the database as they are parsed.
+    """
+    archive = PageArchive()
+    records = {record['url']: record for record in archive.latest(since, until)}
+    print(f"Replaying {len(records)} archived page(s) from {archive.directory}")
+    started = time.monotonic()
     
-    try:
-        # Process each bedroom category
-        for bedrooms, urls in property_urls.items():
-            print(f"\nProcessing {bedrooms} bedroom listings...")
-            
-            # Visit each property URL directly
-            for apartment_url in urls:
-                try:
-                    print(f"Visiting {apartment_url}")
-                    driver.get(apartment_url)
-                    time.sleep(3)
-                    
-                    # Get the page content
-                    page_html = driver.page_source
-                    soup = BeautifulSoup(page_html, 'html.parser')
-                    
-                    # ALWAYS use URL-derived title - never from page content
-                    url_path = apartment_url.split("/")[-1]
-                    title = format_address_from_url(url_path)
-                    
-                    # Extract images - look for large images first
-                    image_url = None
-                    all_images = soup.find_all("img")
-                    
-                    # First try to find map images
-                    for img in all_images:
-                        try:
-                            src = img.get("src")
-                            if not src:
-                                continue
-                                
-                            # Prioritize map images
-                            if "map" in src.lower() or "location" in src.lower():
-                                image_url = src
-                                if not image_url.startswith(("http://", "https://")):
-                                    image_url = urljoin(BASE_URL, image_url)
-                                print(f"Found map image: {image_url}")
-                                break
-                        except Exception as e:
-                            print(f"Error processing image: {e}")
-                    
-                    # If no map image found, then try property-specific images
-                    if not image_url:
-                        for img in all_images:
-                            try:
-                                src = img.get("src")
-                                if not src:
-                                    continue
-                                    
-                                # Skip obvious non-property images
-                                if any(x in src.lower() for x in ["logo", "icon", "button", "wix-image", "bedroom"]):
-                                    continue
-                                    
-                                # Look for property photos
-                                if (("seminary" in src.lower() and "apt" in src.lower()) or 
-                                    any(street in src.lower() for street in ["ayres", "murray", "leroy", "chapin", "walnut", "oak"])):
-                                    image_url = src
-                                    if not image_url.startswith(("http://", "https://")):
-                                        image_url = urljoin(BASE_URL, image_url)
-                                    print(f"Found property image: {image_url}")
-                                    break
-                            except Exception as e:
-                                print(f"Error processing image: {e}")
-                    
-                    # Fallback: If still no image, check for any large image (non-bedroom)
-                    if not image_url:
-                        for img in all_images:
-                            try:
-                                # Skip tiny images, icons, logos, and bedroom images
-                                if ((img.get("width") and int(img.get("width", "0")) > 200) or 
-                                   (img.get("height") and int(img.get("height", "0")) > 200)):
-                                    src = img.get("src")
-                                    if src and not any(x in src.lower() for x in ["icon", "logo", "button", "bedroom"]):
-                                        image_url = src
-                                        if not image_url.startswith(("http://", "https://")):
-                                            image_url = urljoin(BASE_URL, image_url)
-                                        print(f"Found large image: {image_url}")
-                                        break
-                            except Exception as e:
-                                print(f"Error processing image: {e}")
-                    
-                    # Last resort: If still no image, use a placeholder image
-                    if not image_url:
-                        # Use a placeholder image instead
-                        image_url = f"{BASE_URL}/static/images/placeholder.jpg"
-                        print(f"Using placeholder image: {image_url}")
-                    
-                    # Use the same URL-derived title for location
-                    location = title
-                    
-                    # Look for price
-                    price = "Contact for price"
-                    price_pattern = re.compile(r'\$\s*[\d,]+(?:\.\d+)?(?:/[a-zA-Z]+)?')
-                    
-                    # Check text nodes for price
-                    text_nodes = soup.find_all(text=True)
-                    for text in text_nodes:
-                        match = price_pattern.search(text)
-                        if match and len(match.group()) > 1:  # Ensure we have more than just the $ symbol
-                            price = match.group()
-                            break
-                    
-                    # Extract details from the page
-                    amenities = []
-                    description = ""
-                    
-                    # Method 1: Look for property details in a specific section with green background
-                    property_details_found = False
-                    property_sections = soup.select('div[style*="background-color:rgba(0, 138, 69, 1)"]')
-                    if not property_sections:
-                        property_sections = soup.select('.containerr1[style*="background-color:rgba(0, 138, 69, 1)"]')
-                        
-                    if property_sections:
-                        for section in property_sections:
-                            # Extract text content from the section
-                            section_text = section.get_text().strip()
-                            if "Property Details" in section_text:
-                                property_details_found = True
-                                
-                                # Find all paragraphs in this section
-                                paragraphs = section.find_all('p')
-                                for p in paragraphs:
-                                    text = p.get_text().strip()
-                                    if text and not text.startswith('Property Details'):
-                                        # Split by lines and add each line as an amenity
-                                        for line in text.split('\n'):
-                                            clean_line = line.strip()
-                                            if clean_line and not clean_line.lower() == 'property details':
-                                                amenities.append(clean_line)
-                    
-                    # Method 2: Look for specific text content that indicates property features
-                    if not property_details_found:
-                        feature_texts = [
-                            'Bedroom', 'Bathroom', 'Kitchen', 'Living Room', 'Furnished',
-                            'Porch', 'Laundry', 'Pet Friendly', 'Bus Stop', 'Fully'
-                        ]
-                        
-                        # Find all paragraphs and check for feature text
-                        for p in soup.find_all(['p', 'div']):
-                            text = p.get_text().strip()
-                            if text and any(feature in text for feature in feature_texts):
-                                # Check if this looks like a property feature list
-                                clean_lines = []
-                                for line in text.replace('<br>', '\n').split('\n'):
-                                    clean_line = line.strip()
-                                    if clean_line and len(clean_line) > 3 and not clean_line.lower() == 'property details':
-                                        clean_lines.append(clean_line)
-                                
-                                # If we have multiple lines, it's probably a feature list
-                                if len(clean_lines) >= 2:
-                                    amenities.extend(clean_lines)
-                                    property_details_found = True
-
-                    # Method 2.5: Look for checkmark lists which often indicate property features
-                    if not property_details_found or len(amenities) < 3:  # If no details found or very few
-                        checkmark_elements = soup.find_all(['span', 'p', 'div'], text=re.compile(r'✓'))
-                        if checkmark_elements:
-                            for elem in checkmark_elements:
-                                feature_text = elem.get_text().strip()
-                                if feature_text.startswith('✓') and len(feature_text) > 2:
-                                    # Clean up the checkmark feature text
-                                    clean_feature = feature_text.replace('✓', '').strip()
-                                    if clean_feature and len(clean_feature) > 3:
-                                        amenities.append(clean_feature)
-                                        property_details_found = True
-
-                    # Method 2.6: Look for list items that might contain features
-                    if not property_details_found or len(amenities) < 3:
-                        list_items = soup.find_all(['li'])
-                        feature_keywords = ['bedroom', 'bathroom', 'kitchen', 'living', 'furnished', 'porch', 
-                                            'laundry', 'pet', 'bus', 'location', 'contact', 'office', 'hours']
-                        
-                        feature_list = []
-                        for li in list_items:
-                            text = li.get_text().strip()
-                            if text and any(keyword in text.lower() for keyword in feature_keywords):
-                                feature_list.append(text)
-                        
-                        if len(feature_list) >= 2:  # If we found multiple list items with feature keywords
-                            amenities.extend(feature_list)
-                            property_details_found = True
-                    
-                    # Method 3: Look for description
-                    description_elements = soup.find_all(['p', 'div'], text=re.compile(r'(description|about this property)', re.I))
-                    for elem in description_elements:
-                        desc_text = elem.get_text().strip()
-                        if len(desc_text) > 50:  # Only use substantial text as description
-                            description = desc_text
-                            break
-                    
-                    # If no substantial description found, check for "No description available" text
-                    if not description or description.lower() == "no description available":
-                        # Try to generate a basic description based on property details
-                        if amenities:
-                            property_type = "apartment" if "apt" in title.lower() else "property"
-                            bedrooms_text = f"{bedrooms} bedroom" if bedrooms and bedrooms == 1 else f"{bedrooms} bedrooms" if bedrooms else ""
-                            
-                            # Create a more natural description with amenity grouping
-                            description = f"This {bedrooms_text} {property_type} at {title} "
-                            
-                            # Group similar amenities
-                            has_bedroom = any("bedroom" in a.lower() for a in amenities)
-                            has_bathroom = any("bathroom" in a.lower() for a in amenities)
-                            has_kitchen = any("kitchen" in a.lower() for a in amenities)
-                            has_laundry = any("laundry" in a.lower() for a in amenities)
-                            has_furnished = any("furnished" in a.lower() for a in amenities)
-                            
-                            features = []
-                            if has_bedroom and has_bathroom and has_kitchen:
-                                features.append("includes bedroom, bathroom, and kitchen")
-                            else:
-                                if has_bedroom:
-                                    features.append("includes bedroom")
-                                if has_bathroom:
-                                    features.append("includes bathroom")
-                                if has_kitchen:
-                                    features.append("includes kitchen")
-                                    
-                            if has_furnished:
-                                features.append("comes fully furnished")
-                            if has_laundry:
-                                features.append("has laundry facilities available")
-                                
-                            # Add other notable amenities
-                            other_amenities = [a for a in amenities if not any(x in a.lower() for x in 
-                                              ["bedroom", "bathroom", "kitchen", "furnished", "laundry"])]
-                            if other_amenities:
-                                notable = other_amenities[:3]
-                                if features:
-                                    features.append("and also features " + ", ".join(notable))
-                                else:
-                                    features.append("features " + ", ".join(notable))
-                            
-                            if features:
-                                description += " " + ". It ".join(features) + "."
-                            else:
-                                description += "offers: " + ", ".join(amenities[:5])
-                                if len(amenities) > 5:
-                                    description += ", and more."
-                                else:
-                                    description += "."
-                        else:
-                            description = "No description available. Contact the property manager for more details."
-                    
-                    # Extract bedrooms from URL or title
-                    bedrooms = extract_bedrooms(title)
-                    
-                    # Remove duplicates while preserving order
-                    seen = set()
-                    unique_amenities = []
-                    for item in amenities:
-                        clean_item = item.strip()
-                        if clean_item and clean_item not in seen:
-                            seen.add(clean_item)
-                            unique_amenities.append(clean_item)
-                    
-                    # Add the listing
-                    listing = {
-                        "title": title,
-                        "price": price,
-                        "location": location,
-                        "url": apartment_url,
-                        "bedrooms": bedrooms,
-                        "image_url": image_url
-                    }
-                    
-                    all_listings.append(listing)
-                    print(f"Added listing: {title}, {bedrooms} bedroom(s), {price}")
-                    print(f"Location: {location}")
-                    print(f"URL: {apartment_url}")
-                    print("-" * 50)
-                    
-                except Exception as e:
-                    print(f"Error processing apartment {apartment_url}: {e}")
+    write_stats = {}
+    pipeline = ListingPipeline(
+        fetch=partial(read_archived_page, archive.directory, records),
+        parse=parse_listing_page,
+        save=partial(save_to_database, stats=write_stats) if save else None,
+        parse_workers=workers
+    )
+    stats = pipeline.run(records)
+    print(f"Replayed {stats['changed']} listing(s) in {time.monotonic() - started:.1f}s, "
+          f"{stats['failed']} failed, {stats['saved']} saved")
+    print_write_stats(write_stats)
+    print_metrics_report(pipeline.metrics.report())
+    return stats
+
+def parse_listing_page(apartment_url, page_html, payloads=None):
+    """Parse a rendered listing page into the listing dict saved by save_to_database.
+
+    Args:
+        apartment_url (str): The URL the page was loaded from.
+        page_html (str): The rendered page source.
+        payloads (list): Wix data-API JSON captured while the page rendered.
+
+    Returns:
+        dict: Listing with title, price, location, url, bedrooms and image_url,
+        plus the details shown on the property page (amenities, description,
+        availability, bathrooms and photos).
+    """
+    # ALWAYS use URL-derived title - never from page content
+    url_path = apartment_url.split("/")[-1]
+    title = format_address_from_url(url_path)
     
-    except Exception as e:
-        print(f"Error processing listings: {e}")
+    # Prefer the data payloads Wix builds the page from; the DOM is the fallback
+    data = extract_listing_data(page_html, payloads) if WIX_DATA_MODE != 'off' else {}
+    page = None
+    if not (data.get('price') and data.get('images') and data.get('amenities')):
+        # One pass over the document feeds every extractor below
+        page = parse_document(page_html)
     
-    finally:
-        driver.quit()
+    # Extract images - map images first, then property photos, then any large image
+    with stage('image_selection'):
+        image_url = data['images'][0] if data.get('images') else select_image(page, BASE_URL)
+    
+    # Last resort: If still no image, use a placeholder image
+    if not image_url:
+        # Use a placeholder image instead
+        image_url = f"{BASE_URL}/static/images/placeholder.jpg"
+        print(f"Using placeholder image: {image_url}")
+    
+    # The details served by the property page, built from the same data and parsed page
+    details = parse_property_details(apartment_url, page_html, data=data, page=page)
     
-    print(f"Found total of {len(all_listings)} listings")
-    return all_listings
+    # Add the listing
+    listing = {
+        "title": title,
+        "price": details['price'],
+        "location": title,
+        "url": apartment_url,
+        "bedrooms": details['bedrooms'],
+        "image_url": image_url,
+        "amenities": details['amenities'],
+        "description": details['description'],
+        "availability": details['availability'],
+        "bathrooms": details['bathrooms'],
+        "photos": details['photos']
+    }
+    
+    print(f"Added listing: {title}, {listing['bedrooms']} bedroom(s), {listing['price']}")
+    print(f"Location: {title}")
+    print(f"URL: {apartment_url}")
+    print("-" * 50)
+    
+    return listing
 
 
 def extract_bedrooms(title):
@@ -503,307 +497,160 @@ def extract_price(text_or_element):
     
     return "Contact for price"
 
-def extract_property_details(url):
+def parse_property_details(url, page_html, payloads=None, data=None, page=None):
     """
-    Extract detailed property information from a Binghamton West listing URL.
+    Build the detailed property information shown on the property page.
     
     Args:
         url (str): The URL of the property listing.
+        page_html (str): The listing page source.
+        payloads (list): Wix data-API JSON captured while the page rendered.
+        data (dict): Listing fields already read from the page data, if any.
+        page (dict): The page already collected by parse_document, if any.
         
     Returns:
         dict: Dictionary containing detailed property information.
     """
-    if not url or not url.startswith(("http://", "https://")):
-        return {"success": False, "error": "Invalid URL provided"}
+    # ALWAYS use URL-derived title - never from page content
+    url_path = url.split("/")[-1]
+    title = format_address_from_url(url_path)
     
-    try:
-        # Setup headers to mimic a browser
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Cache-Control': 'max-age=0'
-        }
-        
-        # Make the request to the original listing
-        response = requests.get(url, headers=headers, timeout=10)
-        
-        if response.status_code != 200:
-            return {
-                "success": False, 
-                "error": f"Failed to fetch the URL: Status code {response.status_code}"
-            }
-            
-        # Parse the HTML content
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # ALWAYS use URL-derived title - never from page content
-        url_path = url.split("/")[-1]
-        title = format_address_from_url(url_path)
-        
-        # Extract details from the page
-        raw_amenities = []
-        description = ""
-        property_details_found = False
-        
-        # Extract from any property detail section on the page
-        # Method 1: Look for specific sections or divs with property details
-        for section in soup.find_all(['div', 'section']):
-            section_text = section.get_text().strip().lower()
-            if 'property' in section_text and ('detail' in section_text or 'feature' in section_text or 'amenities' in section_text):
-                property_details_found = True
-                # Extract all bullet points or paragraphs in this section
-                for elem in section.find_all(['li', 'p']):
-                    text = elem.get_text().strip()
-                    if text and len(text) > 3 and not text.lower() == 'property details':
-                        raw_amenities.append(text)
-        
-        # Method 2: Look for checkmark lists which often indicate property features
-        if not property_details_found or len(raw_amenities) < 3:
-            checkmark_elements = soup.find_all(['span', 'p', 'div', 'li'], text=re.compile(r'[✓✔]'))
-            if checkmark_elements:
-                for elem in checkmark_elements:
-                    feature_text = elem.get_text().strip()
-                    if re.match(r'^[✓✔]', feature_text) and len(feature_text) > 2:
-                        # Clean up the checkmark feature text
-                        clean_feature = re.sub(r'^[✓✔]\s*', '', feature_text).strip()
-                        if clean_feature and len(clean_feature) > 3:
-                            raw_amenities.append(clean_feature)
-                            property_details_found = True
-        
-        # Method 3: Look for list items that might contain features
-        if not property_details_found or len(raw_amenities) < 3:
-            feature_keywords = ['bedroom', 'bathroom', 'kitchen', 'living', 'furnished', 'porch', 
-                               'laundry', 'pet', 'bus', 'parking', 'storage', 'basement']
-            
-            for li in soup.find_all(['li']):
-                text = li.get_text().strip()
-                if text and any(keyword in text.lower() for keyword in feature_keywords):
-                    raw_amenities.append(text)
-                    property_details_found = True
-        
-        # Method 4: Look for specific property feature text
-        if not property_details_found or len(raw_amenities) < 3:
-            # Look for paragraphs containing property features
-            feature_patterns = [
-                r'\b(one|1|two|2|three|3|four|4)\s+bedroom',
-                r'\bbig\s+eat[\s-]in\s+kitchen\b',
-                r'\bliving\s+room\b',
-                r'\bfully\s+furnished\b',
-                r'\blaundry\s+available\b',
-                r'\bfront\s+and\s+back\s+porch\b',
-                r'\b(\d+)\s+block\s+to\s+bus\s+stop\b',
-                r'\bparking\b',
-                r'\bpet\s+friendly\b'
-            ]
-            
-            for p in soup.find_all(['p', 'div', 'span']):
-                text = p.get_text().strip()
-                if text:
-                    for pattern in feature_patterns:
-                        match = re.search(pattern, text.lower())
-                        if match:
-                            # Extract the specific feature that matched
-                            feature_text = match.group(0)
-                            # Capitalize first letter of each word
-                            feature_text = ' '.join(word.capitalize() for word in feature_text.split())
-                            raw_amenities.append(feature_text)
-                            property_details_found = True
-        
-        # Method 5: Extract from description text
-        description_elements = soup.find_all(['p', 'div'], text=re.compile(r'(description|about this property)', re.I))
-        for elem in description_elements:
-            desc_text = elem.get_text().strip()
-            if len(desc_text) > 50:  # Only use substantial text as description
-                description = desc_text
-                break
-        
-        # Look for price
-        price = "Contact for price"
-        price_pattern = re.compile(r'\$\s*[\d,]+(?:\.\d+)?(?:/[a-zA-Z]+)?')
-        
-        # Check text nodes for price
-        text_nodes = soup.find_all(text=True)
-        for text in text_nodes:
-            match = price_pattern.search(text)
-            if match and len(match.group()) > 1:  # Ensure we have more than just the $ symbol
-                price = match.group()
-                break
-                
-        # Extract availability information
-        availability = None
-        availability_pattern = re.compile(r'(?:available|unavailable) (?:until|from) ([a-zA-Z]+ \d{4})', re.I)
-        
-        for text in text_nodes:
-            match = availability_pattern.search(text)
-            if match:
-                availability = match.group(0)
-                break
-        
-        # Extract bedrooms from URL or title
-        bedrooms = extract_bedrooms(title)
+    # Prefer the data payloads Wix builds the page from; the DOM is only parsed when they fall short
+    if data is None:
+        data = extract_listing_data(page_html, payloads) if WIX_DATA_MODE != 'off' else {}
+    if page is None and not (data.get('price') and data.get('amenities')):
+        page = parse_document(page_html)
+    
+    def from_page(extract):
+        return extract(page) if page is not None else None
+    
+    # Extract details from the page
+    raw_amenities = list(data.get('amenities', [])) or from_page(find_amenities) or []
+    description = data.get('description') or from_page(find_description)
+    
+    # Look for price and availability
+    price = data.get('price') or from_page(find_price) or "Contact for price"
+    availability = data.get('availability') or from_page(find_availability)
+    
+    # Extract bedrooms from URL or title, then from the page data, then from page content
+    bedrooms = extract_bedrooms(title) or data.get('bedrooms') or from_page(find_bedrooms)
+    bathrooms = data.get('bathrooms') or from_page(find_bathrooms)
+    
+    # Gallery photos, in page order
+    photos = data.get('images') or (find_photos(page, BASE_URL) if page is not None else [])
+    
+    # Standardise the raw lines in one pass of the amenity rules table
+    standardized_amenities = []
+    amenity_map = classify_amenities(raw_amenities)
+    
+    # Build the standardized amenities list from our mapping
+    if bedrooms == 1 and "bedrooms" not in amenity_map:
+        standardized_amenities.append("One Bedroom")
+    elif bedrooms == 2 and "bedrooms" not in amenity_map:
+        standardized_amenities.append("Two Bedrooms")
+    elif "bedrooms" in amenity_map:
+        standardized_amenities.append(amenity_map["bedrooms"])
         
-        # If no bedrooms found, try to extract from page content
-        if not bedrooms:
-            bedroom_pattern = re.compile(r'(\d+)[\s-]bedroom', re.I)
-            for text in text_nodes:
-                match = bedroom_pattern.search(text)
-                if match:
-                    bedrooms = int(match.group(1))
-                    break
+    if "bathroom" in amenity_map:
+        standardized_amenities.append(amenity_map["bathroom"])
+    else:
+        standardized_amenities.append("One Bathroom")
         
-        # This is the key part that needs improvement - better standardization of amenities
-        standardized_amenities = []
-        amenity_map = {}
+    if "kitchen" in amenity_map:
+        standardized_amenities.append(amenity_map["kitchen"])
+    else:
+        standardized_amenities.append("Kitchen")
         
-        # Process each raw amenity and add to our mapping
-        for raw_amenity in raw_amenities:
-            clean_text = raw_amenity.strip()
-            if not clean_text:
-                continue
-                
-            lower_text = clean_text.lower()
-            
-            # Key categories to detect and standardize
-            if re.search(r'(one|1)\s+bedroom', lower_text, re.I) or "one bedroom" in lower_text:
-                amenity_map["bedrooms"] = "One Bedroom"
-            elif re.search(r'(two|2)\s+large?\s+bedroom', lower_text, re.I):
-                amenity_map["bedrooms"] = "Two Large Bedrooms"
-            elif re.search(r'(two|2)\s+bedroom', lower_text, re.I) or "two bedrooms" in lower_text:
-                amenity_map["bedrooms"] = "Two Bedrooms"
-            elif re.search(r'(three|3)\s+bedroom', lower_text, re.I) or "three bedrooms" in lower_text:
-                amenity_map["bedrooms"] = "Three Bedrooms"
-            elif re.search(r'(four|4)\s+bedroom', lower_text, re.I) or "four bedrooms" in lower_text:
-                amenity_map["bedrooms"] = "Four Bedrooms"
-            elif "bedroom" in lower_text and not any(x in amenity_map for x in ["bedrooms"]):
-                amenity_map["bedrooms"] = clean_text
-                
-            # Bathroom
-            elif re.search(r'(one|1)\s+bathroom', lower_text, re.I) or "one bathroom" in lower_text:
-                amenity_map["bathroom"] = "One Bathroom"
-            elif re.search(r'(two|2)\s+bathroom', lower_text, re.I) or "two bathrooms" in lower_text:
-                amenity_map["bathroom"] = "Two Bathrooms"
-            elif "bathroom" in lower_text and not "bathroom" in amenity_map:
-                amenity_map["bathroom"] = clean_text
-                
-            # Kitchen
-            elif re.search(r'kitchen\s+with\s+dining', lower_text, re.I) or "kitchen with dining" in lower_text:
-                amenity_map["kitchen"] = "Kitchen with Dining Area"
-            elif "eat-in kitchen" in lower_text or "eat in kitchen" in lower_text:
-                amenity_map["kitchen"] = "Big Eat-In Kitchen"
-            elif "kitchen" in lower_text and not "kitchen" in amenity_map:
-                amenity_map["kitchen"] = "Kitchen"
-                
-            # Living areas
-            elif "living room" in lower_text:
-                amenity_map["living"] = "Living Room"
-            elif "dining area" in lower_text and not "kitchen" in amenity_map:
-                amenity_map["dining"] = "Dining Area"
-            elif "dining room" in lower_text:
-                amenity_map["dining"] = "Dining Room"
-            elif "bonus room" in lower_text:
-                amenity_map["bonus"] = "Bonus Room"
-                
-            # Features
-            elif "enclosed yard" in lower_text:
-                amenity_map["yard"] = "Enclosed Yard"
-            elif "furnished" in lower_text:
-                amenity_map["furnished"] = "Furnished"
-            elif "pet friendly" in lower_text or "pets allowed" in lower_text:
-                amenity_map["pets"] = "Pet Friendly"
-            elif re.search(r'(\d+)\s+block\s+to\s+bus', lower_text, re.I) or "block to bus stop" in lower_text:
-                amenity_map["bus"] = "1 Block to Bus Stop"
-            elif "washer" in lower_text and "dryer" in lower_text:
-                amenity_map["laundry"] = "Washer & Dryer"
-            elif "laundry" in lower_text:
-                amenity_map["laundry"] = "Laundry Available"
-            elif "front porch" in lower_text:
-                amenity_map["porch"] = "Front Porch"
-            elif "porch" in lower_text:
-                amenity_map["porch"] = clean_text
+    if "living" in amenity_map:
+        standardized_amenities.append(amenity_map["living"])
+    else:
+        standardized_amenities.append("Living Room")
         
-        # Build the standardized amenities list from our mapping
-        if bedrooms == 1 and "bedrooms" not in amenity_map:
-            standardized_amenities.append("One Bedroom")
-        elif bedrooms == 2 and "bedrooms" not in amenity_map:
-            standardized_amenities.append("Two Bedrooms")
-        elif "bedrooms" in amenity_map:
-            standardized_amenities.append(amenity_map["bedrooms"])
-            
-        if "bathroom" in amenity_map:
-            standardized_amenities.append(amenity_map["bathroom"])
-        else:
-            standardized_amenities.append("One Bathroom")
-            
-        if "kitchen" in amenity_map:
-            standardized_amenities.append(amenity_map["kitchen"])
-        else:
-            standardized_amenities.append("Kitchen")
+    # Add the rest of the amenities
+    for key, value in amenity_map.items():
+        if key not in ["bedrooms", "bathroom", "kitchen", "living"] and value not in standardized_amenities:
+            standardized_amenities.append(value)
             
-        if "living" in amenity_map:
-            standardized_amenities.append(amenity_map["living"])
-        else:
-            standardized_amenities.append("Living Room")
+    # Add other standard amenities if not found - based on property pattern
+    standard_amenities = [
+        "Pet Friendly",
+        "1 Block to Bus Stop"
+    ]
+    
+    for amenity in standard_amenities:
+        if amenity.lower() not in [a.lower() for a in standardized_amenities]:
+            standardized_amenities.append(amenity)
             
-        # Add the rest of the amenities
-        for key, value in amenity_map.items():
-            if key not in ["bedrooms", "bathroom", "kitchen", "living"] and value not in standardized_amenities:
-                standardized_amenities.append(value)
-                
-        # Add other standard amenities if not found - based on property pattern
-        standard_amenities = [
+    # If we couldn't get a good set of amenities, add these defaults
+    if len(standardized_amenities) < 3:
+        default_amenities = [
+            "Kitchen",
+            "Living Room",
+            "Fully Furnished",
             "Pet Friendly",
             "1 Block to Bus Stop"
         ]
-        
-        for amenity in standard_amenities:
-            if amenity.lower() not in [a.lower() for a in standardized_amenities]:
+        for amenity in default_amenities:
+            if amenity not in standardized_amenities:
                 standardized_amenities.append(amenity)
-                
-        # If we couldn't get a good set of amenities, add these defaults
-        if len(standardized_amenities) < 3:
-            default_amenities = [
-                "Kitchen",
-                "Living Room",
-                "Fully Furnished",
-                "Pet Friendly",
-                "1 Block to Bus Stop"
-            ]
-            for amenity in default_amenities:
-                if amenity not in standardized_amenities:
-                    standardized_amenities.append(amenity)
-        
-        # If no description available, generate one based on amenities
-        if not description or description.lower() == "no description available.":
-            if standardized_amenities:
-                property_type = "apartment" if "apt" in title.lower() else "property"
-                bedrooms_text = f"{bedrooms} bedroom" if bedrooms and bedrooms == 1 else f"{bedrooms} bedrooms" if bedrooms else ""
-                
-                description = f"This {bedrooms_text} {property_type} at {title} features "
-                
-                if len(standardized_amenities) > 1:
-                    description += ", ".join(standardized_amenities[:-1]) + " and " + standardized_amenities[-1] + "."
-                else:
-                    description += standardized_amenities[0] + "."
+    
+    # If no description available, generate one based on amenities
+    if not description or description.lower() == "no description available.":
+        if standardized_amenities:
+            property_type = "apartment" if "apt" in title.lower() else "property"
+            bedrooms_text = f"{bedrooms} bedroom" if bedrooms and bedrooms == 1 else f"{bedrooms} bedrooms" if bedrooms else ""
+            
+            description = f"This {bedrooms_text} {property_type} at {title} features "
+            
+            if len(standardized_amenities) > 1:
+                description += ", ".join(standardized_amenities[:-1]) + " and " + standardized_amenities[-1] + "."
             else:
-                description = "No description available. Contact the property manager for more details."
+                description += standardized_amenities[0] + "."
+        else:
+            description = "No description available. Contact the property manager for more details."
+    
+    # Build result dictionary
+    result = {
+        "success": True,
+        "title": title,
+        "price": price,
+        "location": title,  # Same as title
+        "url": url,
+        "bedrooms": bedrooms,
+        "amenities": standardized_amenities,
+        "description": description,
+        "availability": availability,
+        "bathrooms": bathrooms,
+        "photos": photos
+    }
+    
+    return result
+
+def extract_property_details(url):
+    """
+    Extract detailed property information from a Binghamton West listing URL.
+    
+    Args:
+        url (str): The URL of the property listing.
         
-        # Build result dictionary
-        result = {
-            "success": True,
-            "title": title,
-            "price": price,
-            "location": title,  # Same as title
-            "url": url,
-            "bedrooms": bedrooms,
-            "amenities": standardized_amenities,
-            "description": description,
-            "availability": availability
-        }
+    Returns:
+        dict: Dictionary containing detailed property information.
+    """
+    if not url or not url.startswith(("http://", "https://")):
+        return {"success": False, "error": "Invalid URL provided"}
+    
+    try:
+        # Make the request to the original listing over the shared keep-alive
+        # session, through the throttle so 429s and 5xx are retried politely
+        response = get_throttle().get(get_session(), url, timeout=10)
         
-        return result
+        if response.status_code != 200:
+            return {
+                "success": False, 
+                "error": f"Failed to fetch the URL: Status code {response.status_code}"
+            }
+            
+        return parse_property_details(url, response.text)
         
     except Exception as e:
         import traceback
@@ -815,20 +662,232 @@ def extract_property_details(url):
             "url": url
         }
 
-def main():
+def profile_listing(url, mode='both'):
+    """Fetch and parse one listing in this process under cProfile and/or tracemalloc.
+
+    ``mode`` is 'cpu', 'memory' or 'both'. Prints the stage timings, the
+    slowest functions and the lines that allocated the most memory, and
+    writes the cProfile stats to PROFILE_DIR for snakeviz / pstats.
+    """
+    pool = DriverPool(size=1)
+    readiness = ReadinessTracker()
+    strategy = FetchStrategy(
+        pool,
+        load_browser_page=partial(load_browser_page, readiness, ResourcePolicy()),
+        validators={}
+    )
+    profiler = cProfile.Profile() if mode in ('cpu', 'both') else None
+    if mode in ('memory', 'both'):
+        tracemalloc.start(25)
+    snapshot = None
+    try:
+        if profiler:
+            profiler.enable()
+        page, fetch_sample = measure('fetch', strategy.fetch, url)
+        listing, parse_sample = measure('parse', parse_listing_page, url, page['html'], page['payloads'])
+        if profiler:
+            profiler.disable()
+        if tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+    finally:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        pool.close()
+
+    metrics = RunMetrics()
+    metrics.add_sample(fetch_sample)
+    metrics.add_sample(parse_sample)
+    print_metrics_report(metrics.report())
+    print(f"Fetched via {page['path']}; listing {'parsed' if listing else 'not found'}")
+    if profiler:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, f"{url.rstrip('/').split('/')[-1] or 'listing'}-{int(time.time())}.prof")
+        profiler.dump_stats(path)
+        print(f"cProfile stats written to {path}")
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(25)
+    if snapshot:
+        print(f"Python allocations: {current / 1024 / 1024:.1f} MB live, {peak / 1024 / 1024:.1f} MB peak; top lines:")
+        for stat in snapshot.statistics('lineno')[:15]:
+            print(f"  {stat}")
+
+def listing_urls(discovered, everything=False):
+    """URLs to scrape this run, from a discover_listings result.
+
+    New and changed listings come first, then the live listings due for a
+    recheck (cheaply, with conditional requests in incremental mode).
+    Browser-rendered listings are only rechecked every
+    BROWSER_REVALIDATE_HOURS, since that costs a Chrome render; with
+    ``everything`` (full mode, full refresh) every live listing is fetched.
+    Falls back to the seed list when nothing is known at all.
+    """
+    queued = set(discovered['to_fetch'])
+    later = discovered['active'] if everything else discovered['revalidate']
+    urls = discovered['to_fetch'] + [url for url in later if url not in queued]
+    if not urls:
+        print("Discovery found no listings; falling back to the seed URLs")
+        urls = SEED_URLS
+    return urls
+
+def enqueue_listings():
+    """Run discovery and queue every listing URL in scrape_jobs for the workers."""
+    create_scrape_urls_table()
+    create_scrape_jobs_table()
+    urls = listing_urls(discover_listings(), everything=SCRAPE_MODE == 'full')
+    queued = enqueue_scrape_jobs(urls)
+    print(f"Queued {queued} of {len(urls)} listing(s) for the workers; queue now {scrape_job_counts()}")
+
+def run_worker(worker_id=None):
+    """Claim listing URLs from scrape_jobs in batches and scrape them until the queue is drained.
+
+    Any number of workers can run at once, in one container or many. Each
+    batch is leased and kept alive by heartbeats; if a worker dies, its
+    leases expire and another worker picks the URLs up. Failed URLs are
+    retried with exponential backoff up to SCRAPE_JOB_MAX_ATTEMPTS.
+    """
+    create_properties_table()
+    create_scrape_urls_table()
+    create_scrape_jobs_table()
+    leases = JobLeases(worker_id).start()
+    print(f"Worker {leases.worker_id} started")
+    # Drivers, parsers and fetch state live as long as the worker; only the leases are per batch
+    fetcher = ListingFetcher(incremental=SCRAPE_MODE != 'full', report=leases.finish)
+    try:
+        with fetcher:
+            while True:
+                urls = leases.claim(SCRAPE_JOB_BATCH_SIZE)
+                if not urls:
+                    # Wait while other workers hold jobs whose leases may still expire
+                    counts = scrape_job_counts()
+                    if not counts.get('pending') and not counts.get('running'):
+                        break
+                    time.sleep(SCRAPE_JOB_POLL_SECONDS)
+                    continue
+                fetcher.fetch(urls)
+                leases.release_all("no result for this URL")
+    finally:
+        leases.stop()
+    print(f"Worker {leases.worker_id} finished: {leases.stats['claimed']} claimed, {leases.stats['done']} done, "
+          f"{leases.stats['retried']} failed or retried, {leases.stats['lost']} lease(s) lost")
+
+def main(replay=False, since=None, until=None, workers=None, dry_run=False, full_refresh=False,
+         enqueue=False, worker=False, worker_id=None, resume=False, profile=None, profile_mode='both',
+         backfill=False):
     print("Starting scraper...\n")
+    if backfill:
+        try:
+            create_properties_table()
+            backfill_normalized_columns()
+        except Exception as e:
+            print(f"Error in backfill: {e}")
+        print("Scraper finished.")
+        return
+    if profile:
+        try:
+            profile_listing(profile, profile_mode)
+        except Exception as e:
+            print(f"Error profiling {profile}: {e}")
+        print("Scraper finished.")
+        return
+    if replay:
+        try:
+            if not dry_run:
+                create_properties_table()
+            replay_archive(since=since, until=until, workers=workers, save=not dry_run)
+        except Exception as e:
+            print(f"Error in replay: {e}")
+        print("Scraper finished.")
+        return
+    if enqueue or worker:
+        try:
+            if enqueue:
+                enqueue_listings()
+            if worker:
+                run_worker(worker_id)
+        except Exception as e:
+            print(f"Error in main: {e}")
+        print("Scraper finished.")
+        return
+    ledger = None
     try:
         create_properties_table()
-        listings = fetch_property_listings()
-        if listings:
-            print("\nSaving listings to database...\n")
-            save_to_database(listings)
+        create_scrape_urls_table()
+        create_scrape_runs_table()
+        run = load_resumable_scrape_run() if resume else None
+        if resume and run is None:
+            print("No interrupted scrape run to resume; starting a new one")
+        if run is not None:
+            full_refresh = run['mode'] == 'full-refresh'
+            print(f"Resuming scrape run {run['id']} ({run['mode']}): {len(run['urls'])} listing(s) left "
+                  f"of {sum(run['counts'].values())}, progress so far {run['counts']}")
+            if full_refresh and create_shadow_properties_table(keep_existing=True):
+                # The listings the run loaded went with the old shadow table
+                print("The interrupted full refresh left no shadow table; starting a new one")
+                run = None
+        if run is not None:
+            run_id, mode, urls = run['id'], run['mode'], run['urls']
         else:
-            print("No listings found.")
+            mode = 'full-refresh' if full_refresh else SCRAPE_MODE
+            urls = listing_urls(discover_listings(), everything=mode != 'incremental')
+            if full_refresh:
+                # Rebuild every listing in a shadow table and swap it in at the end,
+                # so the site never shows a partial or empty table
+                create_shadow_properties_table()
+            run_id = start_scrape_run(mode, urls, SHADOW_TABLE if full_refresh else 'properties')
+
+        # Every URL's progress is checkpointed, so an interrupted run can be resumed
+        ledger = RunLedger(run_id)
+        metrics = RunMetrics()
+        stats = fetch_property_listings(
+            urls,
+            incremental=mode == 'incremental',
+            table=SHADOW_TABLE if full_refresh else 'properties',
+            progress=ledger.record,
+            metrics=metrics
+        )
+        ledger.checkpoint()
+        # The per-run performance report is kept with the run and exported for Prometheus
+        metrics_report = metrics.report(**stats)
+        status = finish_scrape_run(run_id, stats, metrics_report)
+        write_prometheus_file(metrics_report, METRICS_FILE, run_id)
+        if status == 'interrupted':
+            print(f"Scrape run {run_id} did not finish every listing; run with --resume to continue it")
+        elif full_refresh:
+            swap_shadow_properties()
+        if not stats.get('changed'):
+            print("No new or changed listings.")
     except Exception as e:
         print(f"Error in main: {e}")
+    finally:
+        if ledger:
+            ledger.checkpoint()
     print("Scraper finished.")
 
-
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Scrape Binghamton West listings into the database.")
+    parser.add_argument('--replay', action='store_true',
+                        help="re-run extraction over the page archive instead of fetching from the site")
+    parser.add_argument('--since', help="replay only pages fetched at or after this ISO time (UTC)")
+    parser.add_argument('--until', help="replay only pages fetched at or before this ISO time (UTC)")
+    parser.add_argument('--workers', type=int, help="replay worker processes (default: one per CPU)")
+    parser.add_argument('--dry-run', action='store_true', help="replay without writing to the database")
+    parser.add_argument('--full-refresh', action='store_true',
+                        help="re-scrape every listing into a shadow table and swap it in for properties")
+    parser.add_argument('--resume', action='store_true',
+                        help="continue the last interrupted scrape run instead of starting a new one")
+    parser.add_argument('--profile', metavar='URL',
+                        help="fetch and parse one listing under cProfile / tracemalloc and report where time goes")
+    parser.add_argument('--profile-mode', choices=('cpu', 'memory', 'both'), default='both',
+                        help="what --profile captures (default: both)")
+    parser.add_argument('--enqueue', action='store_true',
+                        help="discover listings and queue them in scrape_jobs for --worker processes")
+    parser.add_argument('--worker', action='store_true',
+                        help="scrape URLs claimed from scrape_jobs until the queue is drained")
+    parser.add_argument('--worker-id', help="name this worker in scrape_jobs (default: hostname-pid)")
+    parser.add_argument('--backfill', action='store_true',
+                        help="normalise bedrooms and prices of listings already in the database, then exit")
+    args = parser.parse_args()
+    main(replay=args.replay, since=args.since, until=args.until, workers=args.workers, dry_run=args.dry_run,
+         full_refresh=args.full_refresh, enqueue=args.enqueue, worker=args.worker,
+         worker_id=args.worker_id, resume=args.resume, profile=args.profile, profile_mode=args.profile_mode,
+         backfill=args.backfill)
@@ -0,0 +1,3 @@
+"""
+Scraping package initialization
+"""
@@ -0,0 +1,121 @@
+"""
+# Amenity Classifier
+# This file provides:
+# - A declarative table of amenity rules (canonical key, category, pattern,
+#   display label)
+# - One combined regex compiled from the table that rejects lines matching no
+#   rule in a single search; the lines it accepts are checked rule by rule
+# - Helpers used by the scraper and the listing detail endpoint to turn raw
+#   lines into the standardised amenity list
+"""
+
+import re
+
+# Rules in priority order: for each line the first rule whose pattern matches
+# (and whose ``unless`` category has not been filled yet) wins.
+#   key       canonical amenity key
+#   category  slot the amenity fills; a later line overwrites an earlier one
+#   pattern   regex matched anywhere in the lowercased line
+#   label     display text, or None to keep the line's own text
+#   unless    skip the rule while this category is already filled
+AMENITY_RULES = [
+    # Bedrooms
+    ('one_bedroom', 'bedrooms', r'(?:one|1)\s+bedroom', "One Bedroom", None),
+    ('two_large_bedrooms', 'bedrooms', r'(?:two|2)\s+large?\s+bedroom', "Two Large Bedrooms", None),
+    ('two_bedrooms', 'bedrooms', r'(?:two|2)\s+bedroom', "Two Bedrooms", None),
+    ('three_bedrooms', 'bedrooms', r'(?:three|3)\s+bedroom', "Three Bedrooms", None),
+    ('four_bedrooms', 'bedrooms', r'(?:four|4)\s+bedroom', "Four Bedrooms", None),
+    ('bedroom', 'bedrooms', r'bedroom', None, 'bedrooms'),
+    # Bathroom
+    ('one_bathroom', 'bathroom', r'(?:one|1)\s+bathroom', "One Bathroom", None),
+    ('two_bathrooms', 'bathroom', r'(?:two|2)\s+bathroom', "Two Bathrooms", None),
+    ('bathroom', 'bathroom', r'bathroom', None, 'bathroom'),
+    # Kitchen
+    ('kitchen_with_dining', 'kitchen', r'kitchen\s+with\s+dining', "Kitchen with Dining Area", None),
+    ('eat_in_kitchen', 'kitchen', r'eat[\s-]in\s+kitchen', "Big Eat-In Kitchen", None),
+    ('kitchen', 'kitchen', r'kitchen', "Kitchen", 'kitchen'),
+    # Living areas
+    ('living_room', 'living', r'living\s+room', "Living Room", None),
+    ('dining_area', 'dining', r'dining\s+area', "Dining Area", 'kitchen'),
+    ('dining_room', 'dining', r'dining\s+room', "Dining Room", None),
+    ('bonus_room', 'bonus', r'bonus\s+room', "Bonus Room", None),
+    # Features
+    ('enclosed_yard', 'yard', r'enclosed\s+yard', "Enclosed Yard", None),
+    ('furnished', 'furnished', r'furnished', "Furnished", None),
+    ('pet_friendly', 'pets', r'pet\s+friendly|pets\s+allowed', "Pet Friendly", None),
+    ('near_bus', 'bus', r'\d+\s+block\s+to\s+bus|block\s+to\s+bus\s+stop', "1 Block to Bus Stop", None),
+    ('washer_dryer', 'laundry', r'washer[^\n]*?dryer|dryer[^\n]*?washer', "Washer & Dryer", None),
+    ('laundry', 'laundry', r'laundry', "Laundry Available", None),
+    ('front_porch', 'porch', r'front\s+porch', "Front Porch", None),
+    ('porch', 'porch', r'porch', None, None),
+]
+
+
+def _compile_rules(rules):
+    """Build one alternation of every rule, tagged with an empty named group.
+
+    The tag sits after the pattern so the regex engine can still reject an
+    alternative on its first character. The leading lookahead skips spaces
+    and punctuation. A hit only says that some rule matches: a lower
+    priority rule starting earlier in the line would hide a higher priority
+    one, so it is not used to pick the rule.
+    """
+    return re.compile('(?=[a-z0-9])(?:' + '|'.join(
+        f'(?:{pattern})(?P<r{index}>)' for index, (_, _, pattern, _, _) in enumerate(rules)
+    ) + ')')
+
+
+AMENITY_PATTERN = _compile_rules(AMENITY_RULES)
+RULE_PATTERNS = [re.compile(pattern) for _, _, pattern, _, _ in AMENITY_RULES]
+
+
+def match_lines(lines):
+    """Return, for every line, the indices of the rules it matches (in priority order).
+
+    Each lowercased line is searched once by the combined regex; only the
+    lines it accepts are searched rule by rule, which is what the old
+    if/elif chain did for every line.
+    """
+    return [list(_line_rules(line)) for line in lines]
+
+
+def _line_rules(line):
+    """Yield the indices of the rules a raw line matches, in priority order, searching lazily."""
+    line = ' '.join(line.split()).lower()
+    if AMENITY_PATTERN.search(line):
+        for index, pattern in enumerate(RULE_PATTERNS):
+            if pattern.search(line):
+                yield index
+
+
+def classify_amenities(lines):
+    """Standardise raw amenity lines.
+
+    Returns a dict mapping each filled category to its display label, in the
+    order the categories were first filled.
+    """
+    amenity_map = {}
+    for line in lines:
+        # Stops searching at the first rule that applies, like the old chain
+        for rule in _line_rules(line):
+            _, category, _, label, unless = AMENITY_RULES[rule]
+            if unless and unless in amenity_map:
+                continue
+            amenity_map[category] = label or line.strip()
+            break
+    return amenity_map
+
+
+def amenity_keys(lines):
+    """Canonical amenity key of every line (None when no rule matches).
+
+    Unlike classify_amenities this looks at each line on its own, so the
+    ``unless`` conditions are not applied.
+    """
+    return [AMENITY_RULES[rule][0] if rule is not None else None
+            for rule in (next(_line_rules(line), None) for line in lines)]
+
+
+def amenity_categories(lines):
+    """Set of every category each line mentions."""
+    return [{AMENITY_RULES[rule][1] for rule in rules} for rules in match_lines(lines)]
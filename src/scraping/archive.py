@@ -0,0 +1,151 @@
+"""
+# Page Archive
+# This file provides:
+# - A content-addressed, gzip-compressed archive of every fetched listing
+#   page, so parser changes can be re-run without touching the live site
+# - Append-only segment files holding one gzip member per distinct page,
+#   and a JSON-lines index of (url, fetch time, digest, segment, offset)
+# - Readers used by the scraper's --replay mode
+"""
+
+import os
+import json
+import gzip
+import hashlib
+import datetime
+import threading
+
+try:
+    from config.configuration import ARCHIVE_DIR, ARCHIVE_MODE, ARCHIVE_SEGMENT_MB
+except ImportError:
+    from src.config.configuration import ARCHIVE_DIR, ARCHIVE_MODE, ARCHIVE_SEGMENT_MB
+
+INDEX_NAME = 'index.jsonl'
+SEGMENT_PATTERN = 'segment-{:05d}.gz'
+
+
+def read_blob(directory, record):
+    """Return the page (``{'html', 'payloads'}``) an index record points at."""
+    with open(os.path.join(directory, record['segment']), 'rb') as f:
+        f.seek(record['offset'])
+        return json.loads(gzip.decompress(f.read(record['length'])))
+
+
+class PageArchive:
+    """Append-only store of raw listing pages.
+
+    Each distinct page (HTML plus any captured data payloads) is stored once,
+    as its own gzip member appended to the current segment, and addressed by
+    a SHA-256 of its content. Every fetch adds an index line, so a page
+    that did not change costs one line of index rather than another copy.
+    Segments roll over at ARCHIVE_SEGMENT_MB.
+    """
+
+    def __init__(self, directory=None, segment_mb=None):
+        self.directory = directory or ARCHIVE_DIR
+        self.segment_bytes = int((segment_mb or ARCHIVE_SEGMENT_MB) * 1024 * 1024)
+        self.index_path = os.path.join(self.directory, INDEX_NAME)
+        self._lock = threading.Lock()
+        self._blobs = None
+        self._segment = None
+        self.stats = {'pages': 0, 'stored': 0, 'deduplicated': 0, 'bytes_in': 0, 'bytes_stored': 0}
+
+    def _load(self):
+        """Read the index once to learn which digests are stored and the last segment."""
+        os.makedirs(self.directory, exist_ok=True)
+        self._blobs = {}
+        for record in self.records():
+            self._blobs[record['digest']] = record
+        segments = sorted(name for name in os.listdir(self.directory) if name.startswith('segment-'))
+        self._segment = int(segments[-1][8:13]) if segments else 0
+
+    def _segment_path(self):
+        path = os.path.join(self.directory, SEGMENT_PATTERN.format(self._segment))
+        if os.path.exists(path) and os.path.getsize(path) >= self.segment_bytes:
+            self._segment += 1
+            path = os.path.join(self.directory, SEGMENT_PATTERN.format(self._segment))
+        return path
+
+    def add(self, url, html, payloads=None, path=None, fetched_at=None, digest=None):
+        """Archive one fetched page. Returns its digest.
+
+        ``digest`` is the content address to file the page under. It defaults
+        to the SHA-256 of the page; passing the normalised page hash lets
+        fetches that differ only in per-request noise share one copy.
+        """
+        body = json.dumps({'html': html, 'payloads': payloads or []}, separators=(',', ':')).encode('utf-8')
+        digest = digest or hashlib.sha256(body).hexdigest()
+        fetched_at = fetched_at or datetime.datetime.utcnow().isoformat(timespec='seconds')
+
+        with self._lock:
+            if self._blobs is None:
+                self._load()
+            self.stats['pages'] += 1
+            self.stats['bytes_in'] += len(body)
+            stored = self._blobs.get(digest)
+            if stored:
+                self.stats['deduplicated'] += 1
+            else:
+                compressed = gzip.compress(body, compresslevel=6)
+                segment_path = self._segment_path()
+                with open(segment_path, 'ab') as f:
+                    offset = f.tell()
+                    f.write(compressed)
+                stored = {
+                    'digest': digest,
+                    'segment': os.path.basename(segment_path),
+                    'offset': offset,
+                    'length': len(compressed),
+                }
+                self._blobs[digest] = stored
+                self.stats['stored'] += 1
+                self.stats['bytes_stored'] += len(compressed)
+
+            record = {'url': url, 'fetched_at': fetched_at, 'path': path}
+            record.update((key, stored[key]) for key in ('digest', 'segment', 'offset', 'length'))
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+        return digest
+
+    def records(self):
+        """Yield every index record, oldest first."""
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # A line cut short by a crash mid-write; the blob it named is still intact
+                    continue
+
+    def latest(self, since=None, until=None):
+        """Newest record of every URL, optionally limited to a fetch time window (ISO strings)."""
+        latest = {}
+        for record in self.records():
+            if since and record['fetched_at'] < since:
+                continue
+            if until and record['fetched_at'] > until:
+                continue
+            latest[record['url']] = record
+        return list(latest.values())
+
+    def read(self, record):
+        return read_blob(self.directory, record)
+
+    def print_report(self):
+        if not self.stats['pages']:
+            return
+        print(f"Archive: {self.stats['pages']} page(s), {self.stats['stored']} stored, "
+              f"{self.stats['deduplicated']} already archived, "
+              f"{self.stats['bytes_in'] / 1024:.0f} KB -> {self.stats['bytes_stored'] / 1024:.0f} KB on disk")
+
+
+def open_archive():
+    """Return the archive fetched pages are written to, or None when archiving is off."""
+    if ARCHIVE_MODE == 'off':
+        return None
+    return PageArchive()
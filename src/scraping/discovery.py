@@ -0,0 +1,255 @@
+"""
+# Listing Discovery
+# This file provides:
+# - Discovery of listing URLs from the site's sitemap XML and the school page
+#   (TARGET_URL), using conditional requests so unchanged sources cost a few
+#   hundred bytes
+# - A diff of what was found against the persistent URL frontier
+#   (scrape_urls) deciding which listings the fetch stage needs to visit
+"""
+
+import re
+import datetime
+from urllib.parse import urljoin, urlparse
+
+import requests
+from lxml import etree
+
+try:
+    from config.configuration import (
+        BASE_URL, TARGET_URL, HTTP_TIMEOUT, SITEMAP_URL, DISCOVERY_MAX_SITEMAPS, BROWSER_REVALIDATE_HOURS
+    )
+    from config.db import load_frontier, save_frontier
+    from scraping.throttle import get_throttle
+except ImportError:
+    from src.config.configuration import (
+        BASE_URL, TARGET_URL, HTTP_TIMEOUT, SITEMAP_URL, DISCOVERY_MAX_SITEMAPS, BROWSER_REVALIDATE_HOURS
+    )
+    from src.config.db import load_frontier, save_frontier
+    from src.scraping.throttle import get_throttle
+
+KIND_LISTING = 'listing'
+KIND_SITEMAP = 'sitemap'
+KIND_PAGE = 'page'
+
+SITEMAP_NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+
+# Listing pages are addressed by street number: /10-seminary-apt-2, /18-5-seminary-apt-1
+LISTING_PATH_PATTERN = re.compile(r'^/\d+(?:-\d+)?-[a-z][a-z0-9-]*$')
+HREF_PATTERN = re.compile(r'href\s*=\s*["\']([^"\'#?]+)', re.I)
+
+
+def normalize_listing_url(href, base=BASE_URL):
+    """Return the canonical listing URL for a link, or None if it is not a listing."""
+    url = urljoin(base, href.strip())
+    parsed = urlparse(url)
+    if parsed.hostname not in (urlparse(BASE_URL).hostname, 'binghamtonwest.com'):
+        return None
+    path = parsed.path.rstrip('/').lower()
+    if not LISTING_PATH_PATTERN.match(path):
+        return None
+    return f"{BASE_URL}{path}"
+
+
+def parse_lastmod(value):
+    """Parse a sitemap <lastmod> (W3C datetime) into a naive UTC datetime."""
+    if not value:
+        return None
+    value = value.strip().replace('Z', '+00:00')
+    try:
+        parsed = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            parsed = datetime.datetime.strptime(value[:10], '%Y-%m-%d')
+        except ValueError:
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+class Discovery:
+    """Find listing URLs and diff them against the frontier.
+
+    Sitemaps and the school page are fetched with If-None-Match /
+    If-Modified-Since from the validators stored on their frontier rows. A
+    304 means the source is unchanged, so its listings are taken from the
+    frontier instead. Listings are only marked removed when every source was
+    read in full, so a failed or unchanged source never drops URLs.
+    """
+
+    def __init__(self, session=None, frontier=None):
+        # Imported lazily so discovery can be used without the scraper's fetch stack
+        if session is None:
+            try:
+                from scraping.fetch_strategy import get_session
+            except ImportError:
+                from src.scraping.fetch_strategy import get_session
+            session = get_session()
+        self.session = session
+        self.frontier = load_frontier() if frontier is None else frontier
+        self.seen = {}
+        self.complete = True
+        self.stats = {'requests': 0, 'not_modified': 0, 'failed': 0, 'bytes': 0}
+
+    def _get(self, url):
+        """Conditional GET. Returns the body, or None when unchanged or failed."""
+        known = self.frontier.get(url) or {}
+        headers = {}
+        if known.get('etag'):
+            headers['If-None-Match'] = known['etag']
+        if known.get('last_modified'):
+            headers['If-Modified-Since'] = known['last_modified']
+
+        self.stats['requests'] += 1
+        try:
+            response = get_throttle().get(self.session, url, headers=headers, timeout=HTTP_TIMEOUT)
+        except requests.RequestException as e:
+            print(f"Discovery request failed for {url}: {e}")
+            self.stats['failed'] += 1
+            self.complete = False
+            return None
+
+        # Count what came over the wire (compressed), not the decoded body
+        self.stats['bytes'] += int(response.headers.get('Content-Length') or len(response.content))
+        if response.status_code == 304:
+            self.stats['not_modified'] += 1
+            self.complete = False
+            return None
+        if response.status_code != 200:
+            print(f"Discovery request for {url} returned status {response.status_code}")
+            self.stats['failed'] += 1
+            self.complete = False
+            return None
+
+        self.seen[url] = {
+            'kind': KIND_SITEMAP if url != TARGET_URL else KIND_PAGE,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+        return response.content
+
+    def _add_listing(self, url, source, lastmod=None):
+        known = self.seen.get(url)
+        if known and known.get('lastmod') and (not lastmod or lastmod <= known['lastmod']):
+            return
+        self.seen[url] = {'kind': KIND_LISTING, 'source': source, 'lastmod': lastmod}
+
+    def read_sitemap(self, url, budget=None):
+        """Collect listing URLs from a sitemap, following sitemap indexes."""
+        budget = budget if budget is not None else [DISCOVERY_MAX_SITEMAPS]
+        if budget[0] <= 0:
+            return
+        budget[0] -= 1
+
+        body = self._get(url)
+        if body is None:
+            return
+        try:
+            root = etree.fromstring(body)
+        except etree.XMLSyntaxError as e:
+            print(f"Could not parse sitemap {url}: {e}")
+            self.complete = False
+            return
+
+        for entry in root:
+            loc = entry.findtext(f'{SITEMAP_NS}loc')
+            if not loc:
+                continue
+            lastmod = parse_lastmod(entry.findtext(f'{SITEMAP_NS}lastmod'))
+            if entry.tag == f'{SITEMAP_NS}sitemap':
+                self.read_sitemap(loc.strip(), budget)
+            else:
+                listing_url = normalize_listing_url(loc)
+                if listing_url:
+                    self._add_listing(listing_url, 'sitemap', lastmod)
+
+    def read_school_page(self):
+        """Collect listing URLs linked from the school page."""
+        body = self._get(TARGET_URL)
+        if body is None:
+            return
+        html = body.decode('utf-8', errors='replace')
+        for href in HREF_PATTERN.findall(html):
+            listing_url = normalize_listing_url(href, TARGET_URL)
+            if listing_url and listing_url not in self.seen:
+                self._add_listing(listing_url, 'school page')
+
+    def run(self):
+        """Read every source, update the frontier and return the work for the fetch stage.
+
+        Returns a dict with the ``new``, ``changed`` and ``unfetched`` listing
+        URLs, the ``removed`` ones, the number of listings ``known`` before
+        this pass, ``to_fetch`` (the union of the first three, in a stable
+        order), every ``active`` (not removed) listing, the other active
+        listings split into ``revalidate`` (due for a recheck) and
+        ``deferred``, and the request stats.
+
+        Listings fetched through the browser are only due once their last
+        fetch is BROWSER_REVALIDATE_HOURS old: they have no HTTP validators,
+        so each recheck is a full Chrome render.
+        """
+        self.read_sitemap(SITEMAP_URL)
+        self.read_school_page()
+
+        known_listings = {
+            url: row for url, row in self.frontier.items()
+            if (row.get('kind') or KIND_LISTING) == KIND_LISTING and not row.get('removed_at')
+        }
+        found = {url: row for url, row in self.seen.items() if row['kind'] == KIND_LISTING}
+
+        new = sorted(url for url in found if url not in self.frontier or self.frontier[url].get('removed_at'))
+        changed = sorted(
+            url for url, row in found.items()
+            if url in known_listings and known_listings[url].get('fetched_at') and row.get('lastmod')
+            and row['lastmod'] > known_listings[url]['fetched_at']
+        )
+        unfetched = sorted(
+            url for url in set(found) | set(known_listings)
+            if url not in new and not (self.frontier.get(url) or {}).get('fetched_at')
+        )
+        removed = sorted(url for url in known_listings if url not in found) if self.complete and found else []
+
+        save_frontier(self.seen, removed)
+
+        to_fetch = list(dict.fromkeys(new + [url for url in changed + unfetched if url not in new]))
+        active = sorted((set(found) | set(known_listings)) - set(removed))
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        browser_due = now - datetime.timedelta(hours=BROWSER_REVALIDATE_HOURS)
+        queued = set(to_fetch)
+        revalidate, deferred = [], []
+        for url in active:
+            row = self.frontier.get(url) or {}
+            if url in queued:
+                continue
+            if row.get('fetch_path') == 'browser' and row.get('fetched_at') and row['fetched_at'] > browser_due:
+                deferred.append(url)
+            else:
+                revalidate.append(url)
+        return {
+            'new': new,
+            'changed': changed,
+            'unfetched': unfetched,
+            'removed': removed,
+            'known': len(known_listings),
+            'to_fetch': to_fetch,
+            'active': active,
+            'revalidate': revalidate,
+            'deferred': deferred,
+            'complete': self.complete,
+            'stats': dict(self.stats),
+        }
+
+
+def discover_listings(session=None):
+    """Run one discovery pass and print a short summary."""
+    result = Discovery(session=session).run()
+    stats = result['stats']
+    print(
+        f"Discovery: {len(result['new'])} new, {len(result['changed'])} changed, "
+        f"{len(result['unfetched'])} not yet fetched, {len(result['removed'])} removed, "
+        f"{len(result['deferred'])} browser-rendered listing(s) not due for a recheck; "
+        f"{stats['requests']} request(s), {stats['not_modified']} unchanged, "
+        f"{stats['failed']} failed, {stats['bytes'] / 1024:.1f} KB"
+    )
+    return result
@@ -0,0 +1,229 @@
+"""
+# Chrome Driver Pool
+# This file provides:
+# - A bounded pool of warm headless Chrome drivers shared by scraper threads
+# - Recycling of drivers after a number of pages or above a memory ceiling
+"""
+
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+try:
+    from config.configuration import (
+        CHROME_BINARY, CHROMEDRIVER_PATH, SCRAPER_POOL_SIZE, DRIVER_MAX_PAGES, DRIVER_MAX_RSS_MB
+    )
+except ImportError:
+    from src.config.configuration import (
+        CHROME_BINARY, CHROMEDRIVER_PATH, SCRAPER_POOL_SIZE, DRIVER_MAX_PAGES, DRIVER_MAX_RSS_MB
+    )
+
+
+def build_chrome_options():
+    """Build the headless Chrome options used by every pooled driver."""
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.binary_location = CHROME_BINARY
+    # Expose CDP Network.* events through driver.get_log('performance')
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    return options
+
+
+def process_tree_rss_mb(root_pid):
+    """Return the resident memory in MB of a process and all of its descendants.
+
+    Reads /proc directly, so it only works on Linux (the scraper container).
+    Returns None when the information is not available.
+    """
+    if not root_pid or not os.path.isdir('/proc'):
+        return None
+
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # The command name may contain spaces, so split after the closing paren
+                fields = f.read().rsplit(')', 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+
+    total_kb = 0
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        pending.extend(children.get(pid, []))
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+                        break
+        except (OSError, ValueError):
+            continue
+
+    return total_kb / 1024
+
+
+class PooledDriver:
+    """A Chrome driver plus the bookkeeping needed to decide when to recycle it."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.broken = False
+
+    @property
+    def pid(self):
+        try:
+            return self.driver.service.process.pid
+        except AttributeError:
+            return None
+
+    def rss_mb(self):
+        return process_tree_rss_mb(self.pid)
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception as e:
+            print(f"Error closing Chrome driver: {e}")
+
+
+class DriverPool:
+    """Bounded pool of reusable headless Chrome drivers.
+
+    At most ``size`` drivers exist at any time. A driver is returned to the
+    pool after each page and replaced with a fresh one once it has served
+    ``max_pages`` pages, once its Chrome process tree grows past
+    ``max_rss_mb``, or if it raised a WebDriver error while in use.
+    """
+
+    def __init__(self, size=None, max_pages=None, max_rss_mb=None, options_factory=build_chrome_options):
+        self.size = max(1, size or SCRAPER_POOL_SIZE)
+        self.max_pages = max_pages or DRIVER_MAX_PAGES
+        self.max_rss_mb = max_rss_mb or DRIVER_MAX_RSS_MB
+        self.options_factory = options_factory
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+        self.recycled = 0
+
+    def _create(self):
+        service = Service(executable_path=CHROMEDRIVER_PATH)
+        driver = webdriver.Chrome(service=service, options=self.options_factory())
+        return PooledDriver(driver)
+
+    def warm(self):
+        """Start every driver up front so the first pages don't pay Chrome startup."""
+        while True:
+            with self._lock:
+                if self._created >= self.size:
+                    return
+                self._created += 1
+            try:
+                self._idle.put(self._create())
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+    def acquire(self, timeout=None):
+        """Take an idle driver, starting a new one if the pool is not full yet."""
+        waited = 0.0
+        while True:
+            if self._closed:
+                raise RuntimeError("Driver pool is closed")
+
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+
+            if can_create:
+                try:
+                    return self._create()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+
+            # Poll rather than block forever: a recycled driver frees a slot
+            # without putting anything back on the idle queue.
+            try:
+                return self._idle.get(timeout=0.5)
+            except queue.Empty:
+                waited += 0.5
+                if timeout is not None and waited >= timeout:
+                    raise TimeoutError("Timed out waiting for a Chrome driver")
+
+    def release(self, pooled):
+        """Return a driver to the pool, recycling it if it is worn out."""
+        pooled.pages += 1
+        reason = None
+        if pooled.broken:
+            reason = "driver error"
+        elif pooled.pages >= self.max_pages:
+            reason = f"{pooled.pages} pages served"
+        else:
+            rss = pooled.rss_mb()
+            if rss is not None and rss > self.max_rss_mb:
+                reason = f"{rss:.0f} MB resident"
+
+        if reason is None and not self._closed:
+            self._idle.put(pooled)
+            return
+
+        pooled.quit()
+        with self._lock:
+            self._created -= 1
+        if reason is not None:
+            self.recycled += 1
+            print(f"Recycled Chrome driver ({reason})")
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """Context manager yielding a raw Selenium driver from the pool."""
+        pooled = self.acquire(timeout=timeout)
+        try:
+            yield pooled.driver
+        except WebDriverException:
+            pooled.broken = True
+            raise
+        finally:
+            self.release(pooled)
+
+    def close(self):
+        """Quit every idle driver. Drivers still in use are quit on release."""
+        self._closed = True
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            pooled.quit()
+            with self._lock:
+                self._created -= 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
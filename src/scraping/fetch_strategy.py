@@ -0,0 +1,248 @@
+"""
+# Fetch Strategy
+# This file provides:
+# - A shared keep-alive HTTP session for binghamtonwest.com
+# - HTTP-first page fetching that only escalates to Chrome when the static
+#   HTML is missing the fields the parser needs
+# - A per-URL memory of which fetch path worked, persisted between runs
+# - Conditional requests and normalised content hashes, so pages unchanged
+#   since the last run are recognised without being parsed
+# - Every request, HTTP or browser, goes through the shared per-host throttle
+"""
+
+import re
+import hashlib
+import threading
+import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from config.configuration import HEADERS, HTTP_POOL_SIZE, HTTP_TIMEOUT, FETCH_PATH_REPROBE_DAYS, THROTTLE_MAX_CONCURRENCY
+    from config.db import load_fetch_paths, load_page_validators, save_fetch_paths
+    from scraping.metrics import count, stage
+    from scraping.throttle import get_throttle
+except ImportError:
+    from src.config.configuration import HEADERS, HTTP_POOL_SIZE, HTTP_TIMEOUT, FETCH_PATH_REPROBE_DAYS, THROTTLE_MAX_CONCURRENCY
+    from src.config.db import load_fetch_paths, load_page_validators, save_fetch_paths
+    from src.scraping.metrics import count, stage
+    from src.scraping.throttle import get_throttle
+
+PATH_HTTP = 'http'
+PATH_BROWSER = 'browser'
+
+PRICE_PATTERN = re.compile(r'\$\s*[\d,]+')
+IMG_SRC_PATTERN = re.compile(r'<img\b[^>]*\bsrc\s*=', re.I)
+
+# Parts of a page that differ on every request without the listing changing:
+# comments, script nonces and the request ids / render timestamps Wix embeds
+VOLATILE_PATTERN = re.compile(
+    r'<!--.*?-->'
+    r'|\bnonce\s*=\s*"[^"]*"'
+    r'|"(?:requestId|request_id|renderTimestamp|timestamp|serverTime|ssrTime|visitorId|svSession)"'
+    r'\s*:\s*(?:"[^"]*"|[\d.]+)',
+    re.I | re.S
+)
+
+# Returned by fetch_http when the server confirms the stored copy is current
+NOT_MODIFIED = object()
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Return the process-wide keep-alive session used for every plain HTTP fetch."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                # Room for as many connections as the throttle may allow in flight
+                pool_size = max(HTTP_POOL_SIZE, THROTTLE_MAX_CONCURRENCY)
+                adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=pool_size)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers.update(HEADERS)
+                session.headers.update({
+                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+                    'Accept-Language': 'en-US,en;q=0.5',
+                    'Connection': 'keep-alive',
+                    'Upgrade-Insecure-Requests': '1',
+                    'Cache-Control': 'max-age=0',
+                })
+                _session = session
+    return _session
+
+
+def missing_fields(html):
+    """Return the names of the required listing fields absent from a page's HTML.
+
+    The check is deliberately cheap (plain substring/regex tests, no parsing):
+    it only has to decide whether the static HTML is good enough or the page
+    needs a browser to render.
+    """
+    missing = []
+    if not html:
+        return ['price', 'images', 'property details']
+    if not PRICE_PATTERN.search(html):
+        missing.append('price')
+    if not IMG_SRC_PATTERN.search(html):
+        missing.append('images')
+    if 'property details' not in html.lower():
+        missing.append('property details')
+    return missing
+
+
+def page_hash(html):
+    """SHA-256 of a page with per-request noise and whitespace differences removed."""
+    normalized = ''.join(VOLATILE_PATTERN.sub('', html or '').split())
+    return hashlib.sha256(normalized.encode('utf-8', errors='replace')).hexdigest()
+
+
+class FetchStrategy:
+    """Fetch listing pages over plain HTTP first and fall back to a Chrome pool.
+
+    The path that produced a complete page is remembered per URL, so later
+    runs go straight to the browser for pages known to need it. Browser-only
+    URLs are probed over HTTP again after FETCH_PATH_REPROBE_DAYS in case the
+    site starts serving them statically.
+
+    ``validators`` holds the ETag, Last-Modified and content hash stored for
+    each URL by the previous run. HTTP fetches send them as conditional
+    headers, and every fetched page is flagged ``changed`` only when its
+    normalised hash differs. Pass ``{}`` to treat every page as changed.
+    """
+
+    def __init__(self, driver_pool, load_browser_page=None, known_paths=None, validators=None):
+        self.driver_pool = driver_pool
+        self.load_browser_page = load_browser_page or self._default_browser_load
+        self.session = get_session()
+        self.throttle = get_throttle()
+        self.known_paths = load_fetch_paths() if known_paths is None else known_paths
+        self.validators = load_page_validators() if validators is None else validators
+        self._updates = {}
+        self._lock = threading.Lock()
+        self.stats = {PATH_HTTP: 0, PATH_BROWSER: 0, 'escalated': 0, 'not_modified': 0, 'unchanged': 0}
+
+    @staticmethod
+    def _default_browser_load(driver, url):
+        driver.get(url)
+        return driver.page_source, []
+
+    def _should_probe_http(self, url):
+        known = self.known_paths.get(url)
+        if not known or known['path'] != PATH_BROWSER:
+            return True
+        checked_at = known.get('checked_at')
+        if not checked_at:
+            return True
+        return datetime.datetime.now() - checked_at > datetime.timedelta(days=FETCH_PATH_REPROBE_DAYS)
+
+    def _record(self, url, path, probed):
+        with self._lock:
+            self.stats[path] += 1
+            known = self.known_paths.get(url)
+            # A failed probe refreshes checked_at so the next probe waits again
+            if not known or known['path'] != path or (probed and path == PATH_BROWSER):
+                self._updates[url] = path
+
+    def fetch_http(self, url):
+        """Fetch a page with the shared session, conditionally if validators are stored for it.
+
+        Returns ``(html, validators)``. html is None when the fetch failed
+        (after the throttle's retries) and NOT_MODIFIED when the server
+        answered 304.
+        """
+        known = self.validators.get(url) or {}
+        headers = {}
+        if known.get('etag'):
+            headers['If-None-Match'] = known['etag']
+        if known.get('last_modified'):
+            headers['If-Modified-Since'] = known['last_modified']
+        try:
+            with stage('http'):
+                response = self.throttle.get(self.session, url, headers=headers, timeout=HTTP_TIMEOUT)
+        except requests.RequestException as e:
+            print(f"HTTP fetch failed for {url}: {e}")
+            return None, {}
+        # What came over the wire (compressed), not the decoded body
+        count('bytes_downloaded', int(response.headers.get('Content-Length') or len(response.content)))
+        if response.status_code == 304:
+            return NOT_MODIFIED, {}
+        if response.status_code != 200:
+            print(f"HTTP fetch for {url} returned status {response.status_code}")
+            return None, {}
+        return response.text, {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+
+    def fetch_browser(self, url):
+        """Render a page in a pooled Chrome driver.
+
+        Returns ``(html, payloads)`` where payloads are any data-API JSON
+        responses the loader captured while the page rendered.
+        """
+        with stage('browser'), self.throttle.slot(url), self.driver_pool.driver() as driver:
+            return self.load_browser_page(driver, url)
+
+    def _page(self, url, html, path, payloads, validators):
+        content_hash = page_hash(html)
+        changed = content_hash != (self.validators.get(url) or {}).get('content_hash')
+        if not changed:
+            with self._lock:
+                self.stats['unchanged'] += 1
+        return {
+            'html': html,
+            'path': path,
+            'payloads': payloads,
+            'changed': changed,
+            'validators': dict(validators, content_hash=content_hash),
+        }
+
+    def fetch(self, url):
+        """Fetch a listing page.
+
+        Returns a dict with the page ``html``, the ``path`` that produced it,
+        any captured data ``payloads`` (always empty for the HTTP path, whose
+        data is embedded in the HTML), whether the page ``changed`` since the
+        last run and the ``validators`` to store for the next one. Pages
+        answered with 304 come back with ``html`` None and ``changed`` False.
+        """
+        probed = self._should_probe_http(url)
+        if probed:
+            html, validators = self.fetch_http(url)
+            if html is NOT_MODIFIED:
+                self._record(url, PATH_HTTP, probed)
+                with self._lock:
+                    self.stats['not_modified'] += 1
+                return {
+                    'html': None,
+                    'path': PATH_HTTP,
+                    'payloads': [],
+                    'changed': False,
+                    'validators': dict(self.validators.get(url) or {}),
+                }
+            missing = missing_fields(html)
+            if not missing:
+                self._record(url, PATH_HTTP, probed)
+                return self._page(url, html, PATH_HTTP, [], validators)
+            print(f"Static HTML for {url} is missing {', '.join(missing)}; using browser")
+            with self._lock:
+                self.stats['escalated'] += 1
+
+        html, payloads = self.fetch_browser(url)
+        self._record(url, PATH_BROWSER, probed)
+        # The static HTML's validators say nothing about data the browser loads
+        # afterwards, so browser pages are only compared by hash
+        return self._page(url, html, PATH_BROWSER, payloads, {})
+
+    def save(self):
+        """Persist the fetch paths learned during this run."""
+        with self._lock:
+            updates, self._updates = self._updates, {}
+        if updates:
+            save_fetch_paths(updates)
+        return len(updates)
@@ -0,0 +1,144 @@
+"""
+# Offline Geocoder
+# This file provides:
+# - Street-address geocoding against a bundled street gazetteer (one CSV
+#   row per street segment with its house-number range and end points), by
+#   linear interpolation along the segment; no network calls
+# - Haversine distance, used to store each listing's distance to campus
+"""
+
+import re
+import csv
+import math
+import threading
+
+try:
+    from config.configuration import GAZETTEER_PATH, CAMPUS_LAT, CAMPUS_LNG
+except ImportError:
+    from src.config.configuration import GAZETTEER_PATH, CAMPUS_LAT, CAMPUS_LNG
+
+EARTH_RADIUS_MILES = 3958.8
+
+# Street types and directionals, by their usual abbreviation. An address
+# without them ("10 Seminary Apt 2") matches the one street of that name
+STREET_SUFFIXES = {
+    'st': 'st', 'street': 'st', 'ave': 'ave', 'av': 'ave', 'avenue': 'ave', 'rd': 'rd', 'road': 'rd',
+    'dr': 'dr', 'drive': 'dr', 'pl': 'pl', 'place': 'pl', 'blvd': 'blvd', 'boulevard': 'blvd',
+    'ct': 'ct', 'court': 'ct', 'ln': 'ln', 'lane': 'ln', 'ter': 'ter', 'terrace': 'ter', 'way': 'way',
+    'pkwy': 'pkwy', 'parkway': 'pkwy', 'cir': 'cir', 'circle': 'cir', 'hwy': 'hwy',
+}
+DIRECTIONALS = {'n': 'n', 's': 's', 'e': 'e', 'w': 'w', 'north': 'n', 'south': 's', 'east': 'e', 'west': 'w'}
+# Everything from the unit designator on is not part of the street name. The
+# keywords are whole words after the first one, so "Floral Ave", "Stewart St"
+# and "Rear St" are left alone
+UNIT_PATTERN = re.compile(
+    r'\s+(?:apt|apartment|unit|suite|ste|fl|floor|rear)\b.*$|\s*#.*$', re.IGNORECASE
+)
+# A half number ("18-5", which the URL slug turns into "18 5") keeps the whole
+# number for interpolation
+ADDRESS_PATTERN = re.compile(r'^\s*(\d+)[a-zA-Z]?(?:[\s-]\d+)?\s+(.+)$')
+
+
+def haversine_miles(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points, in miles."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(a))
+
+
+def street_keys(name):
+    """(full, base) match keys for a street name: "Vestal Pkwy East" gives ('vestal pkwy e', 'vestal')."""
+    words = re.sub(r"[^a-z0-9 ]", ' ', name.lower()).split()
+    full = [DIRECTIONALS.get(w, STREET_SUFFIXES.get(w, w)) if i else w for i, w in enumerate(words)]
+    base = list(words)
+    while len(base) > 1 and (base[-1] in DIRECTIONALS or base[-1] in STREET_SUFFIXES):
+        base.pop()
+    return ' '.join(full), ' '.join(base)
+
+
+def parse_address(address):
+    """Split "10 Seminary Ave Apt 2, Binghamton, NY" into (10, 'Seminary Ave'); either may be None."""
+    if not isinstance(address, str):
+        return None, None
+    street = address.split(',')[0].strip()
+    match = ADDRESS_PATTERN.match(street)
+    number = None
+    if match:
+        number, street = int(match.group(1)), match.group(2)
+    # Only after the number is split off, so a street named like a unit
+    # keyword ("3 Rear St") keeps its name
+    street = UNIT_PATTERN.sub('', street).strip()
+    return number, street or None
+
+
+class Gazetteer:
+    """Street segments by normalised street name, loaded from a CSV file."""
+
+    def __init__(self, path=None):
+        self.path = path or GAZETTEER_PATH
+        self.streets = {}
+        names = {}
+        with open(self.path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(line for line in f if not line.startswith('#')):
+                segment = (int(row['from_number']), int(row['to_number']),
+                           float(row['from_lat']), float(row['from_lng']),
+                           float(row['to_lat']), float(row['to_lng']))
+                full, base = street_keys(row['street'])
+                self.streets.setdefault(full, []).append(segment)
+                names.setdefault(base, set()).add(full)
+        # A bare name only resolves when a single street has it
+        self.bare_names = {base: fulls.pop() for base, fulls in names.items() if len(fulls) == 1}
+
+    def segments(self, street):
+        full, base = street_keys(street)
+        return self.streets.get(full) or self.streets.get(self.bare_names.get(base))
+
+    def geocode(self, address):
+        """Return (lat, lng) for an address on a known street, or None.
+
+        The house number picks the segment whose range holds it (or the
+        nearest one) and its position along that segment; an address with
+        no number is placed at the middle of the street's first segment.
+        """
+        number, street = parse_address(address)
+        segments = self.segments(street) if street else None
+        if not segments:
+            return None
+        if number is None:
+            low, high, lat1, lng1, lat2, lng2 = segments[0]
+            return (lat1 + lat2) / 2, (lng1 + lng2) / 2
+        low, high, lat1, lng1, lat2, lng2 = min(
+            segments, key=lambda s: 0 if s[0] <= number <= s[1] else min(abs(number - s[0]), abs(number - s[1]))
+        )
+        t = min(1.0, max(0.0, (number - low) / (high - low))) if high > low else 0.5
+        return lat1 + (lat2 - lat1) * t, lng1 + (lng2 - lng1) * t
+
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer():
+    """Return the process-wide gazetteer, or None if the file cannot be read."""
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                try:
+                    _gazetteer = Gazetteer()
+                except (OSError, KeyError, ValueError) as e:
+                    print(f"Geocoding disabled: cannot load gazetteer {GAZETTEER_PATH}: {e}")
+                    _gazetteer = False
+    return _gazetteer or None
+
+
+def locate(*addresses):
+    """(latitude, longitude, distance_miles to campus) for the first address that geocodes, else Nones."""
+    gazetteer = get_gazetteer()
+    if gazetteer is not None:
+        for address in addresses:
+            point = gazetteer.geocode(address)
+            if point:
+                return point[0], point[1], round(haversine_miles(point[0], point[1], CAMPUS_LAT, CAMPUS_LNG), 3)
+    return None, None, None
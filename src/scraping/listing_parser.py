@@ -0,0 +1,328 @@
+"""
+# Listing Parser
+# This file provides:
+# - A single-pass lxml walk over a listing page that collects everything the
+#   extractors need (text nodes, images, Property Details lines, checkmark
+#   features, list items, text blocks, description)
+# - Extractors for price, availability, bedrooms, bathrooms, amenities,
+#   description and images that work on that collected page instead of
+#   re-scanning the tree
+#
+# The lxml tree is discarded as soon as the walk finishes, so only the small
+# page dict stays alive while the extractors run.
+"""
+
+import re
+from urllib.parse import urljoin
+
+import lxml.html
+from lxml import etree
+
+# Elements whose text is never page content
+SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'svg'}
+
+# Elements whose full text is taken as one block (their subtrees are small)
+BLOCK_TAGS = {'p', 'li', 'span', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+# Elements that can hold a Property Details section
+CONTAINER_TAGS = {'div', 'section', 'ul', 'ol', 'article'}
+
+# The green strip Binghamton West uses for the Property Details section
+DETAILS_SECTION_STYLE = 'background-color:rgba(0, 138, 69, 1)'
+DETAILS_HEADING_PATTERN = re.compile(r'^\s*(property\s+(details|features)|amenities|features)\s*:?\s*$', re.I)
+
+PRICE_PATTERN = re.compile(r'\$\s*[\d,]+(?:\.\d+)?(?:/[a-zA-Z]+)?')
+AVAILABILITY_PATTERN = re.compile(r'(?:available|unavailable) (?:until|from) ([a-zA-Z]+ \d{4})', re.I)
+BEDROOM_PATTERN = re.compile(r'(\d+)[\s-]bedroom', re.I)
+BATHROOM_PATTERN = re.compile(r'(\d+(?:\.5)?)[\s-](?:full\s+)?bath(?:room)?s?\b', re.I)
+CHECKMARK_PATTERN = re.compile(r'^[✓✔]\s*')
+DESCRIPTION_PATTERN = re.compile(r'(description|about this property)', re.I)
+
+FEATURE_KEYWORDS = ['bedroom', 'bathroom', 'kitchen', 'living', 'furnished', 'porch',
+                    'laundry', 'pet', 'bus', 'parking', 'storage', 'basement']
+
+FEATURE_PATTERNS = [
+    re.compile(pattern) for pattern in [
+        r'\b(one|1|two|2|three|3|four|4)\s+bedroom',
+        r'\bbig\s+eat[\s-]in\s+kitchen\b',
+        r'\bliving\s+room\b',
+        r'\bfully\s+furnished\b',
+        r'\blaundry\s+available\b',
+        r'\bfront\s+and\s+back\s+porch\b',
+        r'\b(\d+)\s+block\s+to\s+bus\s+stop\b',
+        r'\bparking\b',
+        r'\bpet\s+friendly\b',
+    ]
+]
+
+STREET_NAMES = ["ayres", "murray", "leroy", "chapin", "walnut", "oak"]
+
+UTF8_PARSER = lxml.html.HTMLParser(encoding='utf-8')
+
+
+def _clean(text):
+    return ' '.join(text.split()) if text else ''
+
+
+def parse_document(html):
+    """Walk a listing page once and return the data every extractor needs.
+
+    Returns a dict with:
+        texts: stripped text nodes in document order (scripts/styles excluded)
+        images: [{'src', 'width', 'height'}] for every img with a src
+        details: lines of the Property Details section
+        checkmarks: features written as checkmark lines
+        list_items: text of every li element
+        blocks: text of p/span/heading elements and the own text of divs
+        description: first substantial description-like block, or None
+    """
+    page = {
+        'texts': [],
+        'images': [],
+        'details': [],
+        'checkmarks': [],
+        'list_items': [],
+        'blocks': [],
+        'description': None,
+    }
+    if not html:
+        return page
+
+    parser = None
+    if isinstance(html, str):
+        # lxml refuses str input that carries an XML encoding declaration
+        html = html.encode('utf-8')
+        parser = UTF8_PARSER
+    try:
+        root = lxml.html.fromstring(html, parser=parser)
+    except (etree.ParserError, ValueError):
+        return page
+
+    # Stack entries: [element, is_green_section, is_details_container]
+    stack = []
+    skip_depth = 0
+    green_depth = 0
+    details_depth = 0
+
+    for event, el in etree.iterwalk(root, events=('start', 'end')):
+        tag = el.tag if isinstance(el.tag, str) else ''
+
+        if event == 'start':
+            if skip_depth or tag in SKIP_TAGS:
+                skip_depth += 1
+                continue
+            green = DETAILS_SECTION_STYLE in (el.get('style') or '')
+            stack.append([el, green, False])
+            green_depth += green
+
+            if tag == 'br':
+                # Keep line breaks visible to text_content() so feature lines can be split
+                el.tail = '\n' + (el.tail or '')
+            if el.text and el.text.strip():
+                page['texts'].append(el.text.strip())
+            if tag == 'img' and el.get('src'):
+                page['images'].append({'src': el.get('src'), 'width': el.get('width'), 'height': el.get('height')})
+            continue
+
+        # end event
+        if skip_depth:
+            skip_depth -= 1
+            if el.tail and el.tail.strip() and not skip_depth:
+                page['texts'].append(el.tail.strip())
+            continue
+
+        entry = stack.pop()
+        green_depth -= entry[1]
+        if entry[2]:
+            details_depth -= 1
+
+        raw_text = None
+        if tag in BLOCK_TAGS:
+            raw_text = el.text_content()
+        elif tag in CONTAINER_TAGS:
+            # Own text only: a div's full text would re-read every nested element
+            raw_text = ' '.join([el.text or ''] + [child.tail or '' for child in el])
+        if raw_text is not None:
+            text = _clean(raw_text)
+            if text:
+                _collect_block(page, tag, text, raw_text, in_details=details_depth > 0)
+                if DETAILS_HEADING_PATTERN.match(text):
+                    details_depth += _mark_details_container(stack, green_depth)
+
+        if el.tail and el.tail.strip():
+            page['texts'].append(el.tail.strip())
+
+    # Release the tree right away; only the collected strings are kept
+    root.clear()
+    del root
+    return page
+
+
+def _mark_details_container(stack, green_depth):
+    """Flag the container that holds a Property Details heading.
+
+    Prefers the outermost green section (the whole coloured strip), falling
+    back to the heading's parent. Returns 1 if a container was newly flagged.
+    """
+    target = None
+    if green_depth:
+        target = next((entry for entry in stack if entry[1]), None)
+    if target is None and stack:
+        target = stack[-1]
+    if target is None or target[2]:
+        return 0
+    target[2] = True
+    return 1
+
+
+def _collect_block(page, tag, text, raw_text, in_details):
+    page['blocks'].append(text)
+    if tag == 'li':
+        page['list_items'].append(text)
+    if CHECKMARK_PATTERN.match(text) and len(text) > 2:
+        feature = CHECKMARK_PATTERN.sub('', text).strip()
+        if len(feature) > 3:
+            page['checkmarks'].append(feature)
+    if in_details and tag in ('p', 'li') and not DETAILS_HEADING_PATTERN.match(text):
+        for line in raw_text.split('\n'):
+            line = _clean(line)
+            if len(line) > 3:
+                page['details'].append(line)
+    if page['description'] is None and tag in ('p', 'div') and len(text) > 50 and DESCRIPTION_PATTERN.search(text):
+        page['description'] = text
+
+
+def find_price(page):
+    """First dollar amount on the page, or "Contact for price"."""
+    for text in page['texts']:
+        match = PRICE_PATTERN.search(text)
+        if match and len(match.group()) > 1:
+            return match.group()
+    return "Contact for price"
+
+
+def find_availability(page):
+    for text in page['texts']:
+        match = AVAILABILITY_PATTERN.search(text)
+        if match:
+            return match.group(0)
+    return None
+
+
+def find_bedrooms(page):
+    for text in page['texts']:
+        match = BEDROOM_PATTERN.search(text)
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def find_bathrooms(page):
+    for text in page['texts']:
+        match = BATHROOM_PATTERN.search(text)
+        if match:
+            return int(float(match.group(1)))
+    return None
+
+
+def find_amenities(page):
+    """Raw amenity lines, from the most to the least reliable source.
+
+    Property Details lines come first; checkmark features, list items with
+    feature keywords and feature phrases found in text blocks are only used
+    while fewer than three lines have been found.
+    """
+    amenities = list(page['details'])
+
+    if len(amenities) < 3:
+        amenities.extend(page['checkmarks'])
+
+    if len(amenities) < 3:
+        amenities.extend(
+            text for text in page['list_items']
+            if any(keyword in text.lower() for keyword in FEATURE_KEYWORDS)
+        )
+
+    if len(amenities) < 3:
+        for text in page['blocks']:
+            lower_text = text.lower()
+            for pattern in FEATURE_PATTERNS:
+                match = pattern.search(lower_text)
+                if match:
+                    amenities.append(' '.join(word.capitalize() for word in match.group(0).split()))
+
+    # Remove duplicates while preserving order
+    seen = set()
+    unique = []
+    for item in amenities:
+        if item not in seen:
+            seen.add(item)
+            unique.append(item)
+    return unique
+
+
+def find_description(page):
+    return page['description'] or ""
+
+
+def find_images(page, base_url):
+    """All image URLs on the page, made absolute, in document order."""
+    images = []
+    for img in page['images']:
+        src = img['src']
+        if not src.startswith(("http://", "https://")):
+            src = urljoin(base_url, src)
+        if src not in images:
+            images.append(src)
+    return images
+
+
+def find_photos(page, base_url, limit=20):
+    """Listing photos for the gallery: every image except icons, logos and buttons."""
+    photos = []
+    for src in find_images(page, base_url):
+        if any(x in src.lower() for x in ["logo", "icon", "button"]):
+            continue
+        photos.append(src)
+        if len(photos) >= limit:
+            break
+    return photos
+
+
+def _dimension(value):
+    try:
+        return int(value or 0)
+    except ValueError:
+        return 0
+
+
+def select_image(page, base_url):
+    """Pick the listing's main image.
+
+    Map images win, then photos whose file name mentions the street, then any
+    image wider or taller than 200px. Icons, logos, buttons and generic
+    bedroom stock photos are skipped. Returns None if nothing qualifies.
+    """
+    def absolute(src):
+        return src if src.startswith(("http://", "https://")) else urljoin(base_url, src)
+
+    images = page['images']
+    for img in images:
+        src = img['src'].lower()
+        if "map" in src or "location" in src:
+            return absolute(img['src'])
+
+    for img in images:
+        src = img['src'].lower()
+        if any(x in src for x in ["logo", "icon", "button", "wix-image", "bedroom"]):
+            continue
+        if ("seminary" in src and "apt" in src) or any(street in src for street in STREET_NAMES):
+            return absolute(img['src'])
+
+    for img in images:
+        if _dimension(img['width']) > 200 or _dimension(img['height']) > 200:
+            src = img['src'].lower()
+            if not any(x in src for x in ["icon", "logo", "button", "bedroom"]):
+                return absolute(img['src'])
+
+    return None
@@ -0,0 +1,196 @@
+"""
+# Scrape Metrics
+# This file provides:
+# - Per-URL stage timings (queue wait, fetch, render, parse, image selection,
+#   database write) and counters such as bytes downloaded, recorded from
+#   wherever the work happens, including the parser processes
+# - A per-run aggregate (count, total, mean, p50, p95, max per stage, plus
+#   peak RSS of the scraper and of its parser processes) stored with the run as JSON and rendered in Prometheus text
+#   format
+"""
+
+import os
+import time
+import resource
+import threading
+from contextlib import contextmanager
+
+# Collector for the call being measured on this thread (or in this process)
+_current = threading.local()
+
+
+def record(stage_name, seconds):
+    """Add ``seconds`` to a stage of the call being measured. A no-op outside measure()."""
+    sample = getattr(_current, 'sample', None)
+    if sample is not None:
+        sample['timings'][stage_name] = sample['timings'].get(stage_name, 0.0) + seconds
+
+
+def count(name, amount=1):
+    """Add to a counter of the call being measured. A no-op outside measure()."""
+    sample = getattr(_current, 'sample', None)
+    if sample is not None:
+        sample['counts'][name] = sample['counts'].get(name, 0) + amount
+
+
+@contextmanager
+def stage(stage_name):
+    """Time a block as one stage of the call being measured."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage_name, time.perf_counter() - started)
+
+
+def measure(stage_name, fn, *args):
+    """Call ``fn(*args)`` as stage ``stage_name`` and collect what it records.
+
+    Returns ``(result, sample)`` where sample holds the ``timings`` and
+    ``counts`` recorded during the call, and the pid and peak RSS of the
+    process it ran in. Module-level, so it can be submitted to a process
+    pool and bring the child's timings and memory back.
+    """
+    previous = getattr(_current, 'sample', None)
+    sample = {'timings': {}, 'counts': {}}
+    _current.sample = sample
+    started = time.perf_counter()
+    try:
+        result = fn(*args)
+    finally:
+        _current.sample = previous
+    sample['timings'][stage_name] = time.perf_counter() - started
+    sample['pid'] = os.getpid()
+    sample['rss_mb'] = _self_rss_mb()
+    return result, sample
+
+
+def _self_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def _percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class RunMetrics:
+    """Stage timings and counters for one scrape run, safe to update from any thread."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.stages = {}
+        self.counters = {}
+        # Peak RSS of each parser process, as sampled by measure() in that process.
+        # RUSAGE_CHILDREN would also count Chrome and chromedriver, and never resets
+        self.parser_rss = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage_name, seconds):
+        with self._lock:
+            self.stages.setdefault(stage_name, []).append(seconds)
+
+    def add(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_sample(self, sample):
+        """Fold in the timings and counts measure() collected for one URL."""
+        if not sample:
+            return
+        with self._lock:
+            for stage_name, seconds in sample['timings'].items():
+                self.stages.setdefault(stage_name, []).append(seconds)
+            for name, amount in sample['counts'].items():
+                self.counters[name] = self.counters.get(name, 0) + amount
+            pid = sample.get('pid')
+            if pid is not None and pid != os.getpid():
+                self.parser_rss[pid] = max(self.parser_rss.get(pid, 0.0), sample['rss_mb'])
+
+    def report(self, **extra):
+        """Aggregate the run into a JSON-serialisable dict; ``extra`` is merged into ``counters``."""
+        with self._lock:
+            stages = {name: sorted(values) for name, values in self.stages.items()}
+            counters = dict(self.counters)
+            parser_rss = max(self.parser_rss.values(), default=0.0)
+        counters.update((name, value) for name, value in extra.items() if isinstance(value, (int, float)))
+        return {
+            'elapsed_seconds': round(time.monotonic() - self.started, 3),
+            'stages': {
+                name: {
+                    'count': len(values),
+                    'total': round(sum(values), 4),
+                    'mean': round(sum(values) / len(values), 4),
+                    'p50': round(_percentile(values, 0.5), 4),
+                    'p95': round(_percentile(values, 0.95), 4),
+                    'max': round(values[-1], 4),
+                }
+                for name, values in stages.items() if values
+            },
+            'counters': counters,
+            # The largest single parser process seen in this run
+            'peak_rss_mb': {'scraper': _self_rss_mb(), 'parsers': parser_rss},
+        }
+
+
+def print_report(report):
+    """Print where a run's time went, slowest stage first."""
+    print(f"Stage timings over {report['elapsed_seconds']:.1f}s "
+          f"(peak RSS {report['peak_rss_mb']['scraper']:.0f} MB scraper, "
+          f"{report['peak_rss_mb']['parsers']:.0f} MB per parser process):")
+    for name, timing in sorted(report['stages'].items(), key=lambda item: -item[1]['total']):
+        print(f"  {name:<16} {timing['count']:>6} x  total {timing['total']:9.2f}s  mean {timing['mean']:7.3f}s  "
+              f"p50 {timing['p50']:7.3f}s  p95 {timing['p95']:7.3f}s  max {timing['max']:7.3f}s")
+    if report['counters'].get('bytes_downloaded'):
+        print(f"  downloaded {report['counters']['bytes_downloaded'] / 1024:.0f} KB")
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text(report, run_id=None):
+    """Render a run report in the Prometheus text exposition format."""
+    labels = f'run_id="{_label(run_id)}",' if run_id is not None else ''
+    lines = [
+        '# HELP scraper_stage_seconds Time spent per URL (per batch for db_write) in each scrape stage.',
+        '# TYPE scraper_stage_seconds summary',
+    ]
+    for name, timing in sorted(report['stages'].items()):
+        stage_labels = f'{labels}stage="{_label(name)}"'
+        lines.append(f'scraper_stage_seconds{{{stage_labels},quantile="0.5"}} {timing["p50"]}')
+        lines.append(f'scraper_stage_seconds{{{stage_labels},quantile="0.95"}} {timing["p95"]}')
+        lines.append(f'scraper_stage_seconds_sum{{{stage_labels}}} {timing["total"]}')
+        lines.append(f'scraper_stage_seconds_count{{{stage_labels}}} {timing["count"]}')
+    lines += [
+        '# HELP scraper_run_count Counters for the scrape run.',
+        '# TYPE scraper_run_count gauge',
+    ]
+    for name, value in sorted(report['counters'].items()):
+        lines.append(f'scraper_run_count{{{labels}name="{_label(name)}"}} {value}')
+    lines += [
+        '# HELP scraper_peak_rss_megabytes Peak resident memory during the run.',
+        '# TYPE scraper_peak_rss_megabytes gauge',
+    ]
+    for process, megabytes in sorted(report['peak_rss_mb'].items()):
+        lines.append(f'scraper_peak_rss_megabytes{{{labels}process="{process}"}} {megabytes}')
+    lines += [
+        '# HELP scraper_run_seconds Wall-clock time of the scrape run.',
+        '# TYPE scraper_run_seconds gauge',
+        f'scraper_run_seconds{{{labels.rstrip(",")}}} {report["elapsed_seconds"]}' if labels
+        else f'scraper_run_seconds {report["elapsed_seconds"]}',
+    ]
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus_file(report, path, run_id=None):
+    """Write the report where a node_exporter textfile collector can pick it up (atomically)."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(prometheus_text(report, run_id))
+    os.replace(temp_path, path)
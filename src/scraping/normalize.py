@@ -0,0 +1,113 @@
+"""
+# Listing Normalisation
+# This file provides:
+# - Typed columns derived from the scraped text fields, filled in when a
+#   listing is saved so the read endpoints can filter and sort in SQL
+# - Bedrooms guessed from the title when the page did not give them
+# - Price: the listed amount in cents, the period it is quoted for, the
+#   per-bedroom share and the monthly equivalent the API filters on
+# - Coordinates from the offline geocoder, the distance to campus and the
+#   walking time from campus over the local street graph
+"""
+
+import re
+
+try:
+    from scraping.geocode import locate
+    from scraping.walk_times import walk_minutes
+except ImportError:
+    from src.scraping.geocode import locate
+    from src.scraping.walk_times import walk_minutes
+
+# "$1,250", "$1,250.00/mo", "$ 650/person"
+PRICE_AMOUNT_PATTERN = re.compile(r'\$\s*([\d,]*\d(?:\.\d+)?)(?:\s*/\s*([a-zA-Z]+))?')
+
+PRICE_PERIODS = {
+    'mo': 'month', 'mon': 'month', 'mos': 'month', 'mth': 'month', 'month': 'month', 'monthly': 'month',
+    'wk': 'week', 'week': 'week', 'weekly': 'week',
+    'yr': 'year', 'year': 'year', 'annual': 'year', 'annually': 'year',
+    'sem': 'semester', 'semester': 'semester',
+}
+# Suffixes meaning the amount is already one tenant's (one bedroom's) monthly share
+PER_BEDROOM_SUFFIXES = {'person', 'pp', 'ppl', 'student', 'tenant', 'bed', 'bedroom', 'br', 'room'}
+
+# price_cents is an INTEGER column
+MAX_CENTS = 2 ** 31 - 1
+
+# Months a price quoted for each period covers; a semester is taken as the
+# four and a half months of a fall or spring term
+MONTHS_PER_PERIOD = {'month': 1, 'week': 12 / 52, 'year': 12, 'semester': 4.5}
+
+# Title patterns tried in order: "2 Bedroom" / "2 BR" / "2-Bed", then "Apt 2"
+# (also "Apt 2L"), then a title ending in a number ("10 Seminary 2")
+BEDROOM_TITLE_PATTERNS = [
+    re.compile(r'(\d+)[\s-]*(?:bed|br|bedroom)', re.IGNORECASE),
+    re.compile(r'apt\s+(\d+)', re.IGNORECASE),
+    re.compile(r'\s(\d+)$'),
+]
+# A larger number in those places is a unit or street number, not a bedroom count
+MAX_INFERRED_BEDROOMS = 10
+
+
+def infer_bedrooms(title):
+    """Guess the bedroom count from a listing title, or None."""
+    if not isinstance(title, str):
+        return None
+    title = title.strip()
+    for pattern in BEDROOM_TITLE_PATTERNS:
+        match = pattern.search(title)
+        if match:
+            bedrooms = int(match.group(1))
+            return bedrooms if bedrooms <= MAX_INFERRED_BEDROOMS else None
+    return None
+
+
+def normalize_price(price, bedrooms=None):
+    """Split a scraped price into (price_cents, price_period, price_per_bedroom).
+
+    price_cents is the amount as listed, price_period one of month, week,
+    year or semester (month when the listing does not say), and
+    price_per_bedroom the amount divided over the bedrooms, in cents. A
+    price quoted per person is already per bedroom. All three are None when
+    there is no price ("Contact for price", "$,").
+    """
+    match = PRICE_AMOUNT_PATTERN.search(price or '') if isinstance(price, str) else None
+    if not match:
+        return None, None, None
+    cents = int(round(float(match.group(1).replace(',', '')) * 100))
+    if not 0 < cents <= MAX_CENTS:
+        return None, None, None
+    suffix = (match.group(2) or '').lower()
+    period = PRICE_PERIODS.get(suffix, 'month')
+    if suffix in PER_BEDROOM_SUFFIXES:
+        per_bedroom = cents
+    elif isinstance(bedrooms, int) and not isinstance(bedrooms, bool) and bedrooms >= 0:
+        # A studio (0 bedrooms) is one tenant's space
+        per_bedroom = int(round(cents / max(bedrooms, 1)))
+    else:
+        per_bedroom = None
+    return cents, period, per_bedroom
+
+
+def monthly_cents(price_cents, price_period):
+    """The monthly equivalent of a normalised price, in cents, or None."""
+    if price_cents is None:
+        return None
+    cents = int(round(price_cents / MONTHS_PER_PERIOD.get(price_period, 1)))
+    return cents if cents <= MAX_CENTS else None
+
+
+def normalize_listing(listing):
+    """Return a copy of a listing dict with bedrooms, the price columns and its location filled in."""
+    listing = dict(listing)
+    if listing.get('bedrooms') is None:
+        listing['bedrooms'] = infer_bedrooms(listing.get('title'))
+    listing['price_cents'], listing['price_period'], listing['price_per_bedroom'] = normalize_price(
+        listing.get('price'), listing.get('bedrooms')
+    )
+    listing['price_monthly_cents'] = monthly_cents(listing['price_cents'], listing['price_period'])
+    listing['latitude'], listing['longitude'], listing['distance_miles'] = locate(
+        listing.get('location'), listing.get('title')
+    )
+    listing['walk_minutes'] = walk_minutes(listing['latitude'], listing['longitude'])
+    return listing
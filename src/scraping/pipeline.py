@@ -0,0 +1,247 @@
+"""
+# Listing Pipeline
+# This file provides:
+# - A streaming fetch -> parse -> save pipeline for listing pages: fetcher
+#   threads feed a bounded queue, a process pool does the CPU-bound parsing
+#   and the calling thread writes results to the database in batches
+# - Per-URL stage timings (fetch, queue wait, parse, database write) fed
+#   into a RunMetrics
+# - Backpressure at every stage, so memory stays flat however many listings
+#   the site has, and each batch is committed as soon as it is full
+"""
+
+import os
+import time
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    from config.configuration import (
+        PIPELINE_PARSE_WORKERS, PIPELINE_QUEUE_SIZE, PIPELINE_BATCH_SIZE, PIPELINE_FLUSH_SECONDS
+    )
+    from scraping.metrics import RunMetrics, measure
+except ImportError:
+    from src.config.configuration import (
+        PIPELINE_PARSE_WORKERS, PIPELINE_QUEUE_SIZE, PIPELINE_BATCH_SIZE, PIPELINE_FLUSH_SECONDS
+    )
+    from src.scraping.metrics import RunMetrics, measure
+
+# Queue sentinel marking the end of a stage's output
+_DONE = object()
+
+
+class ListingPipeline:
+    """Run listing URLs through fetch, parse and save stages concurrently.
+
+    ``fetch(url)`` runs in ``fetch_workers`` threads and returns a page dict
+    with ``html``, ``payloads``, ``changed`` and ``validators`` (the shape
+    FetchStrategy.fetch returns). Changed pages are handed to
+    ``parse(url, html, payloads)``, which runs in a process pool and must be
+    a module-level function. ``save(listings)`` stores a batch and returns
+    the URLs it saved; ``mark(validators)`` then records the validators of
+    those pages and of the unchanged ones, so a crash never loses a
+    committed batch and never marks a page that was not saved.
+
+    ``report(url, error)``, if given, is called once per URL when its
+    outcome is final: ``error`` is None once the page is saved (or found
+    unchanged) and a message when it could not be fetched, parsed or saved.
+    ``progress(url, state, error, seconds)``, if given, is called as a URL
+    moves through the stages: ``fetched`` (with the fetch time), ``parsed``
+    and then one of ``saved``, ``unchanged`` or ``failed``. It is called
+    from the fetcher threads too, so it must be thread-safe.
+
+    Stage timings recorded by fetch and parse (see scraping.metrics), the
+    time pages wait for a parser and each batch write go into ``metrics``.
+
+    At most ``queue_size`` fetched pages wait for a parser and at most
+    ``queue_size`` parses are in flight or waiting to be written; fetchers
+    block when the parsers fall behind.
+
+    ``run`` may be called any number of times. Used as a context manager,
+    the pipeline keeps one parser process pool for all of those runs;
+    otherwise each run starts and stops its own.
+    """
+
+    def __init__(self, fetch, parse, save=None, mark=None, report=None, progress=None, metrics=None,
+                 fetch_workers=4, parse_workers=None, queue_size=None, batch_size=None, flush_seconds=None):
+        self.fetch = fetch
+        self.parse = parse
+        self.save = save
+        self.mark = mark
+        self.report = report
+        self.progress = progress
+        self.metrics = metrics or RunMetrics()
+        self.fetch_workers = max(1, fetch_workers)
+        self.parse_workers = max(1, parse_workers or PIPELINE_PARSE_WORKERS or os.cpu_count() or 1)
+        self.queue_size = max(1, queue_size or PIPELINE_QUEUE_SIZE)
+        self.batch_size = max(1, batch_size or PIPELINE_BATCH_SIZE)
+        self.flush_seconds = flush_seconds or PIPELINE_FLUSH_SECONDS
+        self._pages = queue.Queue(maxsize=self.queue_size)
+        self._results = queue.Queue()
+        self._parse_slots = threading.BoundedSemaphore(self.queue_size)
+        self.stats = {'fetched': 0, 'unchanged': 0, 'changed': 0, 'saved': 0, 'failed': 0, 'batches': 0}
+        self._pool = None
+
+    def __enter__(self):
+        self._pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+        return self
+
+    def __exit__(self, *exc_info):
+        pool, self._pool = self._pool, None
+        pool.shutdown()
+        return False
+
+    def _track(self, url, state, error=None, seconds=None):
+        """Pass a URL's new state to the progress hook, and its outcome to report once final."""
+        if self.progress:
+            self.progress(url, state, error, seconds)
+        if self.report and state in ('saved', 'unchanged', 'failed'):
+            self.report(url, error)
+
+    def _fetch_one(self, url):
+        started = time.monotonic()
+        try:
+            page, sample = measure('fetch', self.fetch, url)
+        except Exception as e:
+            print(f"Error fetching {url}: {e}")
+            self.metrics.observe('fetch', time.monotonic() - started)
+            self._results.put(('failed', url, f"fetch failed: {e}", None))
+            return
+        self.metrics.add_sample(sample)
+        if page is None:
+            self._results.put(('failed', url, "fetch failed", None))
+            return
+        self._track(url, 'fetched', seconds=sample['timings']['fetch'])
+        if page['changed']:
+            # Blocks while the parsers are behind
+            self._pages.put((url, page, time.monotonic()))
+        else:
+            self._results.put(('unchanged', url, None, page.get('validators')))
+
+    def _fetch_all(self, urls):
+        with ThreadPoolExecutor(max_workers=self.fetch_workers) as executor:
+            for url in urls:
+                executor.submit(self._fetch_one, url)
+        self._pages.put(_DONE)
+
+    def _dispatch(self, pool):
+        """Hand fetched pages to the process pool, at most queue_size at a time."""
+        while True:
+            item = self._pages.get()
+            if item is _DONE:
+                break
+            url, page, queued_at = item
+            # Released by the writer once it has taken the result
+            self._parse_slots.acquire()
+            self.metrics.observe('queue_wait', time.monotonic() - queued_at)
+            try:
+                future = pool.submit(measure, 'parse', self.parse, url, page['html'], page['payloads'])
+            except Exception as e:
+                self._parse_slots.release()
+                print(f"Error parsing {url}: {e}")
+                self._results.put(('failed', url, f"parse failed: {e}", None))
+                continue
+            self._results.put(('parsed', url, future, page.get('validators')))
+        self._results.put((_DONE, None, None, None))
+
+    def _flush(self, listings, validators, unchanged):
+        saved = []
+        if listings:
+            if self.save:
+                started = time.monotonic()
+                try:
+                    saved = self.save(listings) or []
+                except Exception as e:
+                    # The pages stay unmarked, so the next run fetches them again
+                    print(f"Error saving a batch of {len(listings)} listing(s): {e}")
+                self.metrics.observe('db_write', time.monotonic() - started)
+            self.stats['batches'] += 1
+            self.stats['saved'] += len(saved)
+        if self.mark:
+            saved_urls = set(saved)
+            pages = {url: page for url, page in unchanged.items() if page}
+            pages.update((url, page) for url, page in validators.items() if page and url in saved_urls)
+            if pages:
+                self.mark(pages)
+        saved_urls = set(saved)
+        for url in unchanged:
+            self._track(url, 'unchanged')
+        for listing in listings:
+            if listing['url'] in saved_urls:
+                self._track(listing['url'], 'saved')
+            else:
+                self._track(listing['url'], 'failed', "not saved")
+
+    def run(self, urls):
+        """Push ``urls`` through the pipeline. Returns the stage counters of this run."""
+        urls = list(urls)
+        before = dict(self.stats)
+        if self._pool is not None:
+            self._run(urls, self._pool)
+        else:
+            with ProcessPoolExecutor(max_workers=self.parse_workers) as pool:
+                self._run(urls, pool)
+        return {key: value - before[key] for key, value in self.stats.items()}
+
+    def _run(self, urls, pool):
+        fetcher = threading.Thread(target=self._fetch_all, args=(urls,), daemon=True)
+        dispatcher = threading.Thread(target=self._dispatch, args=(pool,), daemon=True)
+        fetcher.start()
+        dispatcher.start()
+
+        listings, validators, unchanged = [], {}, {}
+        first_pending = None
+        while True:
+            timeout = None
+            if first_pending is not None:
+                timeout = max(0, first_pending + self.flush_seconds - time.monotonic())
+            try:
+                kind, url, result, page_validators = self._results.get(timeout=timeout)
+            except queue.Empty:
+                kind = None
+
+            if kind is _DONE:
+                break
+            if kind == 'unchanged':
+                self.stats['fetched'] += 1
+                self.stats['unchanged'] += 1
+                unchanged[url] = page_validators
+            elif kind == 'failed':
+                self.stats['failed'] += 1
+                self._track(url, 'failed', result)
+            elif kind == 'parsed':
+                self.stats['fetched'] += 1
+                error = "no listing found"
+                try:
+                    listing, sample = result.result()
+                    self.metrics.add_sample(sample)
+                except Exception as e:
+                    print(f"Error parsing {url}: {e}")
+                    listing = None
+                    error = f"parse failed: {e}"
+                finally:
+                    self._parse_slots.release()
+                if listing:
+                    self._track(url, 'parsed')
+                    self.stats['changed'] += 1
+                    listings.append(listing)
+                    validators[url] = page_validators
+                else:
+                    self.stats['failed'] += 1
+                    self._track(url, 'failed', error)
+
+            if not listings and not unchanged:
+                first_pending = None
+                continue
+            if first_pending is None:
+                first_pending = time.monotonic()
+            if (len(listings) >= self.batch_size or len(unchanged) >= self.batch_size * 4
+                    or time.monotonic() - first_pending >= self.flush_seconds):
+                self._flush(listings, validators, unchanged)
+                listings, validators, unchanged = [], {}, {}
+                first_pending = None
+
+        self._flush(listings, validators, unchanged)
+        fetcher.join()
+        dispatcher.join()
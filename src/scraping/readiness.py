@@ -0,0 +1,245 @@
+"""
+# Page Readiness
+# This file provides:
+# - Event-driven waits for rendered listing pages (price text or a "contact
+#   for price" note, Property Details container, on-screen images loaded)
+#   instead of a fixed sleep
+# - Network-idle detection from Chrome DevTools Protocol performance logs
+# - Per-URL timing statistics used to choose timeouts, and a run report
+#   comparing the time spent waiting against the old fixed sleep
+"""
+
+import json
+import time
+import threading
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+try:
+    from config.configuration import (
+        READY_MIN_TIMEOUT, READY_MAX_TIMEOUT, READY_DEFAULT_TIMEOUT, NETWORK_IDLE_MS, FIXED_SLEEP_SECONDS
+    )
+    from config.db import load_ready_stats, save_ready_stats
+except ImportError:
+    from src.config.configuration import (
+        READY_MIN_TIMEOUT, READY_MAX_TIMEOUT, READY_DEFAULT_TIMEOUT, NETWORK_IDLE_MS, FIXED_SLEEP_SECONDS
+    )
+    from src.config.db import load_ready_stats, save_ready_stats
+
+# Weight of the newest sample in the per-URL moving average
+EWMA_ALPHA = 0.3
+
+# One round trip that evaluates every DOM condition at once. A listing without
+# a price says so instead ("Contact us for pricing"), which is just as final,
+# and lazy-loaded images below the fold never load, so only on-screen ones count
+DOM_CONDITIONS_SCRIPT = """
+const text = document.body ? document.body.innerText : '';
+const images = Array.from(document.images);
+const onScreen = img => {
+    const box = img.getBoundingClientRect();
+    return box.width > 0 && box.height > 0 && box.bottom > 0 && box.right > 0
+        && box.top < window.innerHeight && box.left < window.innerWidth;
+};
+return {
+    price: /\\$\\s*[\\d,]+/.test(text)
+        || /(?:contact|call|email|inquire|ask)[^\\n]{0,20}(?:price|pricing|rent)|price (?:on|upon) request/i.test(text),
+    details: /property details/i.test(text),
+    images: images.length > 0 && images.filter(onScreen).every(img => img.complete)
+};
+"""
+
+
+class NetworkMonitor:
+    """Track in-flight requests of one driver from its CDP performance log.
+
+    The performance log is a drain-once buffer, so every consumer of the
+    Network.* events for a page registers a listener here rather than calling
+    ``driver.get_log`` itself.
+    """
+
+    def __init__(self, driver, idle_ms=None):
+        self.driver = driver
+        self.idle_ms = idle_ms or NETWORK_IDLE_MS
+        self.inflight = set()
+        self.listeners = []
+        self.last_activity = time.monotonic()
+        self.available = True
+
+    def add_listener(self, callback):
+        """Register ``callback(method, params)`` for every CDP event seen."""
+        self.listeners.append(callback)
+
+    def start(self):
+        """Enable network events and discard anything left over from the previous page."""
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.get_log('performance')
+        except WebDriverException as e:
+            # Without performance logging we can only rely on the DOM conditions
+            print(f"CDP network monitoring unavailable: {e.msg}")
+            self.available = False
+        self.inflight.clear()
+        self.last_activity = time.monotonic()
+
+    def poll(self):
+        """Drain the performance log and update the in-flight request set."""
+        if not self.available:
+            return
+        try:
+            entries = self.driver.get_log('performance')
+        except WebDriverException:
+            self.available = False
+            return
+
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            method = message.get('method', '')
+            params = message.get('params', {})
+
+            if method == 'Network.requestWillBeSent':
+                self.inflight.add(params.get('requestId'))
+                self.last_activity = time.monotonic()
+            elif method in ('Network.loadingFinished', 'Network.loadingFailed'):
+                self.inflight.discard(params.get('requestId'))
+                self.last_activity = time.monotonic()
+
+            for listener in self.listeners:
+                listener(method, params)
+
+    def is_idle(self):
+        """True once no request has been in flight for ``idle_ms``."""
+        self.poll()
+        if not self.available:
+            return True
+        quiet_for = (time.monotonic() - self.last_activity) * 1000
+        return not self.inflight and quiet_for >= self.idle_ms
+
+
+class ReadinessTracker:
+    """Wait for listing pages to be usable and learn how long each URL takes.
+
+    Each URL keeps an exponentially weighted average of its time to ready.
+    The timeout for the next load is three times that average plus a second,
+    clamped to [READY_MIN_TIMEOUT, READY_MAX_TIMEOUT]; unknown URLs get
+    READY_DEFAULT_TIMEOUT. A load that times out still counts, with the
+    time until its network went quiet (at most READY_DEFAULT_TIMEOUT), so a
+    URL that never meets every condition settles on its real load time.
+    """
+
+    def __init__(self, stats=None):
+        self.stats = load_ready_stats() if stats is None else stats
+        self._updated = {}
+        self._lock = threading.Lock()
+        self.pages = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.total_load = 0.0
+
+    def timeout_for(self, url):
+        known = self.stats.get(url)
+        if not known or not known.get('ready_ms'):
+            return READY_DEFAULT_TIMEOUT
+        timeout = known['ready_ms'] * 3 / 1000 + 1
+        return min(READY_MAX_TIMEOUT, max(READY_MIN_TIMEOUT, timeout))
+
+    def _record(self, url, load_seconds, wait_seconds, timed_out, settled_seconds=None):
+        elapsed = load_seconds + wait_seconds
+        if timed_out:
+            # Capped, so one bad load doesn't stretch every later wait for this URL
+            elapsed = min(elapsed, settled_seconds or elapsed, READY_DEFAULT_TIMEOUT)
+        with self._lock:
+            self.pages += 1
+            self.total_load += load_seconds
+            self.total_wait += wait_seconds
+            if timed_out:
+                self.timeouts += 1
+            known = self.stats.get(url) or {'ready_ms': None, 'samples': 0}
+            sample = elapsed * 1000
+            if known['ready_ms'] is None:
+                ready_ms = sample
+            else:
+                ready_ms = EWMA_ALPHA * sample + (1 - EWMA_ALPHA) * known['ready_ms']
+            known = {'ready_ms': ready_ms, 'samples': known['samples'] + 1}
+            self.stats[url] = known
+            self._updated[url] = known
+
+    def load(self, driver, url, monitor=None):
+        """Navigate to ``url`` and block until the page is ready or the timeout passes.
+
+        Returns a dict with the seconds spent in ``driver.get`` and waiting
+        afterwards, whether the wait timed out and the state of each DOM
+        condition at the end of the wait.
+        """
+        monitor = monitor or NetworkMonitor(driver)
+        monitor.start()
+        timeout = self.timeout_for(url)
+        conditions = {}
+
+        def page_ready(d):
+            # Drain the network log on every poll so idle time is measured accurately
+            idle = monitor.is_idle()
+            conditions.update(d.execute_script(DOM_CONDITIONS_SCRIPT) or {})
+            return idle and all(conditions.get(name) for name in ('price', 'details', 'images'))
+
+        started = time.monotonic()
+        driver.get(url)
+        loaded = time.monotonic()
+        timed_out = False
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=0.1).until(page_ready)
+        except TimeoutException:
+            timed_out = True
+            missing = [name for name in ('price', 'details', 'images') if not conditions.get(name)]
+            if monitor.inflight:
+                missing.append(f"{len(monitor.inflight)} request(s) in flight")
+            print(f"Page {url} not fully ready after {timeout:.1f}s (missing: {', '.join(missing) or 'network idle'})")
+        load_seconds = loaded - started
+        wait_seconds = time.monotonic() - loaded
+        # When the page last had network activity; what a timed-out load is recorded as
+        settled_seconds = max(monitor.last_activity - started, load_seconds) if monitor.available else None
+
+        self._record(url, load_seconds, wait_seconds, timed_out, settled_seconds)
+        return {
+            'load_seconds': load_seconds,
+            'wait_seconds': wait_seconds,
+            'timed_out': timed_out,
+            'conditions': dict(conditions),
+        }
+
+    def save(self):
+        """Persist the timing statistics updated during this run."""
+        with self._lock:
+            updated, self._updated = self._updated, {}
+        if updated:
+            save_ready_stats(updated)
+        return len(updated)
+
+    def report(self):
+        """Summarise time spent waiting after page load compared with a fixed sleep per page."""
+        baseline = self.pages * FIXED_SLEEP_SECONDS
+        return {
+            'pages': self.pages,
+            'timeouts': self.timeouts,
+            'load_seconds': round(self.total_load, 2),
+            'wait_seconds': round(self.total_wait, 2),
+            'fixed_sleep_seconds': round(baseline, 2),
+            'saved_seconds': round(baseline - self.total_wait, 2),
+            'avg_wait_seconds': round(self.total_wait / self.pages, 2) if self.pages else 0.0,
+        }
+
+    def print_report(self):
+        report = self.report()
+        if not report['pages']:
+            print("Scrape timing: no pages rendered in the browser")
+            return report
+        print(
+            f"Scrape timing: {report['pages']} browser page(s), waited {report['wait_seconds']}s "
+            f"(avg {report['avg_wait_seconds']}s, {report['timeouts']} timeout(s)) vs "
+            f"{report['fixed_sleep_seconds']}s with a fixed {FIXED_SLEEP_SECONDS}s sleep; "
+            f"saved {report['saved_seconds']}s"
+        )
+        return report
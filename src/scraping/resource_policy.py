@@ -0,0 +1,214 @@
+"""
+# Resource Policy
+# This file provides:
+# - Blocking of images, fonts, stylesheets, media and third-party trackers in
+#   the scraping browser through CDP Network.setBlockedURLs
+# - Per-page accounting of bytes downloaded and requests blocked
+# - An audit mode that loads everything but measures what blocking would
+#   save, used to estimate savings while blocking is on
+"""
+
+import os
+import json
+import threading
+from fnmatch import fnmatch
+from urllib.parse import urlparse
+
+from selenium.common.exceptions import WebDriverException
+
+try:
+    from config.configuration import (
+        RESOURCE_POLICY_MODE, RESOURCE_BLOCK_TYPES, RESOURCE_BLOCK_DOMAINS, RESOURCE_PROFILE_PATH
+    )
+except ImportError:
+    from src.config.configuration import (
+        RESOURCE_POLICY_MODE, RESOURCE_BLOCK_TYPES, RESOURCE_BLOCK_DOMAINS, RESOURCE_PROFILE_PATH
+    )
+
+MODE_OFF = 'off'
+MODE_BLOCK = 'block'
+MODE_AUDIT = 'audit'
+
+# URL patterns per resource type. The parser only reads img src attributes,
+# which stay in the DOM when the image download itself is blocked.
+RESOURCE_TYPE_PATTERNS = {
+    'image': ['*.jpg*', '*.jpeg*', '*.png*', '*.gif*', '*.webp*', '*.svg*', '*.ico*', '*static.wixstatic.com/media/*'],
+    'font': ['*.woff*', '*.woff2*', '*.ttf*', '*.otf*', '*.eot*'],
+    'stylesheet': ['*.css*'],
+    'media': ['*.mp4*', '*.webm*', '*.mp3*', '*video.wixstatic.com/*'],
+}
+
+TRACKER = 'tracker'
+
+
+class ResourcePolicy:
+    """Decide which browser requests to block and keep run-wide savings totals.
+
+    ``blocked_types`` are keys of RESOURCE_TYPE_PATTERNS; ``blocked_domains``
+    are host suffixes treated as third-party trackers and widgets.
+    """
+
+    def __init__(self, mode=None, blocked_types=None, blocked_domains=None, profile_path=None):
+        self.mode = mode or RESOURCE_POLICY_MODE
+        self.blocked_types = list(RESOURCE_BLOCK_TYPES if blocked_types is None else blocked_types)
+        self.blocked_domains = list(RESOURCE_BLOCK_DOMAINS if blocked_domains is None else blocked_domains)
+        self.profile_path = profile_path or RESOURCE_PROFILE_PATH
+        self.profile = self._load_profile()
+        self._lock = threading.Lock()
+        self.totals = {'pages': 0, 'bytes_downloaded': 0, 'bytes_saved': 0, 'seconds_saved': 0.0, 'blocked': {}}
+
+        unknown = [t for t in self.blocked_types if t not in RESOURCE_TYPE_PATTERNS]
+        if unknown:
+            print(f"Ignoring unknown resource types in policy: {', '.join(unknown)}")
+            self.blocked_types = [t for t in self.blocked_types if t in RESOURCE_TYPE_PATTERNS]
+
+    def _load_profile(self):
+        try:
+            with open(self.profile_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'type_bytes': {}, 'page_seconds': {}}
+
+    def blocked_url_patterns(self):
+        """The wildcard patterns handed to Network.setBlockedURLs."""
+        patterns = []
+        for resource_type in self.blocked_types:
+            patterns.extend(RESOURCE_TYPE_PATTERNS[resource_type])
+        for domain in self.blocked_domains:
+            patterns.append(f'*://{domain}/*')
+            patterns.append(f'*://*.{domain}/*')
+        return patterns
+
+    def classify(self, url):
+        """Return the policy category a request URL falls under, or None."""
+        host = (urlparse(url).hostname or '').lower()
+        for domain in self.blocked_domains:
+            if host == domain or host.endswith('.' + domain):
+                return TRACKER
+        lowered = url.lower()
+        for resource_type in self.blocked_types:
+            if any(fnmatch(lowered, pattern) for pattern in RESOURCE_TYPE_PATTERNS[resource_type]):
+                return resource_type
+        return None
+
+    def attach(self, driver, monitor):
+        """Apply the policy to a driver and start accounting for the next page load."""
+        if self.mode == MODE_OFF:
+            return None
+        patterns = self.blocked_url_patterns() if self.mode == MODE_BLOCK else []
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        except WebDriverException as e:
+            print(f"Could not apply resource policy: {e.msg}")
+            return None
+        page = PageResources(self)
+        monitor.add_listener(page.on_event)
+        return page
+
+    def record_page(self, url, report):
+        """Fold one page report into the run totals and, in audit mode, the profile."""
+        with self._lock:
+            self.totals['pages'] += 1
+            self.totals['bytes_downloaded'] += report['bytes_downloaded']
+            self.totals['bytes_saved'] += report['bytes_saved'] or 0
+            self.totals['seconds_saved'] += report['seconds_saved'] or 0
+            for category, count in report['blocked'].items():
+                self.totals['blocked'][category] = self.totals['blocked'].get(category, 0) + count
+
+            if self.mode == MODE_AUDIT:
+                type_bytes = self.profile.setdefault('type_bytes', {})
+                for category, (count, size) in report['would_block'].items():
+                    known = type_bytes.get(category, {'count': 0, 'bytes': 0})
+                    type_bytes[category] = {'count': known['count'] + count, 'bytes': known['bytes'] + size}
+                self.profile.setdefault('page_seconds', {})[url] = report['seconds']
+
+    def average_bytes(self, category):
+        known = self.profile.get('type_bytes', {}).get(category)
+        if not known or not known['count']:
+            return None
+        return known['bytes'] / known['count']
+
+    def baseline_seconds(self, url):
+        return self.profile.get('page_seconds', {}).get(url)
+
+    def save_profile(self):
+        """Write the audit measurements used to estimate savings in block mode."""
+        if self.mode != MODE_AUDIT:
+            return
+        directory = os.path.dirname(self.profile_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with self._lock:
+            with open(self.profile_path, 'w') as f:
+                json.dump(self.profile, f, indent=2)
+
+    def print_report(self):
+        totals = self.totals
+        if self.mode == MODE_OFF or not totals['pages']:
+            return totals
+        blocked = ', '.join(f"{count} {category}" for category, count in sorted(totals['blocked'].items())) or 'none'
+        verb = 'would save' if self.mode == MODE_AUDIT else 'saved about'
+        print(
+            f"Resource policy ({self.mode}): {totals['pages']} page(s), "
+            f"{totals['bytes_downloaded'] / 1024:.0f} KB downloaded, blocked requests: {blocked}; "
+            f"{verb} {totals['bytes_saved'] / 1024:.0f} KB and {totals['seconds_saved']:.1f}s"
+        )
+        return totals
+
+
+class PageResources:
+    """Per-page request accounting fed by NetworkMonitor CDP events."""
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.requests = {}
+        self.bytes_downloaded = 0
+        self.blocked = {}
+        self.would_block = {}
+
+    def on_event(self, method, params):
+        request_id = params.get('requestId')
+        if method == 'Network.requestWillBeSent':
+            self.requests[request_id] = params.get('request', {}).get('url', '')
+        elif method == 'Network.loadingFinished':
+            size = int(params.get('encodedDataLength') or 0)
+            self.bytes_downloaded += size
+            if self.policy.mode == MODE_AUDIT:
+                category = self.policy.classify(self.requests.get(request_id, ''))
+                if category:
+                    count, total = self.would_block.get(category, (0, 0))
+                    self.would_block[category] = (count + 1, total + size)
+        elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+            category = self.policy.classify(self.requests.get(request_id, '')) or 'other'
+            self.blocked[category] = self.blocked.get(category, 0) + 1
+
+    def finish(self, url, seconds):
+        """Build this page's report and add it to the policy totals."""
+        policy = self.policy
+        bytes_saved = None
+        seconds_saved = None
+
+        if policy.mode == MODE_AUDIT:
+            bytes_saved = sum(size for _, size in self.would_block.values())
+        else:
+            estimates = [policy.average_bytes(category) for category in self.blocked]
+            if self.blocked and all(estimate is not None for estimate in estimates):
+                bytes_saved = int(sum(
+                    policy.average_bytes(category) * count for category, count in self.blocked.items()
+                ))
+            baseline = policy.baseline_seconds(url)
+            if baseline is not None:
+                seconds_saved = baseline - seconds
+
+        report = {
+            'url': url,
+            'seconds': seconds,
+            'bytes_downloaded': self.bytes_downloaded,
+            'blocked': dict(self.blocked),
+            'would_block': dict(self.would_block),
+            'bytes_saved': bytes_saved,
+            'seconds_saved': seconds_saved,
+        }
+        policy.record_page(url, report)
+        return report
@@ -0,0 +1,71 @@
+"""
+# Scrape Run Ledger
+# This file provides:
+# - Per-URL progress of a scrape run (fetched, parsed, then saved,
+#   unchanged or failed, with fetch times and errors), checkpointed to the
+#   scrape_run_urls table in small batches
+# - What the scraper's --resume mode reads to continue an interrupted run
+#   instead of starting over
+"""
+
+import time
+import datetime
+import threading
+
+try:
+    from config.configuration import SCRAPE_RUN_CHECKPOINT_SECONDS, SCRAPE_RUN_CHECKPOINT_SIZE
+    from config.db import record_scrape_run_progress
+except ImportError:
+    from src.config.configuration import SCRAPE_RUN_CHECKPOINT_SECONDS, SCRAPE_RUN_CHECKPOINT_SIZE
+    from src.config.db import record_scrape_run_progress
+
+# Column stamped with the time a URL reaches each state
+STATE_TIMESTAMPS = {
+    'fetched': 'fetched_at',
+    'parsed': 'parsed_at',
+    'saved': 'finished_at',
+    'unchanged': 'finished_at',
+    'failed': 'finished_at',
+}
+
+
+class RunLedger:
+    """Buffer URL state changes for one run and write them out in batches.
+
+    ``record`` has the signature of ListingPipeline's progress hook. Changes
+    are merged per URL and written every SCRAPE_RUN_CHECKPOINT_SECONDS or
+    SCRAPE_RUN_CHECKPOINT_SIZE URLs, so a crash loses at most the last few
+    seconds of progress; those URLs are simply scraped again on resume.
+    """
+
+    def __init__(self, run_id, checkpoint_seconds=None, checkpoint_size=None):
+        self.run_id = run_id
+        self.checkpoint_seconds = checkpoint_seconds or SCRAPE_RUN_CHECKPOINT_SECONDS
+        self.checkpoint_size = checkpoint_size or SCRAPE_RUN_CHECKPOINT_SIZE
+        self._pending = {}
+        self._last_checkpoint = time.monotonic()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def record(self, url, state, error=None, seconds=None):
+        now = datetime.datetime.utcnow()
+        with self._lock:
+            row = self._pending.setdefault(url, {})
+            row['state'] = state
+            row['error'] = error
+            row[STATE_TIMESTAMPS.get(state, 'finished_at')] = now
+            if seconds is not None:
+                row['fetch_ms'] = int(seconds * 1000)
+            due = (len(self._pending) >= self.checkpoint_size
+                   or time.monotonic() - self._last_checkpoint >= self.checkpoint_seconds)
+        if due:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Write every buffered change now."""
+        # Writes are serialised so an older batch never lands after a newer one
+        with self._write_lock:
+            with self._lock:
+                updates, self._pending = self._pending, {}
+                self._last_checkpoint = time.monotonic()
+            record_scrape_run_progress(self.run_id, updates)
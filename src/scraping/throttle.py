@@ -0,0 +1,292 @@
+"""
+# Request Throttle
+# This file provides:
+# - A shared, per-host politeness and throughput controller for every
+#   outbound request the scraper and the maintenance endpoints make
+# - A token bucket capping the request rate, a concurrency limit that grows
+#   while the host answers quickly and halves on errors or slow responses
+#   (AIMD), retries with jittered exponential backoff, and a circuit breaker
+#   that fails fast while a host is down
+"""
+
+import time
+import random
+import threading
+import email.utils
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import requests
+
+try:
+    from config.configuration import (
+        THROTTLE_RATE, THROTTLE_BURST, THROTTLE_MIN_CONCURRENCY, THROTTLE_MAX_CONCURRENCY,
+        THROTTLE_TARGET_LATENCY, THROTTLE_RETRIES, THROTTLE_BACKOFF_BASE, THROTTLE_BACKOFF_CAP,
+        BREAKER_FAILURES, BREAKER_COOLDOWN_SECONDS
+    )
+    from scraping.metrics import stage
+except ImportError:
+    from src.config.configuration import (
+        THROTTLE_RATE, THROTTLE_BURST, THROTTLE_MIN_CONCURRENCY, THROTTLE_MAX_CONCURRENCY,
+        THROTTLE_TARGET_LATENCY, THROTTLE_RETRIES, THROTTLE_BACKOFF_BASE, THROTTLE_BACKOFF_CAP,
+        BREAKER_FAILURES, BREAKER_COOLDOWN_SECONDS
+    )
+    from src.scraping.metrics import stage
+
+# Responses that mean "try again later" rather than "this page is broken"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+def retry_after_seconds(response):
+    """Seconds a 429 / 503 response asks us to wait, or None."""
+    value = response.headers.get('Retry-After') if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_seconds(attempt, base=None, cap=None):
+    """Full-jitter exponential backoff before retry number ``attempt`` (1-based)."""
+    base = THROTTLE_BACKOFF_BASE if base is None else base
+    cap = THROTTLE_BACKOFF_CAP if cap is None else cap
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class HostThrottle:
+    """Rate, concurrency and circuit state for one host.
+
+    The concurrency limit rises by about one slot per limit's worth of fast
+    successes and halves on a 429, 5xx, timeout or a response slower than
+    THROTTLE_TARGET_LATENCY, so it settles just below the point where the
+    host starts to struggle. After BREAKER_FAILURES failures in a row the
+    circuit opens: requests fail fast for BREAKER_COOLDOWN_SECONDS, then a
+    single trial request decides whether it closes again.
+    """
+
+    def __init__(self, host, rate=None, burst=None, min_concurrency=None, max_concurrency=None,
+                 target_latency=None, failures=None, cooldown=None):
+        self.host = host
+        self.rate = rate or THROTTLE_RATE
+        self.burst = max(1, burst or THROTTLE_BURST)
+        self.min_concurrency = max(1, min_concurrency or THROTTLE_MIN_CONCURRENCY)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency or THROTTLE_MAX_CONCURRENCY)
+        self.target_latency = target_latency or THROTTLE_TARGET_LATENCY
+        self.failure_threshold = max(1, failures or BREAKER_FAILURES)
+        self.cooldown = cooldown or BREAKER_COOLDOWN_SECONDS
+
+        self.limit = float(self.min_concurrency)
+        self.in_flight = 0
+        self.tokens = float(self.burst)
+        self.refilled_at = time.monotonic()
+        self.paused_until = 0.0
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self._cond = threading.Condition()
+        self.stats = {'requests': 0, 'retries': 0, 'throttled': 0, 'errors': 0, 'slow': 0,
+                      'rejected': 0, 'circuit_opens': 0, 'peak_limit': self.min_concurrency}
+
+    def _check_circuit(self):
+        """Called with the lock held. Raises while the circuit is open; returns True for the trial request."""
+        if self.state == CLOSED:
+            return False
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        self.stats['rejected'] += 1
+        raise CircuitOpenError(f"Circuit open for {self.host}; not sending the request")
+
+    def _take_token(self):
+        """Called with the lock held. Returns 0 once a token is taken, else the seconds to wait."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.refilled_at) * self.rate)
+        self.refilled_at = now
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        """Block until a request may be sent. Returns True if it is the circuit's trial request."""
+        with self._cond:
+            while True:
+                trial = self._check_circuit()
+                if self.in_flight < int(self.limit) or trial:
+                    wait = self._take_token()
+                    if wait == 0:
+                        self.in_flight += 1
+                        self.stats['requests'] += 1
+                        return trial
+                    if trial:
+                        self.trial_in_flight = False
+                else:
+                    wait = None
+                # Woken early by a release; tokens and the circuit are checked again
+                self._cond.wait(wait)
+
+    def count(self, name):
+        with self._cond:
+            self.stats[name] += 1
+
+    def release(self, ok, latency=None, retry_after=None, trial=False):
+        """Record a request's outcome and free its slot.
+
+        ``ok`` is False for responses and errors worth retrying. ``latency``
+        (seconds) feeds the concurrency limit; ``retry_after`` pauses the
+        whole host, as a 429's Retry-After asks.
+        """
+        with self._cond:
+            self.in_flight -= 1
+            if trial:
+                self.trial_in_flight = False
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+            if ok:
+                self.failures = 0
+                if self.state != CLOSED:
+                    print(f"Circuit for {self.host} closed")
+                    self.state = CLOSED
+                if latency is not None and latency > self.target_latency:
+                    self.stats['slow'] += 1
+                    self.limit = max(self.min_concurrency, self.limit / 2)
+                else:
+                    self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            else:
+                self.stats['errors'] += 1
+                self.failures += 1
+                self.limit = max(self.min_concurrency, self.limit / 2)
+                if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                    self.state = OPEN
+                    self.opened_at = time.monotonic()
+                    self.stats['circuit_opens'] += 1
+                    print(f"Circuit for {self.host} opened after {self.failures} failure(s); "
+                          f"pausing for {self.cooldown:g}s")
+            self.stats['peak_limit'] = max(self.stats['peak_limit'], int(self.limit))
+            self._cond.notify_all()
+
+
+class Throttle:
+    """Registry of HostThrottles, one per host, shared by every caller in the process."""
+
+    def __init__(self, retries=None, **host_options):
+        self.retries = THROTTLE_RETRIES if retries is None else retries
+        self.host_options = host_options
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def host(self, url):
+        name = urlparse(url).hostname or ''
+        with self._lock:
+            throttle = self._hosts.get(name)
+            if throttle is None:
+                throttle = self._hosts[name] = HostThrottle(name, **self.host_options)
+            return throttle
+
+    @contextmanager
+    def slot(self, url):
+        """Hold one of the host's request slots, e.g. around a browser page load.
+
+        An exception inside the block counts as a failure and anything else
+        as a success. Page renders take far longer than plain requests, so
+        their time does not feed the concurrency limit.
+        """
+        host = self.host(url)
+        with stage('throttle_wait'):
+            trial = host.acquire()
+        try:
+            yield host
+        except Exception:
+            host.release(False, trial=trial)
+            raise
+        host.release(True, trial=trial)
+
+    def request(self, session, method, url, retries=None, **kwargs):
+        """Send a request through the host's throttle, retrying transient failures.
+
+        429 and 5xx responses, timeouts and connection errors are retried up
+        to ``retries`` times with jittered exponential backoff (or the
+        server's Retry-After). Returns the last response, which may still be
+        an error status, or raises the last exception. CircuitOpenError is
+        raised without retrying.
+        """
+        retries = self.retries if retries is None else retries
+        host = self.host(url)
+        attempt = 0
+        while True:
+            with stage('throttle_wait'):
+                trial = host.acquire()
+            started = time.monotonic()
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.Timeout, requests.ConnectionError):
+                host.release(False, trial=trial)
+                if attempt >= retries:
+                    raise
+                error = True
+                response = None
+            except Exception:
+                host.release(True, trial=trial)
+                raise
+            else:
+                error = response.status_code in RETRY_STATUSES
+                retry_after = retry_after_seconds(response) if error else None
+                if response.status_code == 429:
+                    host.count('throttled')
+                host.release(not error, time.monotonic() - started, retry_after, trial)
+                if not error or attempt >= retries:
+                    return response
+
+            attempt += 1
+            host.count('retries')
+            # A Retry-After pause is enforced by acquire; the jitter spreads the retries out
+            time.sleep(backoff_seconds(attempt))
+
+    def get(self, session, url, **kwargs):
+        return self.request(session, 'GET', url, **kwargs)
+
+    def print_report(self):
+        with self._lock:
+            hosts = list(self._hosts.values())
+        for host in hosts:
+            stats = host.stats
+            if not stats['requests'] and not stats['rejected']:
+                continue
+            print(f"Throttle {host.host}: {stats['requests']} request(s), {stats['retries']} retried, "
+                  f"{stats['throttled']} rate-limited (429), {stats['errors']} error(s), {stats['slow']} slow, "
+                  f"{stats['rejected']} rejected by the circuit breaker ({stats['circuit_opens']} opening(s)); "
+                  f"concurrency limit now {int(host.limit)}, peak {stats['peak_limit']}")
+
+
+_throttle = None
+_throttle_lock = threading.Lock()
+
+
+def get_throttle():
+    """Return the process-wide throttle."""
+    global _throttle
+    if _throttle is None:
+        with _throttle_lock:
+            if _throttle is None:
+                _throttle = Throttle()
+    return _throttle
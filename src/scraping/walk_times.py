@@ -0,0 +1,217 @@
+"""
+# Walking Times
+# This file provides:
+# - A walkable street graph loaded from a local GeoJSON extract (LineString
+#   ways sharing coordinates at junctions, as OpenStreetMap exports do)
+# - One multi-source Dijkstra from the campus entrances per graph load, so
+#   the walking time of any point is a snap to its nearest street plus two
+#   lookups; nothing is routed per listing or per request
+"""
+
+import math
+import json
+import heapq
+import threading
+
+try:
+    from config.configuration import (
+        WALK_GRAPH_PATH, WALK_SPEED_KMH, WALK_MAX_SNAP_METERS, CAMPUS_LAT, CAMPUS_LNG
+    )
+    from scraping.geocode import haversine_miles
+except ImportError:
+    from src.config.configuration import (
+        WALK_GRAPH_PATH, WALK_SPEED_KMH, WALK_MAX_SNAP_METERS, CAMPUS_LAT, CAMPUS_LNG
+    )
+    from src.scraping.geocode import haversine_miles
+
+METERS_PER_MILE = 1609.344
+METERS_PER_DEGREE = 111320.0
+
+# Ways nobody can walk along
+UNWALKABLE_HIGHWAYS = {'motorway', 'motorway_link'}
+
+
+def _meters(lat1, lng1, lat2, lng2):
+    return haversine_miles(lat1, lng1, lat2, lng2) * METERS_PER_MILE
+
+
+class StreetGraph:
+    """Undirected street graph: nodes are way vertices, edges the pieces of way between them.
+
+    Vertices with the same coordinates (to 7 decimals) are one node, which
+    is how ways are joined at junctions. Edges are bucketed in a grid of
+    ``snap_meters`` cells so the nearest street to a point is found by
+    looking at nine cells.
+    """
+
+    def __init__(self, snap_meters=None):
+        self.snap_meters = snap_meters or WALK_MAX_SNAP_METERS
+        self.nodes = []
+        self.adjacency = []
+        self.edges = []
+        self.entrances = []
+        self._ids = {}
+        self._grid = {}
+        self._cell = None
+
+    @classmethod
+    def from_geojson(cls, path, snap_meters=None):
+        graph = cls(snap_meters)
+        with open(path, encoding='utf-8') as f:
+            collection = json.load(f)
+        for feature in collection.get('features', []):
+            geometry = feature.get('geometry') or {}
+            properties = feature.get('properties') or {}
+            if geometry.get('type') == 'Point' and properties.get('campus_entrance'):
+                lng, lat = geometry['coordinates'][:2]
+                graph.entrances.append((lat, lng))
+            elif properties.get('highway') in UNWALKABLE_HIGHWAYS or properties.get('foot') == 'no':
+                continue
+            elif geometry.get('type') == 'LineString':
+                graph.add_way(geometry['coordinates'])
+            elif geometry.get('type') == 'MultiLineString':
+                for line in geometry['coordinates']:
+                    graph.add_way(line)
+        return graph
+
+    def _node(self, lng, lat):
+        key = (round(lat, 7), round(lng, 7))
+        node = self._ids.get(key)
+        if node is None:
+            node = self._ids[key] = len(self.nodes)
+            self.nodes.append((lat, lng))
+            self.adjacency.append([])
+        return node
+
+    def add_way(self, coordinates):
+        previous = None
+        for point in coordinates:
+            node = self._node(point[0], point[1])
+            if previous is not None and node != previous:
+                meters = _meters(*self.nodes[previous], *self.nodes[node])
+                self.adjacency[previous].append((node, meters))
+                self.adjacency[node].append((previous, meters))
+                self.edges.append((previous, node, meters))
+            previous = node
+        self._cell = None
+
+    def _cell_of(self, lat, lng):
+        return int(math.floor(lat / self._cell[0])), int(math.floor(lng / self._cell[1]))
+
+    def _build_grid(self):
+        mean_lat = sum(lat for lat, _ in self.nodes) / len(self.nodes)
+        self._cell = (self.snap_meters / METERS_PER_DEGREE,
+                      self.snap_meters / (METERS_PER_DEGREE * math.cos(math.radians(mean_lat))))
+        self._grid = {}
+        for index, (u, v, _) in enumerate(self.edges):
+            (lat1, lng1), (lat2, lng2) = self.nodes[u], self.nodes[v]
+            row1, col1 = self._cell_of(min(lat1, lat2), min(lng1, lng2))
+            row2, col2 = self._cell_of(max(lat1, lat2), max(lng1, lng2))
+            for row in range(row1, row2 + 1):
+                for col in range(col1, col2 + 1):
+                    self._grid.setdefault((row, col), []).append(index)
+
+    def snap(self, lat, lng):
+        """Nearest street to a point within snap_meters: (edge index, meters off the street, fraction along it)."""
+        if not self.edges:
+            return None
+        if self._cell is None:
+            self._build_grid()
+        row, col = self._cell_of(lat, lng)
+        candidates = {index for r in (row - 1, row, row + 1) for c in (col - 1, col, col + 1)
+                      for index in self._grid.get((r, c), ())}
+        # Local flat projection in meters around the point; fine at street scale
+        scale = METERS_PER_DEGREE * math.cos(math.radians(lat))
+        best = None
+        for index in candidates:
+            u, v, _ = self.edges[index]
+            (lat1, lng1), (lat2, lng2) = self.nodes[u], self.nodes[v]
+            ax, ay = (lng1 - lng) * scale, (lat1 - lat) * METERS_PER_DEGREE
+            bx, by = (lng2 - lng) * scale, (lat2 - lat) * METERS_PER_DEGREE
+            dx, dy = bx - ax, by - ay
+            length = dx * dx + dy * dy
+            t = min(1.0, max(0.0, -(ax * dx + ay * dy) / length)) if length else 0.0
+            offset = math.hypot(ax + t * dx, ay + t * dy)
+            if offset <= self.snap_meters and (best is None or offset < best[1]):
+                best = (index, offset, t)
+        return best
+
+    def shortest_distances(self, points):
+        """Walking meters from the nearest of ``points`` (lat, lng) to every node, by Dijkstra."""
+        distances = [math.inf] * len(self.nodes)
+        heap = []
+        for lat, lng in points:
+            snapped = self.snap(lat, lng)
+            if snapped is None:
+                continue
+            index, offset, t = snapped
+            u, v, meters = self.edges[index]
+            for node, start in ((u, offset + t * meters), (v, offset + (1 - t) * meters)):
+                if start < distances[node]:
+                    distances[node] = start
+                    heapq.heappush(heap, (start, node))
+        while heap:
+            meters, node = heapq.heappop(heap)
+            if meters > distances[node]:
+                continue
+            for neighbour, length in self.adjacency[node]:
+                total = meters + length
+                if total < distances[neighbour]:
+                    distances[neighbour] = total
+                    heapq.heappush(heap, (total, neighbour))
+        return distances
+
+
+class WalkTimes:
+    """Walking minutes from campus to any point, precomputed over a StreetGraph.
+
+    The campus entrances in the extract are the sources (CAMPUS_LAT /
+    CAMPUS_LNG when it has none).
+    """
+
+    def __init__(self, graph, speed_kmh=None):
+        self.graph = graph
+        self.meters_per_minute = (speed_kmh or WALK_SPEED_KMH) * 1000 / 60
+        sources = graph.entrances or [(CAMPUS_LAT, CAMPUS_LNG)]
+        self.distances = graph.shortest_distances(sources)
+        reachable = sum(1 for meters in self.distances if meters < math.inf)
+        print(f"Walking times: {len(graph.nodes)} street nodes, {len(graph.edges)} edges, "
+              f"{reachable} reachable from {len(sources)} campus entrance(s)")
+
+    def minutes(self, lat, lng):
+        """Walking minutes from campus, or None if the point is off the network or unreachable."""
+        snapped = self.graph.snap(lat, lng)
+        if snapped is None:
+            return None
+        index, offset, t = snapped
+        u, v, meters = self.graph.edges[index]
+        total = offset + min(self.distances[u] + t * meters, self.distances[v] + (1 - t) * meters)
+        if total == math.inf:
+            return None
+        return round(total / self.meters_per_minute, 1)
+
+
+_walk_times = None
+_walk_times_lock = threading.Lock()
+
+
+def get_walk_times():
+    """Return the process-wide WalkTimes, built on first use, or None if the graph cannot be loaded."""
+    global _walk_times
+    if _walk_times is None:
+        with _walk_times_lock:
+            if _walk_times is None:
+                try:
+                    _walk_times = WalkTimes(StreetGraph.from_geojson(WALK_GRAPH_PATH))
+                except (OSError, ValueError, KeyError, TypeError, IndexError) as e:
+                    print(f"Walking times disabled: cannot load street graph {WALK_GRAPH_PATH}: {e}")
+                    _walk_times = False
+    return _walk_times or None
+
+
+def walk_minutes(lat, lng):
+    """Walking minutes from campus to a geocoded point, or None."""
+    if lat is None or lng is None:
+        return None
+    walk_times = get_walk_times()
+    return walk_times.minutes(lat, lng) if walk_times else None
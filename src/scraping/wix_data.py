@@ -0,0 +1,234 @@
+"""
+# Wix Data Extraction
+# This file provides:
+# - Extraction of the JSON payloads Wix pages are built from, either embedded
+#   in the HTML (warmup data / viewer model scripts) or captured from the
+#   browser's network traffic through CDP
+# - Mapping of those payloads straight to our listing fields, so the DOM
+#   parser is only needed when a page carries no usable data
+"""
+
+import re
+import json
+from collections import deque
+
+from selenium.common.exceptions import WebDriverException
+
+# <script type="application/json" id="wix-warmup-data">{...}</script> and friends.
+# application/ld+json is left out: it is site-wide schema.org metadata (logo,
+# business blurb), not the listing
+EMBEDDED_JSON_PATTERN = re.compile(
+    r'<script\b[^>]*type=["\']application/json["\'][^>]*>(.*?)</script>',
+    re.I | re.S
+)
+
+# Responses worth keeping when capturing network traffic
+DATA_API_URL_HINTS = ('/_api/', 'wix-data', 'dataBinding', 'cloud-data', 'warmup')
+
+# Our listing fields and the keys Wix collections commonly use for them
+FIELD_ALIASES = {
+    'price': ('price', 'rent', 'monthlyRent', 'monthly_rent', 'pricePerMonth'),
+    'bedrooms': ('bedrooms', 'beds', 'bedroomCount', 'numberOfBedrooms'),
+    'bathrooms': ('bathrooms', 'baths', 'bathroomCount', 'numberOfBathrooms'),
+    'description': ('description', 'about', 'longDescription', 'richDescription'),
+    'amenities': ('amenities', 'features', 'propertyDetails', 'details'),
+    'availability': ('availability', 'available', 'availableFrom', 'availableDate'),
+    'images': ('gallery', 'images', 'photos', 'mediaGallery', 'image', 'mainImage', 'mainMedia'),
+}
+ALIAS_TO_FIELD = {alias.lower(): field for field, aliases in FIELD_ALIASES.items() for alias in aliases}
+# Generic keys like image or description are everywhere; a record only
+# describes a listing if it also has one of these
+LISTING_FIELDS = {'price', 'bedrooms'}
+# Keys marking linked-data (schema.org) records, which are never the listing
+LINKED_DATA_KEYS = ('@type', '@context')
+
+WIX_IMAGE_PATTERN = re.compile(r'^wix:image://v1/([^/#]+)')
+WIX_MEDIA_URL = 'https://static.wixstatic.com/media/'
+HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+PRICE_PATTERN = re.compile(r'\$\s*[\d,]+(?:\.\d+)?(?:/[a-zA-Z]+)?')
+
+# Walking the whole viewer model is cheap, but bound it against pathological payloads
+MAX_WALK_NODES = 200000
+
+
+def extract_embedded_payloads(html):
+    """Return the JSON objects embedded in a page's application/json script tags."""
+    payloads = []
+    if not html:
+        return payloads
+    for match in EMBEDDED_JSON_PATTERN.finditer(html):
+        body = match.group(1).strip()
+        if not body:
+            continue
+        try:
+            payloads.append(json.loads(body))
+        except ValueError:
+            continue
+    return payloads
+
+
+class NetworkPayloadCapture:
+    """Collect JSON data-API responses of one page load from CDP events.
+
+    Register ``on_event`` with the page's NetworkMonitor, then call
+    ``collect`` once the page is ready to fetch the response bodies.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.request_ids = []
+
+    def on_event(self, method, params):
+        if method != 'Network.responseReceived':
+            return
+        response = params.get('response', {})
+        mime_type = response.get('mimeType', '')
+        url = response.get('url', '')
+        if 'json' in mime_type and any(hint in url for hint in DATA_API_URL_HINTS):
+            self.request_ids.append(params.get('requestId'))
+
+    def collect(self):
+        payloads = []
+        for request_id in self.request_ids:
+            try:
+                result = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+                payloads.append(json.loads(result.get('body') or 'null'))
+            except (WebDriverException, ValueError):
+                # Bodies of evicted or non-JSON responses are simply skipped
+                continue
+        return [payload for payload in payloads if payload]
+
+
+def wix_image_url(value):
+    """Turn a Wix media reference into a public image URL."""
+    if not isinstance(value, str):
+        return None
+    match = WIX_IMAGE_PATTERN.match(value)
+    if match:
+        return WIX_MEDIA_URL + match.group(1)
+    if value.startswith(('http://', 'https://')):
+        return value
+    return None
+
+
+def _iter_records(payloads):
+    """Yield every dict found in the payloads (breadth-first, bounded)."""
+    pending = deque(payloads)
+    seen = 0
+    while pending and seen < MAX_WALK_NODES:
+        node = pending.popleft()
+        seen += 1
+        if isinstance(node, dict):
+            yield node
+            pending.extend(v for v in node.values() if isinstance(v, (dict, list)))
+        elif isinstance(node, list):
+            pending.extend(v for v in node if isinstance(v, (dict, list)))
+
+
+def _score(record):
+    if any(key in record for key in LINKED_DATA_KEYS):
+        return 0
+    fields = {ALIAS_TO_FIELD[key.lower()] for key in record if key.lower() in ALIAS_TO_FIELD}
+    return len(fields) if fields & LISTING_FIELDS else 0
+
+
+def _as_text(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        return HTML_TAG_PATTERN.sub(' ', value).strip()
+    if isinstance(value, (int, float)):
+        return str(value)
+    return None
+
+
+def _as_int(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        match = re.search(r'\d+', value)
+        if match:
+            return int(match.group())
+    return None
+
+
+def _as_images(value):
+    items = value if isinstance(value, list) else [value]
+    images = []
+    for item in items:
+        if isinstance(item, dict):
+            item = item.get('src') or item.get('url') or item.get('uri')
+        url = wix_image_url(item)
+        if url and url not in images:
+            images.append(url)
+    return images
+
+
+def _as_lines(value):
+    if isinstance(value, list):
+        return [line for line in (_as_text(v) for v in value) if line]
+    text = _as_text(value)
+    if not text:
+        return []
+    return [line.strip() for line in re.split(r'[\n•✓✔]+', text) if line.strip()]
+
+
+def map_payloads_to_listing(payloads):
+    """Map Wix data payloads to listing fields.
+
+    Picks the record that carries the most listing fields and converts each
+    field to the type the scraper stores. Returns an empty dict when no
+    record carries at least two listing fields, one of them a price or a
+    bedroom count; linked-data records are ignored.
+    """
+    best, best_score = None, 1
+    for record in _iter_records(payloads):
+        score = _score(record)
+        if score > best_score:
+            best, best_score = record, score
+    if best is None:
+        return {}
+
+    listing = {}
+    for key, value in best.items():
+        field = ALIAS_TO_FIELD.get(key.lower())
+        if not field or field in listing or value in (None, '', [], {}):
+            continue
+        if field == 'price':
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                # Numeric collection fields are formatted like the rendered page
+                text = f"${value:,.0f}"
+            else:
+                text = _as_text(value)
+                if text and re.match(r'^[\d,.]+$', text):
+                    text = f"${text}"
+            match = PRICE_PATTERN.search(text or '')
+            if match:
+                listing['price'] = match.group()
+        elif field in ('bedrooms', 'bathrooms'):
+            number = _as_int(value)
+            if number is not None:
+                listing[field] = number
+        elif field == 'images':
+            images = _as_images(value)
+            if images:
+                listing['images'] = images
+        elif field == 'amenities':
+            lines = _as_lines(value)
+            if lines:
+                listing['amenities'] = lines
+        else:
+            text = _as_text(value)
+            if text:
+                listing[field] = text
+    return listing
+
+
+def extract_listing_data(html, captured_payloads=None):
+    """Return listing fields from a page's embedded and captured Wix data."""
+    payloads = extract_embedded_payloads(html) + list(captured_payloads or [])
+    if not payloads:
+        return {}
+    return map_payloads_to_listing(payloads)
@@ -0,0 +1,90 @@
+"""
+# Scrape Work Queue
+# This file provides:
+# - The worker side of the scrape_jobs queue: a unique worker id, leases on
+#   claimed URLs kept alive by a heartbeat thread, and the outcome of each
+#   job reported back (done, or retried with backoff)
+# - The claim / heartbeat / finish SQL lives in config/db.py; only Postgres
+#   is needed to coordinate any number of scraper processes or containers
+"""
+
+import os
+import socket
+import threading
+
+try:
+    from config.configuration import SCRAPE_JOB_LEASE_SECONDS
+    from config.db import claim_scrape_jobs, finish_scrape_job, heartbeat_scrape_jobs
+except ImportError:
+    from src.config.configuration import SCRAPE_JOB_LEASE_SECONDS
+    from src.config.db import claim_scrape_jobs, finish_scrape_job, heartbeat_scrape_jobs
+
+
+def default_worker_id():
+    """Identify a worker by host (the container id under docker) and process."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class JobLeases:
+    """Jobs held by one worker, with their leases renewed in the background.
+
+    The heartbeat renews every lease a third of the way through its term, so
+    a live worker never loses a job while a dead one's jobs expire and are
+    claimed by the others.
+    """
+
+    def __init__(self, worker_id=None, lease_seconds=None):
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds or SCRAPE_JOB_LEASE_SECONDS
+        self.held = set()
+        self.stats = {'claimed': 0, 'done': 0, 'retried': 0, 'lost': 0}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._heartbeat, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _heartbeat(self):
+        while not self._stop.wait(self.lease_seconds / 3):
+            with self._lock:
+                urls = list(self.held)
+            if not urls:
+                continue
+            extended = heartbeat_scrape_jobs(self.worker_id, urls, self.lease_seconds)
+            if extended < len(urls):
+                # Expired before we renewed it; another worker may be scraping it too
+                print(f"Worker {self.worker_id} lost the lease on {len(urls) - extended} job(s)")
+                with self._lock:
+                    self.stats['lost'] += len(urls) - extended
+
+    def claim(self, limit):
+        """Lease up to ``limit`` URLs from the queue."""
+        urls = claim_scrape_jobs(self.worker_id, limit, self.lease_seconds)
+        with self._lock:
+            self.held.update(urls)
+            self.stats['claimed'] += len(urls)
+        return urls
+
+    def finish(self, url, error=None):
+        """Report a held job's outcome. Safe to call from any thread."""
+        with self._lock:
+            if url not in self.held:
+                return
+            self.held.discard(url)
+            self.stats['done' if error is None else 'retried'] += 1
+        finish_scrape_job(self.worker_id, url, error)
+
+    def release_all(self, error):
+        """Give back every job still held, e.g. when a batch ends without a result for it."""
+        with self._lock:
+            urls = list(self.held)
+        for url in urls:
+            self.finish(url, error)
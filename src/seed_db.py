@@ -6,13 +6,11 @@ import psycopg2
 from datetime import date, datetime
 from werkzeug.security import generate_password_hash
 
-# Database connection parameters
-DB_PARAMS = {
-    'host': 'database',
-    'database': 'test_db',
-    'user': 'postgres',
-    'password': 'team13'
-}
+# Database connection parameters, shared with the app
+try:
+    from config.configuration import DB_PARAMS
+except ImportError:
+    from src.config.configuration import DB_PARAMS
 
 def seed_db():
     """Seed the database with sample data"""
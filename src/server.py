@@ -23,30 +23,20 @@ except ImportError:
 from server_ui.students.routes.student_routes import student_bp
 from server_ui.students.routes.page_routes import page_bp
 from server_ui.routes.housing import housing_bp
-# Database connection parameters
-hostname = 'database'  # Use the service name from docker-compose.yml
-database = 'test_db'
-username = 'postgres'
-password = 'team13'
+from server_ui.utils import database as db
 
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 import psycopg2
 import psycopg2.extras
 from scraper import main as run_scraper
+from scraping.metrics import prometheus_text
+from config.pool import pool_stats
 
 
 app = Flask(__name__, template_folder='server_ui/templates',static_folder='server_ui/static')
 CORS(app)
 
-# Database connection parameters
-DB_CONFIG = {
-    'host': hostname,
-    'dbname': database,
-    'user': username,
-    'password': password
-}
-
 # Configure session
 app.secret_key = 'team13-secret-key'  # Replace with a real secret key in production
 app.config['SESSION_TYPE'] = 'filesystem'
@@ -56,10 +46,17 @@ app.config['SESSION_FILE_DIR'] = '/flask_session'
 
 
 def get_db_connection():
-    """Create a connection to the database"""
-    conn = psycopg2.connect(**DB_CONFIG)
-    conn.autocommit = True
-    return conn
+    """Get this request's connection from the shared pool.
+
+    It is shared with everything else in the request, so it stays in the
+    pool's transactional mode; callers that write commit explicitly, and
+    whatever is left open is rolled back when the pool takes it back.
+    """
+    return db.get_db()
+
+
+# Pooled connections go back to the pool when each request ends
+db.init_app(app)
 
 
 # Add the function to app config for use in blueprints
@@ -132,6 +129,39 @@ def refresh_data():
         return jsonify({"error": str(e)}), 500
     
 
+@app.route('/metrics', methods=['GET'])
+def scrape_metrics():
+    """Performance report of the last finished scrape run and the connection pool, in Prometheus text format"""
+    headers = {'Content-Type': 'text/plain; version=0.0.4'}
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
+        cur.execute("""
+        SELECT id, metrics FROM scrape_runs
+        WHERE metrics IS NOT NULL
+        ORDER BY id DESC LIMIT 1
+        """)
+        row = cur.fetchone()
+        cur.close()
+        conn.close()
+    except psycopg2.Error as e:
+        return f"# scrape metrics unavailable: {e}\n" + db.pool_metrics_text(), 503, headers
+    body = prometheus_text(row[1], row[0]) if row else "# no scrape run has been recorded yet\n"
+    return body + db.pool_metrics_text(), 200, headers
+
+@app.route('/health/db', methods=['GET'])
+def database_health():
+    """Check the database answers, and report the connection pool's state"""
+    try:
+        conn = db.get_db()
+        cur = conn.cursor()
+        cur.execute("SELECT 1")
+        cur.close()
+        conn.close()
+    except Exception as e:
+        return jsonify({"status": "unavailable", "error": str(e), "pool": pool_stats()}), 503
+    return jsonify({"status": "ok", "pool": pool_stats()})
+
 @app.after_request
 def add_header(response):
     """Add headers to prevent caching and ensure CORS"""
@@ -9,6 +9,7 @@ from flask import Blueprint, render_template, request, current_app, jsonify, ses
 import psycopg2
 import psycopg2.extras
 import os
+import time
 import requests
 from urllib.parse import urlparse
 from bs4 import BeautifulSoup
@@ -16,19 +17,60 @@ from bs4 import BeautifulSoup
 # Import our scraper function
 try:
     from scraper import extract_property_details
+    from config.db import normalized_values, save_property_details, update_normalized_columns
+    from scraping.fetch_strategy import get_session
+    from scraping.normalize import monthly_cents, normalize_listing, normalize_price
+    from scraping.throttle import CircuitOpenError, get_throttle
+    from server_ui.utils.detail_cache import DetailCache
+    from server_ui.utils.database import get_db
 except ImportError:
     # Alternative import path for Docker environment
     from src.scraper import extract_property_details
+    from src.config.db import normalized_values, save_property_details, update_normalized_columns
+    from src.scraping.fetch_strategy import get_session
+    from src.scraping.normalize import monthly_cents, normalize_listing, normalize_price
+    from src.scraping.throttle import CircuitOpenError, get_throttle
+    from src.server_ui.utils.detail_cache import DetailCache
+    from src.server_ui.utils.database import get_db
 
 housing_bp = Blueprint('housing', __name__)
 
-# Database configuration - direct connection
-DB_CONFIG = {
-    'host': os.environ.get('POSTGRES_HOST', 'database'),
-    'database': os.environ.get('POSTGRES_DB', 'test_db'),
-    'user': os.environ.get('POSTGRES_USER', 'postgres'),
-    'password': os.environ.get('POSTGRES_PASSWORD', 'team13')
-}
+
+DETAIL_COLUMNS = """
+    title, price, location, url, bedrooms, amenities, description,
+    availability, bathrooms, photos, details_scraped_at,
+    EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - details_scraped_at)) AS details_age
+"""
+
+def lookup_listing_details(url):
+    """Return (details, fetched_at) for a listing whose details are stored, else None."""
+    conn = get_db()
+    try:
+        cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
+        cur.execute(f"SELECT {DETAIL_COLUMNS} FROM properties WHERE url = %s", (url,))
+        row = cur.fetchone()
+        cur.close()
+    finally:
+        conn.close()
+    
+    if not row or not row['details_scraped_at']:
+        return None
+    details = dict(row)
+    details.pop('details_age')
+    details['success'] = True
+    details['details_scraped_at'] = row['details_scraped_at'].isoformat()
+    return details, time.time() - float(row['details_age'])
+
+def load_listing_details(url):
+    """Scrape a listing's details and store them for every server process."""
+    result = extract_property_details(url)
+    if result.get('success'):
+        scraped_at = save_property_details(url, result)
+        result['details_scraped_at'] = scraped_at.isoformat() if scraped_at else None
+    return result
+
+# Shared by every request in this process; see server_ui/utils/detail_cache.py
+detail_cache = DetailCache(load_listing_details, lookup=lookup_listing_details)
 
 @housing_bp.route('/', methods=['GET'])
 def home_page():
@@ -54,11 +96,14 @@ def property_detail_page(property_id):
 def get_property(property_id):
     """API endpoint to get a specific property by ID"""
     try:
-        # Direct database connection
-        conn = psycopg2.connect(**DB_CONFIG)
+        # Connection from the shared pool
+        conn = get_db()
         cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
         
-        cur.execute("SELECT * FROM properties WHERE id = %s", (property_id,))
+        cur.execute("""
+            SELECT *, EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - details_scraped_at)) AS details_age
+            FROM properties WHERE id = %s
+        """, (property_id,))
         property = cur.fetchone()
         
         cur.close()
@@ -71,81 +116,22 @@ def get_property(property_id):
             if not property_dict['price'] or property_dict['price'] == 'No price' or property_dict['price'] == '$,' or property_dict['price'] == '$':
                 property_dict['price'] = 'Contact for price'
             
-            # Calculate distance to Binghamton University if location exists
-            if property_dict.get('location'):
-                try:
-                    # Binghamton University coordinates
-                    bu_coords = {"lat": 42.0896, "lng": -75.9672}
-                    
-                    # Use the existing location to calculate an approximate distance
-                    # Since we don't have geocoding in place, we'll use a static value if it exists
-                    # or calculate a rough estimate based on address patterns
-                    
-                    # Check if there's already a distance field in the database
-                    if property_dict.get('distance'):
-                        # Convert to string with miles unit
-                        property_dict['distance_to_bu'] = f"{property_dict['distance']} miles"
-                    else:
-                        # Rough distance estimate based on the location
-                        location = property_dict['location'].lower()
-                        
-                        # Example distance mapping - in a real app this would use geocoding
-                        if 'seminary' in location:
-                            distance = 0.8
-                        elif 'murray' in location:
-                            distance = 1.2
-                        elif 'leroy' in location:
-                            distance = 0.9
-                        elif 'front' in location:
-                            distance = 0.5
-                        elif 'walnut' in location:
-                            distance = 1.3
-                        elif 'chapin' in location:
-                            distance = 1.8
-                        elif 'ayres' in location:
-                            distance = 1.5
-                        else:
-                            # Default distance estimate
-                            distance = 1.0
-                            
-                        property_dict['distance_to_bu'] = f"{distance} miles"
-                except Exception as e:
-                    print(f"Error calculating distance: {e}")
-                    property_dict['distance_to_bu'] = "Distance information unavailable"
+            # Distance to Binghamton University, geocoded when the listing was saved
+            if property_dict.get('distance_miles') is not None:
+                property_dict['distance_to_bu'] = f"{property_dict['distance_miles']:.1f} miles"
+            elif property_dict.get('location'):
+                property_dict['distance_to_bu'] = "Distance information unavailable"
             else:
                 property_dict['distance_to_bu'] = "Location not provided"
             
-            # If this is a Binghamton West property, fetch updated details from source
-            if property_dict['url'] and 'binghamtonwest.com' in property_dict['url']:
-                try:
-                    # Use the extract_property_details function to get fresh data
-                    updated_details = extract_property_details(property_dict['url'])
-                    
-                    # If successful, update the property details
-                    if updated_details and updated_details.get('success'):
-                        # Update bedrooms if available in the fresh data
-                        if updated_details.get('bedrooms'):
-                            property_dict['bedrooms'] = updated_details['bedrooms']
-                            
-                        # Update amenities if available
-                        if updated_details.get('amenities'):
-                            property_dict['amenities'] = updated_details['amenities']
-                        
-                        # Update description if available
-                        if updated_details.get('description'):
-                            property_dict['description'] = updated_details['description']
-                            
-                        # Update price if available
-                        if updated_details.get('price'):
-                            # Ensure it's not just "$" or "$,"
-                            price = updated_details['price']
-                            if price and price not in ['$', '$,', 'No price']:
-                                property_dict['price'] = price
-                            else:
-                                property_dict['price'] = 'Contact for price'
-                except Exception as e:
-                    print(f"Error fetching updated property details: {e}")
-                    # Continue with existing data if update fails
+            # Amenities, description, availability, bathrooms and photos are stored by the
+            # scraper; details_scraped_at tells the page how fresh they are
+            details_age = property_dict.pop('details_age', None)
+            if property_dict.get('details_scraped_at'):
+                property_dict['details_scraped_at'] = property_dict['details_scraped_at'].isoformat()
+                # Serve what is stored and refresh stale details in the background
+                if property_dict['url'] and 'binghamtonwest.com' in property_dict['url']:
+                    detail_cache.revalidate(property_dict['url'], time.time() - float(details_age))
             
             return jsonify(property_dict)
         else:
@@ -161,23 +147,37 @@ def get_listings():
     min_price = request.args.get('min_price')
     max_price = request.args.get('max_price')
     max_distance = request.args.get('distance')  # Add support for distance filter
+    max_walk = request.args.get('max_walk_minutes')
     sort = request.args.get('sort', 'id_asc')  # Default sort by ID ascending
     show_with_price_only = request.args.get('with_price_only', 'false').lower() == 'true'
     include_all = request.args.get('include_all', 'false').lower() == 'true'  # New parameter to optionally include all properties
     
-    print(f"API Request for listings: bedrooms={bedrooms}, min_price={min_price}, max_price={max_price}, max_distance={max_distance}, sort={sort}")
+    print(f"API Request for listings: bedrooms={bedrooms}, min_price={min_price}, max_price={max_price}, max_distance={max_distance}, max_walk_minutes={max_walk}, sort={sort}")
     
+    # Price filters are monthly dollars; the indexed price_monthly_cents column is in cents
     try:
-        # Direct database connection
-        conn = psycopg2.connect(**DB_CONFIG)
+        min_cents = int(round(float(min_price) * 100)) if min_price else None
+        max_cents = int(round(float(max_price) * 100)) if max_price else None
+        max_miles = float(max_distance) if max_distance else None
+        max_walk_minutes = float(max_walk) if max_walk else None
+    except ValueError:
+        return jsonify({"error": "min_price, max_price, distance and max_walk_minutes must be numbers"}), 400
+    
+    try:
+        # Connection from the shared pool
+        conn = get_db()
         cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
         
         # Build query based on sort parameter
         sort_clause = "ORDER BY id ASC"  # Default sort
         if sort == 'price_asc':
-            sort_clause = "ORDER BY price ASC, id ASC"
+            sort_clause = "ORDER BY price_monthly_cents ASC NULLS LAST, id ASC"
         elif sort == 'price_desc':
-            sort_clause = "ORDER BY price DESC, id ASC"
+            sort_clause = "ORDER BY price_monthly_cents DESC NULLS LAST, id ASC"
+        elif sort == 'distance_asc':
+            sort_clause = "ORDER BY distance_miles ASC NULLS LAST, id ASC"
+        elif sort == 'walk_asc':
+            sort_clause = "ORDER BY walk_minutes ASC NULLS LAST, id ASC"
         elif sort == 'id_desc':
             sort_clause = "ORDER BY id DESC"
         
@@ -197,17 +197,51 @@ def get_listings():
                 query_conditions.append("bedrooms = %s")
             query_params.append(bedrooms)
         
-        # Build base query
-        if query_conditions:
-            query = f"SELECT * FROM properties WHERE {' AND '.join(query_conditions)} {sort_clause}"
-        else:
-            query = f"SELECT * FROM properties {sort_clause}"
-        
-        print(f"Executing query: {query} with params: {query_params}")
-        
-        cur.execute(query, query_params)
+        # Distance to campus is stored at ingest by the geocoder (unknown locations never match)
+        if max_miles is not None:
+            query_conditions.append("distance_miles <= %s")
+            query_params.append(max_miles)
+        
+        # Walking time from campus, precomputed over the street graph at ingest
+        if max_walk_minutes is not None:
+            query_conditions.append("walk_minutes <= %s")
+            query_params.append(max_walk_minutes)
+        
+        # Price predicates compare the monthly equivalent, so a weekly or per-semester
+        # price is not taken for a monthly one (rows without a price never match)
+        price_conditions = []
+        price_params = []
+        if min_cents is not None:
+            price_conditions.append("price_monthly_cents >= %s")
+            price_params.append(min_cents)
+        if max_cents is not None:
+            price_conditions.append("price_monthly_cents <= %s")
+            price_params.append(max_cents)
+        if show_with_price_only and not price_conditions:
+            price_conditions.append("price_monthly_cents IS NOT NULL")
+        
+        def where(conditions):
+            return f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        
+        columns = "*, ROUND(distance_miles::numeric, 1)::float8 AS distance"
+        query = f"SELECT {columns} FROM properties {where(query_conditions + price_conditions)}{sort_clause}"
+        print(f"Executing query: {query} with params: {query_params + price_params}")
+        cur.execute(query, query_params + price_params)
         properties = cur.fetchall()
         
+        # If price filters are set but no matching property has a price at all,
+        # return every listing with a flag so the frontend can say so
+        all_no_price = False
+        if not properties and (min_price or max_price):
+            cur.execute(
+                f"SELECT EXISTS (SELECT 1 FROM properties {where(query_conditions + ['price_monthly_cents IS NOT NULL'])})",
+                query_params
+            )
+            if not cur.fetchone()[0]:
+                all_no_price = True
+                cur.execute(f"SELECT {columns} FROM properties {where(query_conditions)}{sort_clause}", query_params)
+                properties = cur.fetchall()
+        
         print(f"Fetched {len(properties)} properties from database")
         
         # Convert to list of dictionaries
@@ -219,80 +253,9 @@ def get_listings():
             if not property_dict['price'] or property_dict['price'] == 'No price' or property_dict['price'] == '$,' or property_dict['price'] == '$':
                 property_dict['price'] = 'Contact for price'
             
-            # Ensure bedrooms is a valid value
-            if property_dict['bedrooms'] is None or property_dict['bedrooms'] == '':
-                # Try to extract bedrooms from title
-                title = property_dict.get('title', '')
-                try:
-                    # Look for patterns like "2 Bedroom" or "2 BR" or "2-Bedroom" or "Apt 2" or ending with 2
-                    import re
-                    
-                    # First, check for explicit bedroom mentions
-                    bedroom_match = re.search(r'(\d+)[\s-]*(bed|br|bedroom)', title.lower())
-                    if bedroom_match:
-                        property_dict['bedrooms'] = int(bedroom_match.group(1))
-                    
-                    # If no match, check for "Apt X" pattern
-                    elif re.search(r'apt\s+(\d+)', title.lower()):
-                        apt_match = re.search(r'apt\s+(\d+)', title.lower())
-                        property_dict['bedrooms'] = int(apt_match.group(1))
-                    
-                    # If still no match, check if property address ends with a number
-                    elif re.search(r'\s(\d+)$', title.strip()):
-                        end_match = re.search(r'\s(\d+)$', title.strip())
-                        property_dict['bedrooms'] = int(end_match.group(1))
-                    
-                    # Look for apartment number after the suffix like 1L, 2R, etc.
-                    elif re.search(r'apt\s+\d+[a-zA-Z]', title.lower()):
-                        # Extract the digit part in patterns like "Apt 2L"
-                        apt_letter_match = re.search(r'apt\s+(\d+)[a-zA-Z]', title.lower())
-                        if apt_letter_match:
-                            property_dict['bedrooms'] = int(apt_letter_match.group(1))
-                    
-                    # Extract from title like "10 Seminary Apt 2"
-                    elif "Seminary Apt" in title:
-                        seminary_match = re.search(r'Seminary\s+Apt\s+(\d+)', title)
-                        if seminary_match:
-                            property_dict['bedrooms'] = int(seminary_match.group(1))
-                    
-                    else:
-                        property_dict['bedrooms'] = None
-                except Exception as e:
-                    print(f"Error extracting bedrooms from title '{title}': {str(e)}")
-                    property_dict['bedrooms'] = None
-                
-            # Ensure distance is set for all properties
-            if property_dict.get('distance') is None:
-                # Estimate distance based on address patterns if location is available
-                if property_dict.get('location'):
-                    location = property_dict['location'].lower()
-                    # Example distance mapping - in a real app this would use geocoding
-                    if 'seminary' in location:
-                        property_dict['distance'] = 0.8
-                    elif 'murray' in location:
-                        property_dict['distance'] = 1.2
-                    elif 'leroy' in location:
-                        property_dict['distance'] = 0.9
-                    elif 'front' in location:
-                        property_dict['distance'] = 0.5
-                    elif 'walnut' in location:
-                        property_dict['distance'] = 1.3
-                    elif 'chapin' in location:
-                        property_dict['distance'] = 1.8
-                    elif 'ayres' in location:
-                        property_dict['distance'] = 1.5
-                    else:
-                        # Default distance estimate
-                        property_dict['distance'] = 1.0
-                else:
-                    # If no location, use a default
-                    property_dict['distance'] = 1.5
-            
             all_properties.append(property_dict)
         
-        # If price filters are set but all properties have "No price",
-        # return a special flag to inform the frontend
-        if (min_price or max_price) and all(prop['price'] == 'No price' or not prop['price'] or prop['price'] == 'Contact for price' for prop in all_properties):
+        if all_no_price:
             cur.close()
             conn.close()
             
@@ -304,48 +267,11 @@ def get_listings():
                 "properties": all_properties
             })
             
-        # Apply price filters in Python
-        # This is needed because price is stored as TEXT in the database
-        result = []
-        for property_dict in all_properties:
-            # Skip properties with no price or "No price" if min_price, max_price is set, or if show_with_price_only is true
-            if ((min_price or max_price or show_with_price_only) and 
-                (not property_dict['price'] or property_dict['price'] == 'No price' or property_dict['price'] == 'Contact for price')):
-                continue
-                
-            # Extract numeric value from price for filtering
-            # Example: Convert "$1,200" to 1200 for comparison
-            if property_dict['price'] and property_dict['price'] != 'No price' and property_dict['price'] != 'Contact for price':
-                # Extract numbers from the price string
-                price_value = ''.join(c for c in property_dict['price'] if c.isdigit())
-                if price_value:
-                    numeric_price = int(price_value)
-                    
-                    # Apply min_price filter
-                    if min_price and numeric_price < int(min_price):
-                        continue
-                        
-                    # Apply max_price filter
-                    if max_price and numeric_price > int(max_price):
-                        continue
-            
-            # Apply distance filter
-            if max_distance and property_dict.get('distance'):
-                if float(property_dict['distance']) > float(max_distance):
-                    continue
-            
-            result.append(property_dict)
-        
-        # Apply sorting
-        if sort == 'distance_asc':
-            # Sort by distance if available, then by ID
-            result.sort(key=lambda p: (float(p.get('distance', 999)), p['id']) if p.get('distance') else (999, p['id']))
-        
         cur.close()
         conn.close()
         
-        print(f"Returning {len(result)} filtered properties")
-        return jsonify(result)
+        print(f"Returning {len(all_properties)} filtered properties")
+        return jsonify(all_properties)
     except Exception as e:
         import traceback
         print(f"Error in /api/listings: {str(e)}")
@@ -356,8 +282,8 @@ def get_listings():
 def diagnose_images():
     """Utility endpoint to diagnose image issues"""
     try:
-        # Direct database connection
-        conn = psycopg2.connect(**DB_CONFIG)
+        # Connection from the shared pool
+        conn = get_db()
         cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
         
         # Get all properties with their image URLs
@@ -391,8 +317,8 @@ def diagnose_images():
 def fix_map_images():
     """Utility endpoint to fix map images for all properties"""
     try:
-        # Direct database connection
-        conn = psycopg2.connect(**DB_CONFIG)
+        # Connection from the shared pool
+        conn = get_db()
         cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
         
         # Get API key parameter, if provided
@@ -460,8 +386,8 @@ def fix_map_images():
 def filter_binghamton_west():
     """Filter to show only Binghamton West properties and delete others"""
     try:
-        # Direct database connection
-        conn = psycopg2.connect(**DB_CONFIG)
+        # Connection from the shared pool
+        conn = get_db()
         cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
         
         # First, check how many properties we have from non-Binghamton West sources
@@ -525,8 +451,8 @@ def filter_binghamton_west():
 def analyze_sources():
     """Analyze the sources of all properties in the database"""
     try:
-        # Direct database connection
-        conn = psycopg2.connect(**DB_CONFIG)
+        # Connection from the shared pool
+        conn = get_db()
         cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
         
         # Get distinct domains from URLs
@@ -588,8 +514,8 @@ def analyze_sources():
 def clean_404_images():
     """Identify and optionally delete listings with 404 image URLs"""
     try:
-        # Direct database connection
-        conn = psycopg2.connect(**DB_CONFIG)
+        # Connection from the shared pool
+        conn = get_db()
         cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
         
         # Get all property IDs and image URLs
@@ -648,8 +574,8 @@ def clean_404_images():
 def clean_404_urls():
     """Identify and optionally delete listings whose URLs return 404"""
     try:
-        # Direct database connection
-        conn = psycopg2.connect(**DB_CONFIG)
+        # Connection from the shared pool
+        conn = get_db()
         cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
         
         # Get all property IDs and URLs
@@ -668,6 +594,7 @@ def clean_404_urls():
         
         # Check each URL for 404 errors
         invalid_properties = []
+        skipped = 0
         for prop in properties:
             try:
                 # Skip if URL is empty
@@ -679,8 +606,9 @@ def clean_404_urls():
                 if not url.startswith(('http://', 'https://')):
                     url = 'https://' + url.lstrip('/')
                 
-                # Make request with timeout - use GET instead of HEAD to get content
-                response = requests.get(url, headers=headers, timeout=5, allow_redirects=True)
+                # Make request with timeout - use GET instead of HEAD to get content.
+                # The shared throttle paces the checks and retries 429s and 5xx
+                response = get_throttle().get(get_session(), url, headers=headers, timeout=5, allow_redirects=True)
                 
                 # Check for 404 indicators in the content
                 is_404 = False
@@ -708,6 +636,10 @@ def clean_404_urls():
                         'reason': 'Page not found (404)'
                     })
                     print(f"404 URL found: {prop['url']}")
+            except CircuitOpenError as e:
+                # The site is failing right now, which says nothing about this listing
+                print(f"Skipping {prop['url']}: {str(e)}")
+                skipped += 1
             except Exception as e:
                 # Count connection errors as invalid too
                 print(f"Error checking URL {prop['url']}: {str(e)}")
@@ -731,9 +663,11 @@ def clean_404_urls():
         
         return jsonify({
             "message": f"Found {len(invalid_properties)} properties with 404 URLs" + 
-                      (f", {deleted_count} properties deleted" if deleted_count > 0 else ""),
+                      (f", {deleted_count} properties deleted" if deleted_count > 0 else "") +
+                      (f", {skipped} skipped while the site was unavailable" if skipped else ""),
             "invalid_properties": invalid_properties,
-            "deleted_count": deleted_count
+            "deleted_count": deleted_count,
+            "skipped_count": skipped
         })
     except Exception as e:
         print(f"Error cleaning 404 URLs: {str(e)}")
@@ -743,8 +677,8 @@ def clean_404_urls():
 def force_clean_bad_listings():
     """Directly remove all listings with placeholder or missing images"""
     try:
-        # Direct database connection
-        conn = psycopg2.connect(**DB_CONFIG)
+        # Connection from the shared pool
+        conn = get_db()
         cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
         
         # First, delete any listings missing image_url
@@ -819,8 +753,8 @@ def force_clean_bad_listings():
 def remove_specific_listings():
     """Remove specific listings identified in the screenshots"""
     try:
-        # Direct database connection
-        conn = psycopg2.connect(**DB_CONFIG)
+        # Connection from the shared pool
+        conn = get_db()
         cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
         
         # List of specific listings to remove (by title/pattern)
@@ -871,15 +805,19 @@ def remove_specific_listings():
 
 @housing_bp.route('/api/scrape-listing-details', methods=['GET'])
 def scrape_listing_details():
-    """API endpoint to scrape details from original listing URLs"""
+    """API endpoint to get the details of an original listing URL.
+    
+    Answers from the detail cache: the in-memory copy, then the details
+    stored by the scraper, and only then a live scrape of the listing,
+    shared by every request for the same URL.
+    """
     url = request.args.get('url')
     
     if not url:
         return jsonify({"success": False, "error": "No URL provided"}), 400
     
     try:
-        # Use the extract_property_details function from scraper.py
-        result = extract_property_details(url)
+        result = detail_cache.get(url)
         return jsonify(result)
         
     except Exception as e:
@@ -892,6 +830,11 @@ def scrape_listing_details():
             "url": url
         }), 500
 
+@housing_bp.route('/api/detail-cache/stats', methods=['GET'])
+def detail_cache_stats():
+    """API endpoint with the listing detail cache counters of this server process"""
+    return jsonify(detail_cache.stats())
+
 # Saved listings API routes
 @housing_bp.route('/api/saved-listings/save', methods=['POST'])
 def save_listing():
@@ -911,7 +854,7 @@ def save_listing():
         print(f"Attempting to save property {property_id} for student {student_id}")
         
         # Connect to database
-        conn = psycopg2.connect(**DB_CONFIG)
+        conn = get_db()
         cur = conn.cursor()
         
         # Check if the property exists
@@ -972,7 +915,7 @@ def unsave_listing():
         property_id = data['property_id']
         
         # Connect to database
-        conn = psycopg2.connect(**DB_CONFIG)
+        conn = get_db()
         cur = conn.cursor()
         
         # Delete the saved listing
@@ -1004,7 +947,7 @@ def check_saved_listing():
             return jsonify({"error": "Property ID is required"}), 400
         
         # Connect to database
-        conn = psycopg2.connect(**DB_CONFIG)
+        conn = get_db()
         cur = conn.cursor()
         
         # Check if property is saved
@@ -1033,7 +976,7 @@ def get_saved_listings():
     
     try:
         # Connect to database
-        conn = psycopg2.connect(**DB_CONFIG)
+        conn = get_db()
         cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
         
         # Get all saved listings for this student with property details
@@ -1056,48 +999,6 @@ def get_saved_listings():
             if not property_dict['price'] or property_dict['price'] == 'No price' or property_dict['price'] == '$,' or property_dict['price'] == '$':
                 property_dict['price'] = 'Contact for price'
             
-            # Process bedrooms field if it's null or empty
-            if property_dict['bedrooms'] is None or property_dict['bedrooms'] == '':
-                # Try to extract bedrooms from title
-                title = property_dict.get('title', '')
-                try:
-                    # Look for patterns like "2 Bedroom" or "2 BR" or "2-Bedroom" or "Apt 2" or ending with 2
-                    import re
-                    
-                    # First, check for explicit bedroom mentions
-                    bedroom_match = re.search(r'(\d+)[\s-]*(bed|br|bedroom)', title.lower())
-                    if bedroom_match:
-                        property_dict['bedrooms'] = int(bedroom_match.group(1))
-                    
-                    # If no match, check for "Apt X" pattern
-                    elif re.search(r'apt\s+(\d+)', title.lower()):
-                        apt_match = re.search(r'apt\s+(\d+)', title.lower())
-                        property_dict['bedrooms'] = int(apt_match.group(1))
-                    
-                    # If still no match, check if property address ends with a number
-                    elif re.search(r'\s(\d+)$', title.strip()):
-                        end_match = re.search(r'\s(\d+)$', title.strip())
-                        property_dict['bedrooms'] = int(end_match.group(1))
-                    
-                    # Look for apartment number after the suffix like 1L, 2R, etc.
-                    elif re.search(r'apt\s+\d+[a-zA-Z]', title.lower()):
-                        # Extract the digit part in patterns like "Apt 2L"
-                        apt_letter_match = re.search(r'apt\s+(\d+)[a-zA-Z]', title.lower())
-                        if apt_letter_match:
-                            property_dict['bedrooms'] = int(apt_letter_match.group(1))
-                    
-                    # Extract from title like "10 Seminary Apt 2"
-                    elif "Seminary Apt" in title:
-                        seminary_match = re.search(r'Seminary\s+Apt\s+(\d+)', title)
-                        if seminary_match:
-                            property_dict['bedrooms'] = int(seminary_match.group(1))
-                    
-                    else:
-                        property_dict['bedrooms'] = None
-                except Exception as e:
-                    print(f"Error extracting bedrooms from title '{title}': {str(e)}")
-                    property_dict['bedrooms'] = None
-                
             result.append(property_dict)
         
         cur.close()
@@ -1112,13 +1013,13 @@ def get_saved_listings():
 def update_property_database():
     """Update the database with correct property details from original sources"""
     try:
-        # Direct database connection
-        conn = psycopg2.connect(**DB_CONFIG)
+        # Connection from the shared pool
+        conn = get_db()
         cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
         
         # First, check how many properties need updating
         cur.execute("""
-        SELECT id, title, url, price, bedrooms 
+        SELECT id, title, url, price, bedrooms, location
         FROM properties 
         WHERE url LIKE '%%binghamtonwest.com%%'
         """)
@@ -1127,60 +1028,20 @@ def update_property_database():
         total_count = len(properties)
         updated_count = 0
         errors = []
+        normalized = []
         
         for prop in properties:
             try:
                 if prop['url']:
                     print(f"Updating property {prop['id']}: {prop['title']}")
                     
-                    # Attempt to extract bedrooms from title if not already set
-                    extracted_bedrooms = None
-                    if not prop['bedrooms']:
-                        title = prop['title']
-                        try:
-                            # Look for patterns like "2 Bedroom" or "2 BR" or "2-Bedroom" or "Apt 2" or ending with 2
-                            import re
-                            
-                            # First, check for explicit bedroom mentions
-                            bedroom_match = re.search(r'(\d+)[\s-]*(bed|br|bedroom)', title.lower())
-                            if bedroom_match:
-                                extracted_bedrooms = int(bedroom_match.group(1))
-                            
-                            # If no match, check for "Apt X" pattern
-                            elif re.search(r'apt\s+(\d+)', title.lower()):
-                                apt_match = re.search(r'apt\s+(\d+)', title.lower())
-                                extracted_bedrooms = int(apt_match.group(1))
-                            
-                            # If still no match, check if property address ends with a number
-                            elif re.search(r'\s(\d+)$', title.strip()):
-                                end_match = re.search(r'\s(\d+)$', title.strip())
-                                extracted_bedrooms = int(end_match.group(1))
-                            
-                            # Look for apartment number after the suffix like 1L, 2R, etc.
-                            elif re.search(r'apt\s+\d+[a-zA-Z]', title.lower()):
-                                # Extract the digit part in patterns like "Apt 2L"
-                                apt_letter_match = re.search(r'apt\s+(\d+)[a-zA-Z]', title.lower())
-                                if apt_letter_match:
-                                    extracted_bedrooms = int(apt_letter_match.group(1))
-                            
-                            # Extract from title like "10 Seminary Apt 2"
-                            elif "Seminary Apt" in title:
-                                seminary_match = re.search(r'Seminary\s+Apt\s+(\d+)', title)
-                                if seminary_match:
-                                    extracted_bedrooms = int(seminary_match.group(1))
-                                
-                        except Exception as e:
-                            print(f"Error extracting bedrooms from title '{title}': {str(e)}")
-                    
-                    # If we successfully extracted bedrooms from the title, update immediately
-                    if extracted_bedrooms is not None:
-                        cur.execute(
-                            "UPDATE properties SET bedrooms = %s WHERE id = %s",
-                            (extracted_bedrooms, prop['id'])
-                        )
-                        updated_count += 1
-                        print(f"Updated property {prop['id']} with extracted bedrooms: {extracted_bedrooms}")
-                        continue
+                    # Bedrooms the title gives are written in one bulk update below
+                    if prop['bedrooms'] is None:
+                        listing = normalize_listing({'title': prop['title'], 'price': prop['price'], 'bedrooms': None,
+                                                     'location': prop['location']})
+                        if listing['bedrooms'] is not None:
+                            normalized.append(normalized_values(prop['id'], listing))
+                            continue
                     
                     # Use the extract_property_details function to get fresh data from URL
                     updated_details = extract_property_details(prop['url'])
@@ -1191,17 +1052,36 @@ def update_property_database():
                         params = []
                         
                         # Update bedrooms if available and not already set
+                        new_bedrooms = prop['bedrooms']
                         if updated_details.get('bedrooms') and (not prop['bedrooms'] or prop['bedrooms'] == ''):
+                            new_bedrooms = updated_details['bedrooms']
                             updates.append("bedrooms = %s")
-                            params.append(updated_details['bedrooms'])
+                            params.append(new_bedrooms)
                         
                         # Update price if available and current is just "$" or "$,"
+                        new_price = prop['price']
                         if updated_details.get('price'):
                             price = updated_details['price']
                             if price and price not in ['$', '$,', 'No price'] and (not prop['price'] or prop['price'] in ['$', '$,', 'No price']):
+                                new_price = price
                                 updates.append("price = %s")
                                 params.append(price)
                         
+                        # Keep the normalised price columns in step with price and bedrooms
+                        updates.append("price_cents = %s")
+                        updates.append("price_period = %s")
+                        updates.append("price_per_bedroom = %s")
+                        updates.append("price_monthly_cents = %s")
+                        price_cents, price_period, price_per_bedroom = normalize_price(new_price, new_bedrooms)
+                        params.extend([price_cents, price_period, price_per_bedroom,
+                                       monthly_cents(price_cents, price_period)])
+                        
+                        # Refresh the stored details the property page serves
+                        for field in ['amenities', 'description', 'availability', 'bathrooms', 'photos']:
+                            updates.append(f"{field} = %s")
+                            params.append(updated_details.get(field))
+                        updates.append("details_scraped_at = CURRENT_TIMESTAMP")
+                        
                         # Only update if we have changes to make
                         if updates:
                             params.append(prop['id'])
@@ -1213,6 +1093,10 @@ def update_property_database():
                 print(error_msg)
                 errors.append(error_msg)
         
+        if normalized:
+            updated_count += update_normalized_columns(cur, normalized)
+            print(f"Updated {len(normalized)} properties with bedrooms from their titles")
+        
         conn.commit()
         cur.close()
         conn.close()
@@ -0,0 +1,65 @@
+"""
+Request-scoped database connections
+
+Blueprints call get_db() for a connection from the shared pool in
+config/pool.py. Inside a request every call returns the same connection,
+checked out on first use and returned when the app context ends; close() on
+it does nothing, so a handler that forgets to close it cannot leak it and a
+helper that closes it cannot pull it from under the handler. Outside a
+request (background refreshes, scripts) get_db() checks out a connection
+that close() returns.
+"""
+
+from flask import g, has_app_context
+
+try:
+    from config.pool import get_connection, pool_stats
+except ImportError:
+    from src.config.pool import get_connection, pool_stats
+
+
+def get_db():
+    """Return this request's pooled connection, checking one out if needed."""
+    if not has_app_context():
+        return get_connection()
+    conn = g.get('db_conn')
+    if conn is None:
+        conn = get_connection()
+        conn.defer_close()
+        g.db_conn = conn
+    return conn
+
+
+def close_db(exception=None):
+    conn = g.pop('db_conn', None)
+    if conn is not None:
+        conn.release()
+
+
+def init_app(app):
+    """Return request connections to the pool when each app context ends."""
+    app.teardown_appcontext(close_db)
+
+
+def pool_metrics_text():
+    """The pool's counters in Prometheus text format."""
+    stats = pool_stats()
+    lines = [
+        '# HELP db_pool_wait_seconds Time requests waited for a free database connection.',
+        '# TYPE db_pool_wait_seconds summary',
+        f"db_pool_wait_seconds_sum {stats['wait_seconds']:.6f}",
+        f"db_pool_wait_seconds_count {stats['checkouts']}",
+        '# HELP db_pool_wait_seconds_max Longest wait for a free database connection.',
+        '# TYPE db_pool_wait_seconds_max gauge',
+        f"db_pool_wait_seconds_max {stats['max_wait_seconds']:.6f}",
+        '# HELP db_pool_connections Database connections by state.',
+        '# TYPE db_pool_connections gauge',
+        f"db_pool_connections{{state=\"in_use\"}} {stats['in_use']}",
+        f"db_pool_connections{{state=\"idle\"}} {stats['idle']}",
+        f"db_pool_connections{{state=\"max\"}} {stats['max']}",
+        '# HELP db_pool_events_total Pool events since the process started.',
+        '# TYPE db_pool_events_total counter',
+    ]
+    for event in ('opened', 'recycled', 'failed_checks', 'timeouts'):
+        lines.append(f"db_pool_events_total{{event=\"{event}\"}} {stats[event]}")
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,218 @@
+"""
+Listing detail cache
+
+Keeps recently served listing details in memory keyed by listing URL, with a
+TTL and LRU eviction. Stale entries are answered immediately while a
+background refresh runs. Concurrent misses for one URL share a single
+upstream fetch: within a process through an in-flight table, and across
+server processes through a Postgres advisory lock.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+
+try:
+    from config.configuration import DETAIL_CACHE_TTL, DETAIL_CACHE_MAX_STALE, DETAIL_CACHE_MAX_ENTRIES
+    from config.db import advisory_lock
+except ImportError:
+    from src.config.configuration import DETAIL_CACHE_TTL, DETAIL_CACHE_MAX_STALE, DETAIL_CACHE_MAX_ENTRIES
+    from src.config.db import advisory_lock
+
+# How long a request waits for another thread's fetch of the same URL
+FLIGHT_WAIT_SECONDS = 30
+
+
+class _Flight:
+    """One in-progress upstream fetch, shared by the requests waiting on it."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        # False when the owner raised instead of returning a result
+        self.done = False
+
+
+class DetailCache:
+    """TTL + LRU cache of listing details with stale-while-revalidate.
+
+    ``loader(url)`` fetches fresh details from the listing site (and may
+    persist them); it returns a dict with ``success``. ``lookup(url)``
+    optionally returns ``(details, fetched_at)`` from a store shared by every
+    process (the properties table), with ``fetched_at`` in epoch seconds.
+    Unsuccessful results are returned (also to requests coalesced onto the
+    same fetch) but never cached.
+    """
+
+    def __init__(self, loader, lookup=None, ttl=None, max_stale=None, max_entries=None):
+        self.loader = loader
+        self.lookup = lookup
+        self.ttl = DETAIL_CACHE_TTL if ttl is None else ttl
+        self.max_stale = DETAIL_CACHE_MAX_STALE if max_stale is None else max_stale
+        self.max_entries = max(1, max_entries or DETAIL_CACHE_MAX_ENTRIES)
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.counters = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'shared_hits': 0,
+            'upstream_fetches': 0,
+            'refreshes': 0,
+            'refresh_skipped': 0,
+            'refresh_errors': 0,
+            'evictions': 0,
+        }
+
+    def _count(self, name, amount=1):
+        # Callers that already hold the lock update counters directly
+        with self._lock:
+            self.counters[name] += amount
+
+    def _store(self, url, details, fetched_at):
+        with self._lock:
+            self._entries[url] = (details, fetched_at)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters['evictions'] += 1
+
+    def get(self, url):
+        """Return the details for ``url``, fetching upstream only when nothing usable is cached."""
+        coalesced = False
+        while True:
+            now = time.time()
+            with self._lock:
+                entry = self._entries.get(url)
+                age = now - entry[1] if entry else None
+                if entry and age < self.ttl:
+                    self._entries.move_to_end(url)
+                    self.counters['hits'] += 1
+                    return entry[0]
+                if entry and age < self.ttl + self.max_stale:
+                    self._entries.move_to_end(url)
+                    self.counters['stale_hits'] += 1
+                    stale = entry[0]
+                else:
+                    stale = None
+                    if not coalesced:
+                        self.counters['misses'] += 1
+                    flight = self._inflight.get(url)
+                    owner = flight is None
+                    if owner:
+                        flight = self._inflight[url] = _Flight()
+
+            if stale is not None:
+                self.refresh_async(url)
+                return stale
+
+            if owner:
+                try:
+                    flight.result = self._load(url)
+                    flight.done = True
+                    return flight.result
+                finally:
+                    with self._lock:
+                        self._inflight.pop(url, None)
+                    flight.event.set()
+
+            # Another request is already fetching this URL; share its result,
+            # failures included, so a failing upstream is not hit once per waiter
+            if not coalesced:
+                self._count('coalesced')
+                coalesced = True
+            if not flight.event.wait(FLIGHT_WAIT_SECONDS):
+                return {"success": False, "error": "Timed out waiting for listing details"}
+            if flight.done:
+                return flight.result
+            # The owner raised; go round again so exactly one waiter takes over
+
+    def _from_shared(self, url):
+        """Details another process (or the scraper) stored, unless they are too old to serve."""
+        if not self.lookup:
+            return None
+        stored = self.lookup(url)
+        if not stored or not stored[0] or stored[1] is None:
+            return None
+        if time.time() - stored[1] >= self.ttl + self.max_stale:
+            return None
+        return stored
+
+    def _load(self, url):
+        stored = self._from_shared(url)
+        if stored:
+            details, fetched_at = stored
+            self._count('shared_hits')
+            self._store(url, details, fetched_at)
+            if time.time() - fetched_at >= self.ttl:
+                self.refresh_async(url)
+            return details
+
+        # Only one process fetches a given URL; the others wait and then read its result
+        with advisory_lock(f'listing-details:{url}'):
+            stored = self._from_shared(url)
+            if stored:
+                self._count('shared_hits')
+                self._store(url, *stored)
+                return stored[0]
+            return self._fetch(url)
+
+    def _fetch(self, url):
+        self._count('upstream_fetches')
+        details = self.loader(url)
+        if details and details.get('success'):
+            self._store(url, details, time.time())
+        return details
+
+    def refresh_async(self, url):
+        """Refresh ``url`` in a background thread unless a refresh is already running."""
+        with self._lock:
+            if url in self._refreshing:
+                return False
+            self._refreshing.add(url)
+        threading.Thread(target=self._refresh, args=(url,), daemon=True).start()
+        return True
+
+    def revalidate(self, url, fetched_at):
+        """Start a background refresh if details fetched at ``fetched_at`` (epoch seconds) are stale."""
+        if fetched_at is None or time.time() - fetched_at >= self.ttl:
+            return self.refresh_async(url)
+        return False
+
+    def _refresh(self, url):
+        try:
+            # Skip if another process is already refreshing this URL
+            with advisory_lock(f'listing-details:{url}', wait=False) as acquired:
+                if acquired is False:
+                    self._count('refresh_skipped')
+                    return
+                # Another process may have refreshed it since this one saw it stale
+                stored = self._from_shared(url)
+                if stored and time.time() - stored[1] < self.ttl:
+                    self._store(url, *stored)
+                    self._count('refresh_skipped')
+                    return
+                details = self._fetch(url)
+                if details and details.get('success'):
+                    self._count('refreshes')
+                else:
+                    self._count('refresh_errors')
+        except Exception as e:
+            self._count('refresh_errors')
+            print(f"Error refreshing listing details for {url}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(url)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['size'] = len(self._entries)
+            stats['inflight'] = len(self._inflight)
+            stats['refreshing'] = len(self._refreshing)
+        stats['max_entries'] = self.max_entries
+        stats['ttl_seconds'] = self.ttl
+        return stats